@@ -0,0 +1,117 @@
+from __future__ import annotations
+import threading
+import pygame as pg
+from settings import *
+
+# Images used by the sprites, with the scale they are drawn at and whether they have a hit variant
+SPRITE_IMAGES = [
+    (BULLET0_IMG_PATH, 1, False),
+    (BULLET1_IMG_PATH, 1, False),
+    (EXTRA_SCORE_10_IMG_PATH, COLLECTIBLE_IMG_SCALE, False),
+    (POWER_UP_IMG_PATH, COLLECTIBLE_IMG_SCALE, False),
+    (PLAYER_IMG_PATH, 1, True),
+    (ENEMY_PARASITE_IMG_PATH, 1, True),
+    (ENEMY_FLOODER_IMG_PATH, 1, True),
+    (ENEMY_GEAR_IMG0_PATH, 1, True),
+    (ENEMY_GEAR_IMG1_PATH, 1, True),
+    (ENEMY_BEAST_IMG_PATH, ENEMY_BEAST_IMG_SCALE, True),
+]
+
+# Central image store. Each file is loaded and converted once, and each transformed variant
+# (keyed by path, scale and alpha) is computed once. The returned surfaces are shared: do not modify them.
+# A loading thread can decode the files ahead (see decode()): the images are still converted on the main thread,
+# the first time they are got, since the display must not be used from another thread.
+class AssetStore:
+    _store = None # AssetStore singleton. Use instance() to access it.
+    def __init__(self) -> None:
+        self.images: dict[tuple[str, float, int], pg.Surface] = {}  # (path, scale, alpha) -> image
+        self.keys: dict[pg.Surface, tuple[str, float, int]] = {}    # image -> (path, scale, alpha)
+        self.masks: dict[tuple[str, float], pg.mask.Mask] = {}      # (path, scale) -> mask
+        self.decoded: dict[str, pg.Surface] = {}    # Files decoded by decode(), not converted yet
+        self.load_counts: dict[str, int] = {}   # Number of times each file was loaded from disk
+        self.hits = 0
+        self.misses = 0                         # Number of variants created
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def instance() -> AssetStore:
+        if not AssetStore._store:
+            AssetStore._store = AssetStore()
+        return AssetStore._store
+
+    def get_image(self, path: str, scale: float = 1, alpha: int = 255) -> pg.Surface:
+        # alpha: opacity (0-255) baked into the image
+        key = (path, scale, alpha)
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.hits += 1
+                return image
+            self.misses += 1
+            if alpha != 255:
+                image = self.get_image(path, scale).copy()
+                image.fill((255, 255, 255, alpha), special_flags=pg.BLEND_RGBA_MULT)
+            elif scale != 1:
+                image = pg.transform.scale_by(self.get_image(path), scale)
+            else:
+                decoded = self.decoded.pop(path, None)
+                if decoded is None:
+                    decoded = self.load(path)
+                image = decoded.convert_alpha()
+            self.images[key] = image
+            self.keys[image] = key
+            return image
+
+    def load(self, path: str) -> pg.Surface:
+        # Read and decode a file (does not use the display)
+        image = pg.image.load(path)
+        with self.lock:
+            self.load_counts[path] = self.load_counts.get(path, 0) + 1
+        return image
+
+    def decode(self, images: list[tuple[str, float, bool]] = SPRITE_IMAGES) -> None:
+        # Decode the files of images ahead of preload() (safe on a loading thread)
+        for path, _, _ in images:
+            with self.lock:
+                needed = path not in self.decoded and (path, 1, 255) not in self.images
+            if needed:
+                image = self.load(path)
+                with self.lock:
+                    if (path, 1, 255) not in self.images:  # Unless the main thread needed it meanwhile
+                        self.decoded[path] = image
+
+    def get_variants(self, path: str, scale: float = 1) -> tuple[pg.Surface, pg.Surface]:
+        # Normal and hit (semi-transparent) variants of an image
+        return (self.get_image(path, scale), self.get_image(path, scale, HIT_ALPHA))
+
+    def get_mask(self, image: pg.Surface) -> pg.mask.Mask:
+        # Shape of an image of the store, used for pixel-accurate collisions. It is built once from the opaque
+        # variant and shared by all the alpha variants (a hit variant has the shape of the normal one).
+        path, scale, _ = self.keys[image]
+        with self.lock:
+            mask = self.masks.get((path, scale))
+            if mask is None:
+                mask = self.masks[(path, scale)] = pg.mask.from_surface(self.get_image(path, scale))
+            return mask
+
+    def preload(self, images: list[tuple[str, float, bool]] = SPRITE_IMAGES) -> None:
+        # Load the images before they are needed (main thread only, requires the display to be initialized)
+        for path, scale, has_hit_variant in images:
+            if has_hit_variant:
+                self.get_variants(path, scale)
+            else:
+                self.get_image(path, scale)
+
+    def get_memory_usage(self) -> int:
+        # Total size of the stored pixels in bytes
+        return sum(image.get_pitch() * image.get_height() for image in self.images.values())
+
+    def get_stats(self) -> dict:
+        return {
+            "images": len(self.images),
+            "loads": sum(self.load_counts.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "masks": len(self.masks),
+            "memory_bytes": self.get_memory_usage(),
+        }
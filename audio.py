@@ -1,98 +1,227 @@
 from __future__ import annotations
+from collections import deque
 from pygame import mixer
 from settings import *
+from loader import AssetLoader
+from gameclock import GameClock
+
+SOUND_PATHS = {
+    "click": CLICK_SOUND_PATH,
+    "game_cleared": GAME_CLEARED_SOUND_PATH,
+    "bullet0": BULLET0_SOUND_PATH,
+    "bullet1": BULLET1_SOUND_PATH,
+    "bullet2": BULLET2_SOUND_PATH,
+    "player_hit": PLAYER_HIT_SOUND_PATH,
+    "player_death": PLAYER_DEATH_SOUND_PATH,
+    "extra_score": EXTRA_SCORE_SOUND_PATH,
+    "power_up": POWER_UP_SOUND_PATH,
+    "parasite_bullet": PARASITE_BULLET_SOUND_PATH,
+    "flooder_bullet": FLOODER_BULLET_SOUND_PATH,
+    "gear_bullet": GEAR_BULLET_SOUND_PATH,
+    "beast_bullet": BEAST_BULLET_SOUND_PATH,
+    "enemy_death": ENEMY_DEATH_SOUND_PATH,
+}
+
+# Assigns the mixer channels ("voices") to the sound effects following SOUND_RULES,
+# so that the mixer load stays bounded however many sounds are requested.
+# Cooldowns, voice ages and rates are in game time (see GameClock), like the events that request the sounds:
+# a slow frame running several simulation steps doesn't cull the sounds of its later steps.
+class VoiceManager:
+    def __init__(self, nbr_voices: int = AUDIO_NBR_VOICES, clock: GameClock = None, channels: list = None) -> None:
+        # channels: the channels to play on (mixer channels 0 to nbr_voices - 1 by default)
+        self.clock = clock if clock else GameClock.instance()
+        if channels is None:
+            mixer.set_num_channels(nbr_voices)
+            channels = [mixer.Channel(i) for i in range(nbr_voices)]
+        self.channels = channels
+        self.voices: list[tuple[str, int, int]] = [None] * len(channels)   # (sound name, priority, start time) per channel
+        self.last_played: dict[str, int] = {}   # Start time (in ms) of the last instance of each sound
+        # restarted: the oldest instance of a sound playing max_instances times was restarted
+        # stolen: the voice of another sound was taken
+        self.counts = {"requested": 0, "played": 0, "culled": 0, "restarted": 0, "stolen": 0}
+        self.times = {name: deque() for name in self.counts}   # Times (in ms) of the counts of the last AUDIO_RATE_WINDOW
+        self.start_time = self.clock.ticks()
+        self.last_time = self.start_time
+
+    def get_time(self) -> int:
+        # Game time in ms. If the clock was set back (e.g. a replay restarts it), the past times are forgotten.
+        now = self.clock.ticks()
+        if now < self.last_time:
+            self.last_played.clear()
+            for times in self.times.values():
+                times.clear()
+            self.voices = [voice and (voice[0], voice[1], min(voice[2], now)) for voice in self.voices]
+            self.start_time = now
+        self.last_time = now
+        return now
+
+    def count(self, name: str, now: int) -> None:
+        self.counts[name] += 1
+        times = self.times[name]
+        times.append(now)
+        self.forget(times, now)
+
+    @staticmethod
+    def forget(times: deque, now: int) -> None:
+        # Drop the times older than the rate window
+        while times and now - times[0] >= AUDIO_RATE_WINDOW*1000:
+            times.popleft()
+
+    def get_rates(self, now: int) -> dict[str, float]:
+        # Counts per second over the last AUDIO_RATE_WINDOW (or since the start, if it is shorter)
+        window = min(AUDIO_RATE_WINDOW*1000, now - self.start_time)
+        rates = {}
+        for name, times in self.times.items():
+            self.forget(times, now)
+            rates[name] = len(times) * 1000 / window if window > 0 else 0.0
+        return rates
+
+    def get_voice(self, name: str, priority: int, max_instances: int, now: int) -> int:
+        # Return the index of the channel to play the sound on, or -1 if the sound must be culled
+        free = -1
+        instances = []      # Channels playing the sound
+        stealable = -1      # Oldest channel with the lowest priority
+        for i, channel in enumerate(self.channels):
+            voice = self.voices[i]
+            if not voice or not channel.get_busy():
+                if free < 0:
+                    free = i
+                continue
+            if voice[0] == name:
+                instances.append(i)
+            if voice[1] <= priority and (stealable < 0 or (voice[1], voice[2]) < self.voices[stealable][1:]):
+                stealable = i
+        if len(instances) >= max_instances:
+            self.count("restarted", now)
+            return min(instances, key=lambda i: self.voices[i][2])
+        if free >= 0:
+            return free
+        if stealable >= 0:
+            self.count("stolen", now)
+        return stealable
+
+    def play(self, name: str, sound: mixer.Sound) -> bool:
+        # Return whether the sound was played
+        priority, cooldown, max_instances = SOUND_RULES[name]
+        now = self.get_time()
+        self.count("requested", now)
+        if name in self.last_played and (now - self.last_played[name]) < cooldown*1000:
+            self.count("culled", now)
+            return False
+        i = self.get_voice(name, priority, max_instances, now)
+        if i < 0:
+            self.count("culled", now)
+            return False
+        self.channels[i].play(sound)
+        self.voices[i] = (name, priority, now)
+        self.last_played[name] = now
+        self.count("played", now)
+        return True
+
+    def get_stats(self) -> dict:
+        return {**self.counts, "per_second": self.get_rates(self.get_time())}
 
 class Audio:
     _audio = None # Audio singleton. Use instance() to access it.
-    def __init__(self) -> None:
-        mixer.set_num_channels(20)
-        mixer.set_reserved(4)
-        self.reserv_channel0 = mixer.Channel(0)
-        self.reserv_channel1 = mixer.Channel(1)
-        self.reserv_channel2 = mixer.Channel(2)
-        self.reserv_channel3 = mixer.Channel(2)
+    def __init__(self, enabled: bool = True, loader: AssetLoader = None) -> None:
+        # A disabled Audio never touches the mixer and plays nothing (e.g. headless simulations)
+        # With a loader, the sounds are loaded in the background (sounds played before that wait for them)
+        self.enabled = enabled
+        self.loader = loader
+        self.sounds: dict[str, mixer.Sound] = {}
+        if not enabled:
+            return
+        self.voices = VoiceManager()
+        if loader:
+            loader.add("audio", self.load)
+        else:
+            self.load()
+
+    def load(self) -> None:
         mixer.music.load(BG_MUSIC_PATH)
         mixer.music.set_volume(BG_MUSIC_VOL)
-        self.click = mixer.Sound(CLICK_SOUND_PATH)
-        self.click.set_volume(SFX_VOL)
-        self.game_cleared = mixer.Sound(GAME_CLEARED_SOUND_PATH)
-        self.game_cleared.set_volume(SFX_VOL)
-        self.bullet0 = mixer.Sound(BULLET0_SOUND_PATH)
-        self.bullet0.set_volume(SFX_VOL)
-        self.bullet1 = mixer.Sound(BULLET1_SOUND_PATH)
-        self.bullet1.set_volume(SFX_VOL)
-        self.bullet2 = mixer.Sound(BULLET2_SOUND_PATH)
-        self.bullet2.set_volume(SFX_VOL)
-        self.player_hit = mixer.Sound(PLAYER_HIT_SOUND_PATH)
-        self.player_hit.set_volume(SFX_VOL)
-        self.player_death = mixer.Sound(PLAYER_DEATH_SOUND_PATH)
-        self.player_death.set_volume(SFX_VOL)
-        self.extra_score = mixer.Sound(EXTRA_SCORE_SOUND_PATH)
-        self.extra_score.set_volume(SFX_VOL)
-        self.power_up = mixer.Sound(POWER_UP_SOUND_PATH)
-        self.power_up.set_volume(SFX_VOL)
-        self.parasite_bullet = mixer.Sound(PARASITE_BULLET_SOUND_PATH)
-        self.parasite_bullet.set_volume(SFX_VOL)
-        self.flooder_bullet = mixer.Sound(FLOODER_BULLET_SOUND_PATH)
-        self.flooder_bullet.set_volume(SFX_VOL)
-        self.gear_bullet = mixer.Sound(GEAR_BULLET_SOUND_PATH)
-        self.gear_bullet.set_volume(SFX_VOL)
-        self.beast_bullet = mixer.Sound(BEAST_BULLET_SOUND_PATH)
-        self.beast_bullet.set_volume(SFX_VOL)
-        self.enemy_death = mixer.Sound(ENEMY_DEATH_SOUND_PATH)
-        self.enemy_death.set_volume(SFX_VOL)
+        for name, path in SOUND_PATHS.items():
+            sound = mixer.Sound(path)
+            sound.set_volume(SFX_VOL)
+            self.sounds[name] = sound
 
     @staticmethod
     def instance() -> Audio:
         if not Audio._audio:
             Audio._audio = Audio()
         return Audio._audio
-    
+
+    @staticmethod
+    def disable() -> None:
+        # Replace the singleton with a silent instance
+        Audio._audio = Audio(enabled=False)
+
+    @staticmethod
+    def init_async(loader: AssetLoader) -> Audio:
+        # Replace the singleton with an instance whose sounds are loaded by the loader
+        Audio._audio = Audio(loader=loader)
+        return Audio._audio
+
+    def is_ready(self) -> bool:
+        # Whether sounds can be played (waits for the sounds if they are still loading)
+        if not self.enabled:
+            return False
+        if self.loader:
+            self.loader.get("audio")
+        return True
+
+    def play(self, name: str):
+        if self.is_ready():
+            self.voices.play(name, self.sounds[name])
+
+    def get_stats(self) -> dict:
+        return self.voices.get_stats() if self.enabled else {}
+
     def play_bg_music(self):
-        mixer.music.play(-1)
+        if self.is_ready():
+            mixer.music.play(-1)
 
     def stop_bg_music(self):
-        mixer.music.stop()
+        if self.is_ready():
+            mixer.music.stop()
 
     def play_click_sound(self):
-        self.click.play()
+        self.play("click")
 
     def play_game_cleared_sound(self):
-        self.game_cleared.play()
-    
+        self.play("game_cleared")
+
     def play_player_bullet_sound(self, bullet_level):
-        sound = None
         if bullet_level == 0:
-            sound = self.bullet0
+            self.play("bullet0")
         elif bullet_level == 1:
-            sound = self.bullet1
+            self.play("bullet1")
         elif bullet_level == 2:
-            sound = self.bullet2
-        sound.play()
+            self.play("bullet2")
 
     def play_player_hit_sound(self):
-        self.player_hit.play()
+        self.play("player_hit")
 
     def play_player_death_sound(self):
-        self.player_death.play()
+        self.play("player_death")
 
     def play_extra_score_sound(self):
-        self.extra_score.play()
+        self.play("extra_score")
 
     def play_power_up_sound(self):
-        self.power_up.play()
+        self.play("power_up")
 
     def play_enemy_bullet_sound(self, enemy_type):
         if enemy_type == ENEMY_TYPE_PARASITE:
-            self.reserv_channel1.play(self.parasite_bullet)
+            self.play("parasite_bullet")
         elif enemy_type == ENEMY_TYPE_FLOODER_DOWN:
-            self.reserv_channel2.play(self.flooder_bullet)
+            self.play("flooder_bullet")
         elif enemy_type == ENEMY_TYPE_GEAR:
-            self.gear_bullet.play()
+            self.play("gear_bullet")
         elif enemy_type == ENEMY_TYPE_BEAST:
-            self.reserv_channel3.play(self.beast_bullet)
+            self.play("beast_bullet")
         else:
             raise RuntimeError(f"Invalid type for enemy bullet sound: {enemy_type}")
 
     def play_enemy_death_sound(self):
-        self.reserv_channel0.play(self.enemy_death)
+        self.play("enemy_death")
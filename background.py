@@ -0,0 +1,86 @@
+from __future__ import annotations
+from collections import OrderedDict
+import pygame as pg
+from settings import *
+
+# Scrolling parallax background (back and front layers).
+# The layers are dimmed once at load time: the back layer is flattened onto black into an opaque surface
+# and the front layer gets its alpha pre-multiplied. The two layers are composited into a window-sized
+# opaque surface only when their integer offsets change, so drawing the background is a single opaque blit.
+# The layers can be decoded ahead on a loading thread (see decode()); the background itself is made on the main thread.
+class Background:
+    def __init__(self, layers: tuple[pg.Surface, pg.Surface] = None, cache_size: int = BG_CACHE_SIZE) -> None:
+        # layers: the decoded back and front images (see decode()), loaded here if not given
+        back, front = layers if layers else Background.decode()
+        self.back = self.bake(back.convert_alpha(), True)
+        self.back_rect = self.back.get_rect()
+        self.back_pos_x = float(self.back_rect.left)
+        self.front = self.bake(front.convert_alpha(), False)
+        self.front_rect = self.front.get_rect()
+        self.front_pos_x = float(self.front_rect.left)
+        self.direction = -1
+        self.cache_size = cache_size    # Maximum number of composites kept
+        self.composites: OrderedDict[tuple[int,int], pg.Surface] = OrderedDict()   # Least recently used first
+        self.hits = 0
+        self.misses = 0                 # Number of composites made
+
+    @staticmethod
+    def decode() -> tuple[pg.Surface, pg.Surface]:
+        # Read and decode the layer files (does not use the display: safe on a loading thread)
+        return pg.image.load(BG_BACK_PATH), pg.image.load(BG_FRONT_PATH)
+
+    @staticmethod
+    def bake(image: pg.Surface, opaque: bool) -> pg.Surface:
+        # Apply the BG_ALPHA dimming once (same result as image.set_alpha(BG_ALPHA) drawn over black)
+        if opaque:
+            baked = pg.Surface(image.get_size()).convert()
+            baked.fill("black")
+            image.set_alpha(BG_ALPHA)
+            baked.blit(image, (0, 0))
+        else:
+            baked = image.copy()
+            baked.fill((255, 255, 255, BG_ALPHA), special_flags=pg.BLEND_RGBA_MULT)
+        return baked
+
+    def update(self) -> None:
+        self.front_pos_x += self.direction * BG_FRONT_SPEED
+        self.back_pos_x = self.front_pos_x * BG_BACK_POS_RATIO
+        self.front_rect.left = int(self.front_pos_x)
+        self.back_rect.left = int(self.back_pos_x)
+        if self.direction > 0 and self.front_rect.left > 0:
+            self.front_rect.left = 0
+            self.direction = -1
+        elif self.direction < 0 and self.front_rect.right < WIN_WIDTH:
+            self.front_rect.right = WIN_WIDTH
+            self.direction = 1
+
+    def get_offsets(self) -> tuple[int,int]:
+        return (self.front_rect.left, self.back_rect.left)
+
+    def get_surface(self) -> pg.Surface:
+        # Composite of both layers at their current offsets
+        offsets = self.get_offsets()
+        composite = self.composites.get(offsets)
+        if composite is not None:
+            self.hits += 1
+            self.composites.move_to_end(offsets)
+            return composite
+        self.misses += 1
+        if len(self.composites) >= self.cache_size:
+            _, composite = self.composites.popitem(last=False)  # Reuse the evicted surface
+        else:
+            composite = pg.Surface((WIN_WIDTH, WIN_HEIGHT)).convert()
+        composite.blit(self.back, self.back_rect)
+        composite.blit(self.front, self.front_rect)
+        self.composites[offsets] = composite
+        return composite
+
+    def draw(self, surface: pg.Surface) -> None:
+        surface.blit(self.get_surface(), (0, 0))
+
+    def get_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.composites),
+        }
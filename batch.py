@@ -0,0 +1,259 @@
+from __future__ import annotations
+import headless     # Selects the dummy SDL drivers (must be imported before pygame is initialized)
+import os
+import argparse
+import ast
+import csv
+import itertools
+import multiprocessing
+import signal
+import sys
+import time
+import numpy as np
+import pygame as pg
+import settings
+from settings import *
+from sprites import *
+from levels import Level
+from gameclock import GameClock
+from systems import create_enemy_systems
+from collision import MaskTester
+from inputs import Autopilot
+from trajectory import rebuild_tables
+from random import seed as seed_random
+
+# Batch simulation: plays many seeded headless games with the autopilot, one worker process per core,
+# to tune the game settings. Each job plays one game with its own settings overrides. The results are
+# written to a CSV file (one row per game, one column per measure) as the games end, then to a columnar
+# NumPy file next to it (.npz, one array per measure in game order: load it with numpy.load()).
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Settings overrides. The modules import the settings with "from settings import *", so an override
+# is set in every module of the game that has the setting (and undone before the next job's overrides).
+# The values computed from the settings when the game is imported are not updated: the trajectory tables
+# are rebuilt, and the other settings they are computed from can't be overridden (see get_precomputed_settings()).
+_overrides: dict[str, object] = {}
+_originals: dict[str, list[tuple[object, object]]] = {}    # Setting -> (module, original value) of each module
+REBUILT_SETTINGS = {"ENEMY_FLOODER_U_BORDER_OFFSET", "ENEMY_BEAST_WAVE_AMP", "ENEMY_BEAST_WAVE_FREQ"}  # See rebuild_tables()
+
+def parse_value(text: str):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text     # Plain string (e.g. a path)
+
+def get_game_modules() -> list:
+    return [module for module in list(sys.modules.values())
+            if os.path.dirname(os.path.abspath(getattr(module, "__file__", None) or os.devnull)) == SOURCE_DIR]
+
+def get_precomputed_settings() -> set[str]:
+    # Settings read when the game modules are imported: by other settings, in default arguments, and in
+    # module and class attributes
+    names = set()
+    def visit(nodes: list[ast.stmt]) -> None:
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                bound = node.args.defaults + [default for default in node.args.kw_defaults if default] + node.decorator_list
+            elif isinstance(node, ast.ClassDef):
+                visit(node.body)
+                bound = node.bases + node.decorator_list
+            else:
+                bound = [node]
+            names.update(child.id for expr in bound for child in ast.walk(expr) if isinstance(child, ast.Name))
+    for module in get_game_modules():
+        with open(module.__file__) as file:
+            tree = ast.parse(file.read())
+        if module is settings:
+            # Only the settings computed from other settings
+            visit([node.value for node in tree.body if isinstance(node, ast.Assign)])
+        else:
+            visit(tree.body)
+    return {name for name in names if name.isupper() and hasattr(settings, name)} - REBUILT_SETTINGS
+
+def apply_overrides(overrides: dict[str, object]) -> None:
+    global _overrides
+    if overrides == _overrides:
+        return
+    for name, originals in _originals.items():
+        for module, value in originals:
+            setattr(module, name, value)
+    _originals.clear()
+    for name, value in overrides.items():
+        _originals[name] = []
+        for module in get_game_modules():
+            if hasattr(module, name):
+                _originals[name].append((module, getattr(module, name)))
+                setattr(module, name, value)
+    _overrides = dict(overrides)
+    # The enemy templates and the trajectory tables were built from the previous settings
+    clear_enemy_pools()
+    rebuild_tables()
+
+def play_game(seed: int, max_level_time: float) -> dict:
+    # Play the levels in order from a fixed game time, so that a seed always gives the same game
+    clock = GameClock.instance()
+    clock.time = 0.0
+    seed_random(seed)
+    levels = Level.all_levels
+    for level in levels:
+        level.systems = create_enemy_systems(level.clock) if ENEMY_SYSTEMS else {}
+        level.mask_tester = MaskTester() if PRECISE_COLLISIONS else None
+    result = {f"level{level.level_nbr}_time": "" for level in levels}
+    frame_times = []
+    damage = 0
+    peak_bullets = 0
+    outcome = "game_cleared"
+    autopilot = Autopilot(lambda: level)    # Plays the level of the loop below
+    for level_idx, level in enumerate(levels):
+        level.start()
+        player = Player.instance()
+        if level_idx == 0:
+            player.reset()
+            prev_input = player.input
+            player.input = autopilot
+        start_time = clock.time
+        lives = player.lives
+        level_outcome = None
+        while not level_outcome:
+            for event in pg.event.get():
+                if event.type == LEVEL_CLEARED:
+                    level_outcome = "cleared"
+                elif event.type == LEVEL_GAME_OVER:
+                    level_outcome = "game_over"
+            if level_outcome:
+                break
+            if (clock.time - start_time) >= max_level_time*1000:
+                level_outcome = "timeout"
+                break
+            frame_start = time.perf_counter()
+            level.update()
+            frame_times.append(time.perf_counter() - frame_start)
+            clock.advance()
+            if player.lives < lives:
+                damage += lives - player.lives
+            lives = player.lives
+            peak_bullets = max(peak_bullets, len(level.player_bullets) + len(level.enemy_bullets))
+        level.clear()
+        result[f"level{level.level_nbr}_time"] = round((clock.time - start_time) / 1000, 3)
+        if level_outcome != "cleared":
+            outcome = level_outcome
+            break
+    player.input = prev_input
+    frame_times_ms = np.array(frame_times) * 1000
+    result.update({
+        "outcome": outcome,
+        "level": level.level_nbr,
+        "score": player.score,
+        "lives": player.lives,
+        "damage": damage,
+        "peak_bullets": peak_bullets,
+        "updates": len(frame_times),
+        "frame_mean_ms": round(float(frame_times_ms.mean()), 4),
+        "frame_p99_ms": round(float(np.percentile(frame_times_ms, 99)), 4),
+        "frame_max_ms": round(float(frame_times_ms.max()), 4),
+    })
+    return result
+
+def init_worker() -> None:
+    headless.init_headless()
+    # SDL turns SIGTERM into a QUIT event: restore it so that the pool can terminate the workers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def run_job(job: tuple[int, int, dict[str, object], float]) -> dict:
+    # Runs in a worker process
+    game, seed, overrides, max_level_time = job
+    apply_overrides(overrides)
+    result = {"game": game, "seed": seed}
+    result.update({name: repr(value) for name, value in overrides.items()})
+    result.update(play_game(seed, max_level_time))
+    return result
+
+def create_jobs(games: int, seed: int, fixed: dict[str, object], sweeps: dict[str, list], max_level_time: float) -> list[tuple]:
+    # One job per game of each combination of the swept values
+    jobs = []
+    for values in itertools.product(*sweeps.values()):
+        overrides = dict(fixed)
+        overrides.update(zip(sweeps.keys(), values))
+        for i in range(games):
+            jobs.append((len(jobs), seed + i, overrides, max_level_time))
+    return jobs
+
+def get_columns(names: list[str]) -> list[str]:
+    level_columns = [f"level{level.level_nbr}_time" for level in Level.all_levels]
+    return (["game", "seed"] + names + ["outcome", "level", "score", "lives", "damage"] + level_columns
+            + ["peak_bullets", "updates", "frame_mean_ms", "frame_p99_ms", "frame_max_ms"])
+
+def get_column_array(values: list) -> np.ndarray:
+    # Numbers (a missing level time is NaN), or strings (outcomes, overridden values)
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) or value == "" for value in values):
+        if all(isinstance(value, int) for value in values):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if value == "" else value for value in values], dtype=np.float64)
+    return np.array([str(value) for value in values])
+
+def write_columns(path: str, columns: list[str], results: list[dict]) -> None:
+    results = sorted(results, key=lambda result: result["game"])
+    np.savez(path, **{column: get_column_array([result.get(column, "") for result in results]) for column in columns})
+
+def get_core_count() -> int:
+    # Cores this process may run on (which can be fewer than the machine's)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Play many seeded {GAME_TITLE} games with the autopilot, in parallel, to tune the settings.")
+    parser.add_argument("--games", type=int, default=BATCH_GAMES, help="games per set of overrides")
+    parser.add_argument("--seed", type=int, default=BATCH_SEED, help="seed of the first game of each set")
+    parser.add_argument("--workers", type=int, default=get_core_count(), help="worker processes (default: one per core available)")
+    parser.add_argument("--set", metavar="NAME=VALUE", action="append", default=[], help="override a setting for all the games")
+    parser.add_argument("--sweep", metavar=("NAME", "VALUE"), nargs="+", action="append", default=[], help="play the games once for each value of a setting")
+    parser.add_argument("--max-level-time", type=float, default=HEADLESS_MAX_LEVEL_TIME, help="maximum simulated seconds per level")
+    parser.add_argument("--output", default=BATCH_OUTPUT, help="CSV file to write the results to (and the .npz next to it)")
+    args = parser.parse_args()
+
+    fixed = {}
+    for item in args.set:
+        name, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--set expects NAME=VALUE, got {item}")
+        fixed[name] = parse_value(value)
+    sweeps = {}
+    for name, *values in args.sweep:
+        if not values:
+            parser.error(f"--sweep {name} expects at least one value")
+        sweeps[name] = [parse_value(value) for value in values]
+    precomputed = get_precomputed_settings()
+    for name in list(fixed) + list(sweeps):
+        if not name.isupper() or not hasattr(settings, name):
+            parser.error(f"unknown setting {name}")
+        if name in precomputed:
+            parser.error(f"{name} is read when the game is imported and can't be overridden")
+
+    jobs = create_jobs(args.games, args.seed, fixed, sweeps, args.max_level_time)
+    names = list(dict.fromkeys(list(fixed) + list(sweeps)))
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"Playing {len(jobs)} games on {workers} worker processes")
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    columns = get_columns(names)
+    columns_path = os.path.splitext(args.output)[0] + ".npz"
+    results = []
+    counts = {}
+    wall_start = time.perf_counter()
+    with open(args.output, "w", newline="") as file, multiprocessing.Pool(workers, initializer=init_worker) as pool:
+        writer = csv.DictWriter(file, columns)
+        writer.writeheader()
+        for result in pool.imap_unordered(run_job, jobs):
+            writer.writerow(result)
+            file.flush()
+            results.append(result)
+            counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    write_columns(columns_path, columns, results)
+    wall_time = time.perf_counter() - wall_start
+
+    print(", ".join(f"{outcome}: {count}" for outcome, count in sorted(counts.items())))
+    print(f"Played {len(jobs)} games in {wall_time:.1f} s ({len(jobs) / wall_time * 60:.1f} games per minute). Results: {args.output}, {columns_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+from __future__ import annotations
+import headless     # Selects the dummy SDL drivers (must be imported before pygame is initialized)
+import argparse
+import json
+import sys
+import time
+import numpy as np
+import pygame as pg
+from settings import *
+from sprites import *
+from levels import Level
+from bullets import BulletStore
+from systems import create_enemy_systems
+from inputs import InputSource, Autopilot
+from replay import ReplayInput
+from snapshot import take_snapshot, restore_snapshot, read_snapshot
+from random import seed as seed_random, uniform
+
+# Reproducible performance benchmarks. Stress scenarios run the real frame loop (update + draw)
+# on an offscreen surface. Microbenchmarks time a single operation. Both report mean, p95 and p99 in ms.
+# The "peak" scenario starts from a snapshot of the heaviest moment of a real level (see snapshot.py).
+# Each benchmark is run BENCHMARK_REPEATS times from the same seed: its times are the medians over the runs,
+# and its spread (max - min of the run means, relative to the min) tells how noisy it is on this machine.
+# The baseline comparison uses the median of min-of-repeats of each benchmark (see combine_runs()), which a
+# slow phase of the machine hardly moves, and allows a fixed relative slowdown (BENCHMARK_TOLERANCE).
+
+def get_stats(durations: list[float]) -> dict:
+    # durations_ms: the samples themselves, combined by combine_runs() (not written to the results)
+    durations_ms = np.array(durations) * 1000
+    return {
+        "durations_ms": durations_ms,
+        "samples": len(durations),
+        "mean_ms": float(durations_ms.mean()),
+        "p95_ms": float(np.percentile(durations_ms, 95)),
+        "p99_ms": float(np.percentile(durations_ms, 99)),
+    }
+
+def combine_runs(runs: list[dict]) -> dict:
+    # Stats of a benchmark run several times (the other values, e.g. the enemy count, are the last run's)
+    # The runs play the same frames (or calls) from the same seed: median_min_ms is the median over the frames of
+    # the fastest run of each frame. A slow phase of the machine only costs the frames it hits in one run.
+    means = np.array([run["mean_ms"] for run in runs])
+    fastest = float(means.min())
+    samples = min(len(run["durations_ms"]) for run in runs)
+    min_of_runs = np.min([run["durations_ms"][:samples] for run in runs], axis=0)
+    combined = dict(runs[-1])
+    del combined["durations_ms"]
+    combined.update({
+        "runs": len(runs),
+        "mean_ms": float(np.median(means)),
+        "p95_ms": float(np.median([run["p95_ms"] for run in runs])),
+        "p99_ms": float(np.median([run["p99_ms"] for run in runs])),
+        "median_min_ms": float(np.median(min_of_runs)),
+        "spread": float((means.max() - fastest) / fastest) if fastest else 0.0,
+    })
+    return combined
+
+def create_level() -> Level:
+    # Level used by the benchmarks: it has no schedule and is not part of the game
+    level = Level(3, "BENCHMARK", "")
+    Level.all_levels.remove(level)
+    level.enemy_schedule[0] = []
+    level.start()
+    level.timeline.clear()
+    Player.instance().lives = BENCHMARK_INVINCIBLE_LIVES
+    return level
+
+def add_enemy(level: Level, enemy: Enemy) -> None:
+    # Enemies can't be killed, so that the load stays constant during the scenario
+    enemy.lives = BENCHMARK_INVINCIBLE_LIVES
+    level.insert_enemy(enemy)
+
+def setup_parasites(level: Level) -> None:
+    for i in range(BENCHMARK_NBR_PARASITES):
+        row, col = divmod(i, 15)
+        add_enemy(level, Parasite((30 + col*32, 40 + row*30), 1 if row % 2 == 0 else -1))
+
+def setup_gears(level: Level) -> None:
+    for i in range(BENCHMARK_NBR_GEARS):
+        add_enemy(level, Gear((60 + i*(GAME_WIDTH - 120)//max(BENCHMARK_NBR_GEARS - 1, 1), 80 + (i % 2)*60), 1 if i % 2 == 0 else -1))
+
+def setup_beasts(level: Level) -> None:
+    add_enemy(level, Beast((100, 50)))
+    add_enemy(level, Beast((GAME_WIDTH - 100, 50)))
+
+def setup_mixed(level: Level) -> None:
+    setup_parasites(level)
+    setup_gears(level)
+    setup_beasts(level)
+
+SCENARIOS = {
+    "parasites": setup_parasites,
+    "gears": setup_gears,
+    "beasts": setup_beasts,
+    "mixed": setup_mixed,
+}
+
+def fire_player_bullets(level: Level, frame: int) -> None:
+    # Triple shots sweeping the screen, fired at the player's rate (no input device is needed)
+    x = GAME_WIDTH//2 + int((GAME_WIDTH//2 - 20) * np.sin(frame / 60))
+    y = Player.instance().rect.top
+    if frame % round(PLAYER_FIRE_DELAY * SIM_RATE) == 0:
+        Bullet0.fire(level.player_bullets, (x - BULLET_LEVEL_3_SPREAD, y), 1)
+        Bullet1.fire(level.player_bullets, (x, y), 1)
+        Bullet0.fire(level.player_bullets, (x + BULLET_LEVEL_3_SPREAD, y), 1)
+
+def run_scenario(setup, surface: pg.Surface, frames: int, warmup: int) -> dict:
+    level = create_level()
+    setup(level)
+    durations = []
+    for frame in range(warmup + frames):
+        start = time.perf_counter()
+        pg.event.get()
+        fire_player_bullets(level, frame)
+        level.update()
+        level.clock.advance()
+        surface.fill("black")
+        level.draw(surface)
+        if frame >= warmup:
+            durations.append(time.perf_counter() - start)
+    stats = get_stats(durations)
+    stats["enemies"] = len(level.enemies)
+    stats["bullets"] = len(level.player_bullets) + len(level.enemy_bullets)
+    level.clear()
+    return stats
+
+# Input source that reads another one and keeps what it read
+class InputLog(InputSource):
+    def __init__(self, source: InputSource) -> None:
+        self.source = source
+        self.inputs: list[tuple[int, bool]] = []
+
+    def read(self) -> tuple[int, bool]:
+        value = self.source.read()
+        self.inputs.append(value)
+        return value
+
+def find_peak(seed: int, level_nbr: int, max_time: float = HEADLESS_MAX_LEVEL_TIME) -> tuple[bytes, list[tuple[int, bool]]]:
+    # Play a level with the autopilot (the player can't die) and snapshot its heaviest moment (most enemies and
+    # bullets). Return the snapshot and the input of the autopilot from then on, so that the scenario plays the same.
+    seed_random(seed)
+    level = Level.all_levels[level_nbr - 1]
+    level.start()
+    player = Player.instance()
+    prev_input = player.input
+    player.input = log = InputLog(Autopilot(lambda: level))
+    player.lives = BENCHMARK_INVINCIBLE_LIVES
+    snapshot, peak_load, peak_update = None, -1, 0
+    start_time = level.clock.time
+    while (level.clock.time - start_time) < max_time*1000:
+        if any(event.type == LEVEL_CLEARED for event in pg.event.get()):
+            break
+        load = len(level.enemies) + len(level.player_bullets) + len(level.enemy_bullets)
+        if load > peak_load:
+            snapshot, peak_load, peak_update = take_snapshot(level), load, len(log.inputs)
+        level.update()
+        level.clock.advance()
+    level.clear()
+    player.input = prev_input
+    return snapshot, log.inputs[peak_update:]
+
+def run_peak_scenario(snapshot: bytes, inputs: list[tuple[int, bool]], surface: pg.Surface, frames: int, warmup: int) -> dict:
+    level, _ = restore_snapshot(snapshot)
+    player = Player.instance()
+    prev_input = player.input
+    player.input = ReplayInput(inputs)
+    player.lives = BENCHMARK_INVINCIBLE_LIVES
+    stats = {"start_enemies": len(level.enemies), "start_bullets": len(level.player_bullets) + len(level.enemy_bullets)}
+    durations = []
+    for frame in range(warmup + frames):
+        start = time.perf_counter()
+        pg.event.get()
+        level.update()
+        level.clock.advance()
+        surface.fill("black")
+        level.draw(surface)
+        if frame >= warmup:
+            durations.append(time.perf_counter() - start)
+    stats.update(get_stats(durations))
+    stats["enemies"] = len(level.enemies)
+    stats["bullets"] = len(level.player_bullets) + len(level.enemy_bullets)
+    level.clear()
+    player.input = prev_input
+    return stats
+
+def time_calls(func, calls: int) -> dict:
+    durations = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return get_stats(durations)
+
+def run_microbenchmarks(surface: pg.Surface, calls: int, snapshot: bytes) -> dict:
+    results = {}
+
+    # Collision: a full parasite formation against a screen of player and enemy bullets
+    level = create_level()
+    setup_parasites(level)
+    for _ in range(60):
+        level.update()
+        level.clock.advance()
+    for i in range(BENCHMARK_NBR_BULLETS):
+        Bullet0.fire(level.player_bullets, (uniform(0, GAME_WIDTH), uniform(0, WIN_HEIGHT)), 1)
+        Bullet1.fire(level.enemy_bullets, (uniform(0, GAME_WIDTH), uniform(0, WIN_HEIGHT)), -1)
+    results["collision"] = time_calls(level.check_collisions, calls)
+
+    # Sprite drawing: the parasite formation
+    results["sprite_draw"] = time_calls(lambda: level.draw_interpolated(surface, level.enemies, 0.5), calls)
+
+    # HUD text rendering
+    player = Player.instance()
+    results["hud_text"] = time_calls(lambda: level.stats.draw(surface, level.level_nbr, player.score, player.lives, player.bullet_level), calls)
+    level.clear()
+
+    # Bullet integration: bullets bouncing inside the screen are never culled
+    store = BulletStore()
+    for i in range(BENCHMARK_NBR_BULLETS):
+        direction = (uniform(-1, 1), uniform(-1, 1))
+        Bullet1.fire(store, (uniform(0, GAME_WIDTH), uniform(0, WIN_HEIGHT)), direction)
+    def integrate():
+        store.update()
+        store.vx[:store.count] *= -1
+        store.vy[:store.count] *= -1
+    results["bullet_integration"] = time_calls(integrate, calls)
+
+    # Enemy update: a horde of parasites updated one by one, then by their system (see systems.py)
+    for name, use_systems in (("enemy_update", False), ("enemy_update_systems", True)):
+        level = create_level()
+        level.systems = create_enemy_systems(level.clock) if use_systems else {}
+        for i in range(BENCHMARK_NBR_HORDE):
+            row, col = divmod(i, 15)
+            add_enemy(level, Parasite((30 + col*32, 40 + (row % 10)*30), 1 if row % 2 == 0 else -1))
+        def update_enemies():
+            level.update_enemies()
+            level.clock.advance()
+        results[name] = time_calls(update_enemies, calls)
+        level.enemy_bullets.empty()
+        level.clear()
+
+    # Snapshots of the peak of a level
+    level, _ = restore_snapshot(snapshot)
+    results["snapshot_take"] = time_calls(lambda: take_snapshot(level), calls)
+    results["snapshot_restore"] = time_calls(lambda: restore_snapshot(snapshot), calls)
+    level.clear()
+    return results
+
+def run(seed: int, frames: int, warmup: int, calls: int, repeats: int = BENCHMARK_REPEATS, scenario_names: list[str] = None,
+        snapshot_path: str = None, micro: bool = True) -> dict:
+    # snapshot_path: snapshot the peak scenario starts from (e.g. a checkpoint saved in the game), instead of the
+    # heaviest moment of BENCHMARK_PEAK_LEVEL. The player doesn't move from it.
+    # micro: whether to run the microbenchmarks
+    peak = not scenario_names or "peak" in scenario_names
+    snapshot, inputs = None, []
+    if snapshot_path:
+        snapshot = read_snapshot(snapshot_path)
+    elif peak or micro:
+        snapshot, inputs = find_peak(seed, BENCHMARK_PEAK_LEVEL)
+    surface = pg.Surface((WIN_WIDTH, WIN_HEIGHT))
+
+    # The runs of a benchmark are spread over the whole benchmark (one round of all the benchmarks per repeat),
+    # so that a slow phase of the machine doesn't slow down all of them. Each run starts from the same seed.
+    runs = {"scenarios": {}, "micro": {}}
+    for _ in range(repeats):
+        for name, setup in SCENARIOS.items():
+            if not scenario_names or name in scenario_names:
+                seed_random(seed)
+                runs["scenarios"].setdefault(name, []).append(run_scenario(setup, surface, frames, warmup))
+        if peak:
+            seed_random(seed)
+            runs["scenarios"].setdefault("peak", []).append(run_peak_scenario(snapshot, inputs, surface, frames, warmup))
+        if micro:
+            seed_random(seed)
+            for name, stats in run_microbenchmarks(surface, calls, snapshot).items():
+                runs["micro"].setdefault(name, []).append(stats)
+    results = {section: {name: combine_runs(section_runs[name]) for name in section_runs} for section, section_runs in runs.items()}
+    results["config"] = {"seed": seed, "frames": frames, "warmup": warmup, "calls": calls, "repeats": repeats}
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float = BENCHMARK_TOLERANCE) -> list[str]:
+    # Return a line for each benchmark whose median of min-of-repeats got slower than the baseline's by more than
+    # the tolerance (capped at BENCHMARK_MAX_TOLERANCE, so that no large regression can pass)
+    if results["config"] != baseline.get("config"):
+        print(f"Warning: the baseline was run with {baseline.get('config')}, not {results['config']}")
+    allowed = min(tolerance, BENCHMARK_MAX_TOLERANCE)
+    regressions = []
+    for section in ("scenarios", "micro"):
+        for name, stats in results[section].items():
+            base = baseline.get(section, {}).get(name)
+            if not base or "median_min_ms" not in base:
+                continue
+            ratio = stats["median_min_ms"] / base["median_min_ms"]
+            line = f"{section}/{name}: {base['median_min_ms']:.3f} ms -> {stats['median_min_ms']:.3f} ms ({ratio:.2f}x, {1 + allowed:.2f}x allowed)"
+            print(line)
+            if ratio > 1 + allowed:
+                regressions.append(line)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Run the {GAME_TITLE} performance benchmarks.")
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED)
+    parser.add_argument("--frames", type=int, default=BENCHMARK_FRAMES, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=BENCHMARK_WARMUP_FRAMES, help="unmeasured frames before each scenario")
+    parser.add_argument("--calls", type=int, default=BENCHMARK_MICRO_CALLS, help="measured calls per microbenchmark")
+    parser.add_argument("--repeats", type=int, default=BENCHMARK_REPEATS, help="runs of each benchmark")
+    parser.add_argument("--no-micro", dest="micro", action="store_false", help="skip the microbenchmarks")
+    parser.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS) + ["peak"], help="scenarios to run (default: all)")
+    parser.add_argument("--snapshot", help=f"snapshot the peak scenario starts from (default: the heaviest moment of level {BENCHMARK_PEAK_LEVEL})")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON results to compare against (written by --output on the same machine)")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                        help=f"allowed slowdown against the baseline (0.1 = 10%%, at most {BENCHMARK_MAX_TOLERANCE})")
+    args = parser.parse_args()
+
+    headless.init_headless()
+    results = run(args.seed, args.frames, args.warmup, args.calls, args.repeats, args.scenarios, args.snapshot, args.micro)
+    for section in ("scenarios", "micro"):
+        for name, stats in results[section].items():
+            print(f"{section}/{name}: mean {stats['mean_ms']:.3f} ms, p95 {stats['p95_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms,"
+                  f" median of min-of-repeats {stats['median_min_ms']:.3f} ms (spread {stats['spread']:.0%})")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+    pg.quit()
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import pygame as pg
+import numpy as np
+from settings import *
+from assets import AssetStore
+
+# Struct-of-arrays store for bullets. Each bullet is a slot in a set of contiguous arrays,
+# so integration, off-screen culling and drawing are done for all bullets at once.
+# Alive bullets always occupy the slots [0, count). Killed slots are compacted on update().
+class BulletStore:
+    images: list[pg.Surface] = []
+    image_ids: dict[str, int] = {}
+    widths = np.zeros(0, dtype=np.int32)
+    heights = np.zeros(0, dtype=np.int32)
+
+    def __init__(self, capacity: int = BULLET_STORE_CAPACITY) -> None:
+        self.count = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity: int) -> None:
+        # (Re)allocate the arrays, keeping the bullets currently stored
+        old = self.get_arrays() if self.count else None
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.prev_x = np.zeros(capacity, dtype=np.float64)   # Positions before the last update (used to interpolate rendering)
+        self.prev_y = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.image_id = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        if old:
+            for new_arr, old_arr in zip(self.get_arrays(), old):
+                new_arr[:self.count] = old_arr[:self.count]
+
+    def get_arrays(self) -> tuple[np.ndarray, ...]:
+        return (self.x, self.y, self.prev_x, self.prev_y, self.vx, self.vy, self.damage, self.image_id, self.alive)
+
+    @staticmethod
+    def get_image_id(img_path: str) -> int:
+        if not img_path in BulletStore.image_ids.keys():
+            image = AssetStore.instance().get_image(img_path)
+            BulletStore.image_ids[img_path] = len(BulletStore.images)
+            BulletStore.images.append(image)
+            BulletStore.widths = np.append(BulletStore.widths, image.get_width()).astype(np.int32)
+            BulletStore.heights = np.append(BulletStore.heights, image.get_height()).astype(np.int32)
+        return BulletStore.image_ids[img_path]
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def emit(self, x: float, y: float, vx: float, vy: float, damage: int, image_id: int) -> int:
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        idx = self.count
+        self.x[idx] = x
+        self.y[idx] = y
+        self.prev_x[idx] = x
+        self.prev_y[idx] = y
+        self.vx[idx] = vx
+        self.vy[idx] = vy
+        self.damage[idx] = damage
+        self.image_id[idx] = image_id
+        self.alive[idx] = True
+        self.count += 1
+        return idx
+
+    def emit_many(self, x: float, y: float, vx: np.ndarray, vy: np.ndarray, damage: int, image_id: int) -> None:
+        # Emit len(vx) bullets from the same position at once (e.g. a ring of bullets), in the order of vx
+        end = self.count + len(vx)
+        if end > self.capacity:
+            self.allocate(max(self.capacity * 2, end))
+        start = self.count
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.prev_x[start:end] = x
+        self.prev_y[start:end] = y
+        self.vx[start:end] = vx
+        self.vy[start:end] = vy
+        self.damage[start:end] = damage
+        self.image_id[start:end] = image_id
+        self.alive[start:end] = True
+        self.count = end
+
+    def kill(self, idx: int) -> None:
+        self.alive[idx] = False
+
+    def empty(self) -> None:
+        self.alive[:self.count] = False
+        self.count = 0
+
+    def compact(self) -> None:
+        # Move alive bullets to the front of the arrays
+        n = self.count
+        keep = self.alive[:n]
+        m = int(np.count_nonzero(keep))
+        if m != n:
+            for arr in self.get_arrays()[:-1]:
+                arr[:m] = arr[:n][keep]
+            self.alive[:m] = True
+            self.alive[m:n] = False
+            self.count = m
+
+    def get_bounds(self, x: np.ndarray = None, y: np.ndarray = None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Left, top, width and height of every stored slot (rects are centered on the bullet position)
+        n = self.count
+        if x is None:
+            x, y = self.x[:n], self.y[:n]
+        ids = self.image_id[:n]
+        widths = BulletStore.widths[ids]
+        heights = BulletStore.heights[ids]
+        lefts = np.floor(x + 0.5).astype(np.int32) - widths // 2
+        tops = np.floor(y + 0.5).astype(np.int32) - heights // 2
+        return lefts, tops, widths, heights
+
+    def get_image_rect(self, idx: int) -> tuple[pg.Surface, pg.Rect]:
+        # Image and rect of a slot (same rect as get_bounds())
+        image = BulletStore.images[self.image_id[idx]]
+        return image, image.get_rect(center = (int(np.floor(self.x[idx] + 0.5)), int(np.floor(self.y[idx] + 0.5))))
+
+    def rects(self) -> tuple[list[int], list[pg.Rect]]:
+        # Slot indices and rects of the alive bullets
+        lefts, tops, widths, heights = self.get_bounds()
+        idxs = np.flatnonzero(self.alive[:self.count]).tolist()
+        rects = [pg.Rect(lefts[i], tops[i], widths[i], heights[i]) for i in idxs]
+        return idxs, rects
+
+    def update(self) -> None:
+        self.compact()
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+
+        # Kill the bullets that left the game area
+        lefts, tops, widths, heights = self.get_bounds()
+        off_screen = (lefts > GAME_WIDTH) | (lefts + widths < 0) | (tops > WIN_HEIGHT) | (tops + heights < 0)
+        if off_screen.any():
+            self.alive[:n] &= ~off_screen
+            self.compact()
+
+    def draw(self, surface: pg.Surface, alpha: float = 1) -> list[pg.Rect]:
+        # alpha: position between the previous and the current update (0 = previous, 1 = current)
+        n = self.count
+        x = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
+        y = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha
+        lefts, tops, _, _ = self.get_bounds(x, y)
+        alive = self.alive[:self.count]
+        images = map(BulletStore.images.__getitem__, self.image_id[:self.count][alive].tolist())
+        return surface.blits(zip(images, zip(lefts[alive].tolist(), tops[alive].tolist())))
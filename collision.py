@@ -0,0 +1,100 @@
+from __future__ import annotations
+import pygame as pg
+from settings import *
+from assets import AssetStore
+
+# Uniform grid broadphase. Built once per frame over the collidable groups of a level,
+# so that only sprites sharing a cell are tested against each other.
+class SpatialHash:
+    def __init__(self, cell_size: int = COLLISION_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int,int], dict[str, list[tuple]]] = {}   # Each layer holds (key, rect) items
+        self.pairs_tested = 0   # Number of candidate pairs tested since the last clear()
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.pairs_tested = 0
+
+    def cell_range(self, rect: pg.Rect) -> tuple[range, range]:
+        size = self.cell_size
+        return range(rect.left // size, (rect.right - 1) // size + 1), range(rect.top // size, (rect.bottom - 1) // size + 1)
+
+    def insert(self, layer: str, sprites) -> None:
+        # Insert sprites (the sprites themselves are used as keys)
+        self.insert_rects(layer, sprites, [sprite.rect for sprite in sprites])
+
+    def insert_rects(self, layer: str, keys, rects) -> None:
+        # Insert arbitrary keys (e.g. bullet slots) with their rects
+        for item in zip(keys, rects):
+            cols, rows = self.cell_range(item[1])
+            for cx in cols:
+                for cy in rows:
+                    cell = self.cells.get((cx, cy))
+                    if cell is None:
+                        cell = self.cells[(cx, cy)] = {}
+                    if layer in cell:
+                        cell[layer].append(item)
+                    else:
+                        cell[layer] = [item]
+
+    def query(self, rect: pg.Rect, layer: str) -> list:
+        # Return the key of every item of the layer overlapping the given rect
+        found = []
+        seen = set()
+        cols, rows = self.cell_range(rect)
+        for cx in cols:
+            for cy in rows:
+                cell = self.cells.get((cx, cy))
+                if not cell or layer not in cell:
+                    continue
+                for key, item_rect in cell[layer]:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    self.pairs_tested += 1
+                    if rect.colliderect(item_rect):
+                        found.append(key)
+        return found
+
+    def pairs(self, layer_a: str, layer_b: str) -> list[tuple]:
+        # Return the keys of every overlapping (a, b) pair between two layers (each pair is reported once)
+        found = []
+        seen = set()
+        for cell in self.cells.values():
+            if layer_a not in cell or layer_b not in cell:
+                continue
+            for key_a, rect_a in cell[layer_a]:
+                for key_b, rect_b in cell[layer_b]:
+                    if (key_a, key_b) in seen:
+                        continue
+                    seen.add((key_a, key_b))
+                    self.pairs_tested += 1
+                    if rect_a.colliderect(rect_b):
+                        found.append((key_a, key_b))
+        return found
+
+# Pixel-accurate narrow phase (see PRECISE_COLLISIONS). Only the pairs that passed the rect test are tested,
+# with the masks of their images (see AssetStore.get_mask()).
+class MaskTester:
+    def __init__(self) -> None:
+        self.tests = 0          # Number of mask tests since the last clear()
+        self.rejected = 0       # Number of them where only the rects overlapped
+        self.total_tests = 0
+        self.total_rejected = 0
+
+    def clear(self) -> None:
+        self.tests = 0
+        self.rejected = 0
+
+    def overlap(self, image_a: pg.Surface, rect_a: pg.Rect, image_b: pg.Surface, rect_b: pg.Rect) -> bool:
+        store = AssetStore.instance()
+        self.tests += 1
+        self.total_tests += 1
+        if store.get_mask(image_a).overlap(store.get_mask(image_b), (rect_b.x - rect_a.x, rect_b.y - rect_a.y)):
+            return True
+        self.rejected += 1
+        self.total_rejected += 1
+        return False
+
+    def get_stats(self) -> dict:
+        return {"tests": self.total_tests, "rejected": self.total_rejected}
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from settings import *
+
+# Simulation clock. Game time only moves forward by fixed steps (see SIM_RATE), so that
+# everything timed with it runs at the same speed whatever the rendering frame rate is.
+class GameClock:
+    _clock = None # GameClock singleton. Use instance() to access it.
+    def __init__(self, sim_rate: int = SIM_RATE) -> None:
+        self.step_ms = 1000 / sim_rate
+        self.time = 0.0     # Game time in ms
+        self.steps = 0      # Number of steps since the clock was created
+
+    @staticmethod
+    def instance() -> GameClock:
+        if not GameClock._clock:
+            GameClock._clock = GameClock()
+        return GameClock._clock
+
+    def ticks(self) -> int:
+        # Game time in ms (same unit as pg.time.get_ticks())
+        return int(self.time)
+
+    def advance(self) -> None:
+        self.time += self.step_ms
+        self.steps += 1
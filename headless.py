@@ -0,0 +1,96 @@
+from __future__ import annotations
+import os
+# The dummy drivers must be selected before pygame is initialized
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import argparse
+import time
+import pygame as pg
+from settings import *
+from sprites import *
+from levels import Level
+from audio import Audio
+from assets import AssetStore
+from inputs import InputSource, Autopilot
+
+# Headless simulation: plays levels without a window, sound or frame cap,
+# stepping the game clock as fast as the CPU allows.
+
+def init_headless():
+    pg.init()
+    pg.display.set_mode((1, 1)) # Required to convert images. Nothing is ever drawn to it.
+    Audio.disable()
+    AssetStore.instance().preload()
+
+def simulate_level(level: Level, max_time: float = HEADLESS_MAX_LEVEL_TIME, input_source: InputSource = None) -> dict:
+    clock = level.clock
+    start_time = clock.time
+    level.start()
+    player = Player.instance()
+    prev_input = player.input
+    if input_source:
+        player.input = input_source
+    outcome = None
+    while not outcome:
+        for event in pg.event.get():
+            if event.type == LEVEL_CLEARED:
+                outcome = "cleared"
+            elif event.type == LEVEL_GAME_OVER:
+                outcome = "game_over"
+        if outcome:
+            break
+        if (clock.time - start_time) >= max_time*1000:
+            outcome = "timeout"
+            break
+        level.update()
+        clock.advance()
+    level.clear()
+    player.input = prev_input
+    return {
+        "level": level.level_nbr,
+        "outcome": outcome,
+        "sim_time": (clock.time - start_time) / 1000,
+        "score": player.score,
+        "lives": player.lives,
+    }
+
+def simulate(level_nbrs: list[int] = None, max_level_time: float = HEADLESS_MAX_LEVEL_TIME, autopilot: bool = False) -> dict:
+    # Play the levels in order (like the game does) until the game is cleared or over
+    # Without the autopilot, the player gets no input (there is no input device)
+    levels = [level for level in Level.all_levels if not level_nbrs or level.level_nbr in level_nbrs]
+    input_source = Autopilot(lambda: level) if autopilot else None  # Plays the level of the loop below
+    results = []
+    wall_start = time.perf_counter()
+    for level in levels:
+        result = simulate_level(level, max_level_time, input_source)
+        results.append(result)
+        if result["outcome"] == "game_over":
+            break
+    wall_time = time.perf_counter() - wall_start
+    sim_time = sum(result["sim_time"] for result in results)
+    if Player._player:
+        Player.instance().reset()
+    return {
+        "levels": results,
+        "sim_time": sim_time,
+        "wall_time": wall_time,
+        "speed": sim_time / wall_time if wall_time else 0.0,    # Simulated seconds per wall-clock second
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Run {GAME_TITLE} headless, faster than real time.")
+    parser.add_argument("--levels", type=int, nargs="*", help="level numbers to play (default: all)")
+    parser.add_argument("--max-level-time", type=float, default=HEADLESS_MAX_LEVEL_TIME, help="maximum simulated seconds per level")
+    parser.add_argument("--autopilot", action="store_true", help="let the autopilot play (see inputs.py)")
+    args = parser.parse_args()
+
+    init_headless()
+    report = simulate(args.levels, args.max_level_time, args.autopilot)
+    for result in report["levels"]:
+        print(f"Level {result['level']}: {result['outcome']} after {result['sim_time']:.1f} s (score: {result['score']}, lives: {result['lives']})")
+    print(f"Simulated {report['sim_time']:.1f} s in {report['wall_time']:.2f} s ({report['speed']:.1f} simulated s per wall s)")
+    pg.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Callable
+import numpy as np
+import pygame as pg
+from settings import *
+
+# Player input sources. The player reads its input (x position and fire button) once per update from its
+# input source, so that the game can be driven by the mouse and keyboard, a replay (see replay.py) or the
+# autopilot, with or without a display and input devices.
+class InputSource(ABC):
+    @abstractmethod
+    def read(self) -> tuple[int, bool]:
+        # x position of the player and whether it fires
+        pass
+
+    def start_level(self, level: Level, x: int) -> None:
+        # Called when a level starts, with the x position the player starts at
+        pass
+
+    def poll_confirm(self, events: list[pg.event.Event]) -> bool:
+        # Whether the events of this update confirm (start a game or leave the end screens)
+        return False
+
+# Live input: the mouse (x position and left button) and the keyboard (INPUT_LEFT_KEYS / INPUT_RIGHT_KEYS
+# move the player, INPUT_FIRE_KEYS fire). The player follows the mouse whenever it moves.
+class MouseKeyboardInput(InputSource):
+    def __init__(self) -> None:
+        self.x = GAME_WIDTH//2
+        self.mouse_x = None     # Last mouse x read
+
+    def read(self) -> tuple[int, bool]:
+        mouse_x = pg.mouse.get_pos()[0]
+        if mouse_x != self.mouse_x:
+            self.x = self.mouse_x = mouse_x
+        keys = pg.key.get_pressed()
+        direction = any(keys[key] for key in INPUT_RIGHT_KEYS) - any(keys[key] for key in INPUT_LEFT_KEYS)
+        if direction:
+            self.x = max(0, min(GAME_WIDTH, self.x + direction*INPUT_KEY_SPEED))
+        fire = pg.mouse.get_pressed()[0] or any(keys[key] for key in INPUT_FIRE_KEYS)
+        return self.x, fire
+
+    def start_level(self, level: Level, x: int) -> None:
+        pg.mouse.set_pos((x, WIN_HEIGHT//2))
+        self.x = self.mouse_x = x
+
+    def poll_confirm(self, events: list[pg.event.Event]) -> bool:
+        return any((event.type == pg.MOUSEBUTTONDOWN and event.button == 1)
+                   or (event.type == pg.KEYDOWN and event.key in INPUT_CONFIRM_KEYS) for event in events)
+
+# Autopilot: always fires, tracks the lowest enemy and dodges the enemy bullets and the enemies about to reach
+# the player. It moves at most AUTOPILOT_SPEED px per update, like a player would.
+# Each update, it scores the positions every AUTOPILOT_SPEED px around the player: the bullets and enemies
+# (moving straight on) that would hit the player on its way there in the next AUTOPILOT_LOOKAHEAD updates
+# cost 1/(updates before the hit) each. It moves toward the position that costs the least.
+# It only reads the level, so it doesn't change the course of a seeded game.
+class Autopilot(InputSource):
+    def __init__(self, get_level: Callable[[], Level], speed: int = AUTOPILOT_SPEED) -> None:
+        self.get_level = get_level  # Returns the level being played
+        self.speed = speed
+        self.offsets = np.arange(-AUTOPILOT_CANDIDATES, AUTOPILOT_CANDIDATES + 1) * speed
+        self.steps = np.arange(1, AUTOPILOT_LOOKAHEAD + 1)
+        self.enemy_pos: dict[Enemy, tuple[int, int]] = {}  # Enemy positions at the last update (to get their velocity)
+
+    def get_threats(self, level: Level) -> tuple[np.ndarray, ...]:
+        # Centers, velocities (px per update), sizes and delays of the enemy bullets and the enemies.
+        # The collisions are checked after the player and the enemies moved but before the bullets move:
+        # bullets are one update late (delay 1).
+        bullets = level.enemy_bullets
+        alive = np.flatnonzero(bullets.alive[:bullets.count])
+        ids = bullets.image_id[alive]
+        enemies = []
+        for enemy in level.enemies:
+            x, y = enemy.rect.center
+            prev_x, prev_y = self.enemy_pos.get(enemy, (x, y))
+            enemies.append((x, y, x - prev_x, y - prev_y, enemy.rect.width, enemy.rect.height))
+        self.enemy_pos = {enemy: enemy.rect.center for enemy in level.enemies}
+        enemy_values = np.array(enemies, dtype=np.float64).reshape(-1, 6)
+        return (np.concatenate((bullets.x[alive], enemy_values[:, 0])),
+                np.concatenate((bullets.y[alive], enemy_values[:, 1])),
+                np.concatenate((bullets.vx[alive], enemy_values[:, 2])),
+                np.concatenate((bullets.vy[alive], enemy_values[:, 3])),
+                np.concatenate((bullets.widths[ids], enemy_values[:, 4])),
+                np.concatenate((bullets.heights[ids], enemy_values[:, 5])),
+                np.concatenate((np.ones(len(alive)), np.zeros(len(enemies)))))
+
+    def read(self) -> tuple[int, bool]:
+        level = self.get_level()
+        rect = level.player.sprite.rect
+        candidates = np.clip(rect.centerx + self.offsets, rect.width / 2, GAME_WIDTH - rect.width / 2)
+        moves = candidates - rect.centerx
+
+        # Tracking the lowest enemy above the player only breaks ties between safe positions
+        above = (enemy for enemy in level.enemies if enemy.rect.bottom < rect.top)
+        lowest = max(above, key=lambda enemy: enemy.rect.bottom, default=None)
+        target = GAME_WIDTH//2
+        if lowest:
+            # Aim where the enemy will be when the bullets reach it
+            vx = lowest.rect.centerx - self.enemy_pos.get(lowest, lowest.rect.center)[0]
+            target = lowest.rect.centerx + vx*(rect.top - lowest.rect.bottom)/BULLET0_SPEED
+        # (and between equally good positions, the closest wins)
+        costs = np.abs(candidates - target) / GAME_WIDTH * AUTOPILOT_TRACK_WEIGHT + np.abs(moves) * 1e-6
+
+        # Threats at each of the next updates (the player moves first on each update), only those that
+        # cross the player's row
+        x, y, vx, vy, widths, heights, delays = self.get_threats(level)
+        if len(x):
+            steps = self.steps
+            threat_steps = steps - delays[:, None]                                                         # (threat, step)
+            in_row = np.abs(y[:, None] + vy[:, None]*threat_steps - rect.centery) < (heights[:, None] + rect.height) / 2
+            threats = np.flatnonzero(in_row.any(axis=1))
+            if len(threats):
+                in_row = in_row[threats]
+                threat_x = x[threats, None] + vx[threats, None]*threat_steps[threats]
+                player_x = rect.centerx + np.clip(moves[:, None], -self.speed*steps, self.speed*steps)      # (position, step)
+                reach = (widths[threats] + rect.width) / 2 + AUTOPILOT_MARGIN
+                hits = (np.abs(threat_x[None] - player_x[:, None]) < reach[None, :, None]) & in_row[None]   # (position, threat, step)
+                first = hits.argmax(axis=2)
+                costs += (hits.any(axis=2) / (first + 1)).sum(axis=1)
+
+        best = candidates[int(np.argmin(costs))]
+        x = rect.centerx + max(-self.speed, min(self.speed, int(best) - rect.centerx))
+        return x, True
+
+    def start_level(self, level: Level, x: int) -> None:
+        # The enemies of the last update are gone (or were restored from a snapshot, see snapshot.py)
+        self.enemy_pos.clear()
+
+    def poll_confirm(self, events: list[pg.event.Event]) -> bool:
+        # Starts a new game as soon as it can (soak tests)
+        return True
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import struct
+from settings import *
+
+# Level data. Levels are written in JSON (LEVEL_DATA_DIR/<name>.json) and compiled to a compact binary
+# form (<name>.bin) that the game loads when a level starts.
+#
+# JSON: {"level": 1, "title": ..., "subtitle": ..., "waves": [{"time": <s>, "enemies": [<entry>, ...]}, ...]}
+# An entry is one enemy or a formation:
+#   {"type": "parasite", "x": 30, "y": 100, "anchor": "left", "direction": -1}
+#       anchor (optional): x is measured from the "left" edge (default), the "center" or the "right" edge
+#       direction (optional): initial direction of parasites and gears
+#   {"type": "flooder_u", "start_left": true}
+#   {"type": ..., "formation": "row", "x": 30, "y": 100, "count": 3, "spacing": 30, ...}
+#       count enemies at x, x + spacing, x + 2*spacing... (same options as a single enemy)
+#   {"type": ..., "formation": "mirrored", "x": 15, "y": 50, "count": 5, "spacing": 30}
+#       count enemies on each side of the center, at x, x + spacing... from it. The left ones go left first.
+#
+# Binary: LEVEL_DATA_MAGIC, SHA-256 of the body, then the body:
+#   version (B), level number (H), game width (H), title & subtitle (H length + UTF-8),
+#   record count (I), records (d time, B enemy type, h x, h y, b direction (0 = default))
+
+ENEMY_TYPE_NAMES = {
+    "parasite": ENEMY_TYPE_PARASITE,
+    "flooder_down": ENEMY_TYPE_FLOODER_DOWN,
+    "flooder_u": ENEMY_TYPE_FLOODER_U,
+    "gear": ENEMY_TYPE_GEAR,
+    "beast": ENEMY_TYPE_BEAST,
+}
+
+LEVEL_DATA_MAGIC = b"SWLV"
+LEVEL_DATA_VERSION = 1
+HEADER_FORMAT = "<BHH"
+RECORD_FORMAT = "<dBhhb"
+
+# Level record: (time in s, enemy type, main argument, extra arguments) (see Level.add_enemy())
+Record = tuple[float, int, object, tuple]
+
+def get_path(name: str, extension: str) -> str:
+    return os.path.join(LEVEL_DATA_DIR, f"{name}.{extension}")
+
+def get_x(entry: dict, x: int) -> int:
+    anchor = entry.get("anchor", "left")
+    if anchor == "left":
+        return x
+    elif anchor == "center":
+        return GAME_WIDTH//2 + x
+    elif anchor == "right":
+        return GAME_WIDTH - x
+    raise ValueError(f"Invalid anchor: {anchor}")
+
+def expand_entry(time: float, entry: dict) -> list[Record]:
+    enemy_type = ENEMY_TYPE_NAMES[entry["type"]]
+    if enemy_type == ENEMY_TYPE_FLOODER_U:
+        return [(time, enemy_type, bool(entry["start_left"]), ())]
+    formation = entry.get("formation")
+    args = (entry["direction"],) if "direction" in entry else ()
+    if not formation:
+        return [(time, enemy_type, (get_x(entry, entry["x"]), entry["y"]), args)]
+    offsets = [entry["x"] + i*entry["spacing"] for i in range(entry["count"])]
+    if formation == "row":
+        return [(time, enemy_type, (get_x(entry, offset), entry["y"]), args) for offset in offsets]
+    elif formation == "mirrored":
+        return ([(time, enemy_type, (GAME_WIDTH//2 - offset, entry["y"]), (-1,)) for offset in offsets] +
+                [(time, enemy_type, (GAME_WIDTH//2 + offset, entry["y"]), ()) for offset in offsets])
+    raise ValueError(f"Invalid formation: {formation}")
+
+def load_source(path: str) -> dict:
+    with open(path) as file:
+        source = json.load(file)
+    records = []
+    for wave in source["waves"]:
+        for entry in wave["enemies"]:
+            records.extend(expand_entry(wave["time"], entry))
+    return {"level": source["level"], "title": source["title"], "subtitle": source["subtitle"], "records": records}
+
+def pack_string(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+def unpack_string(body: bytes, offset: int) -> tuple[str, int]:
+    (length,) = struct.unpack_from("<H", body, offset)
+    offset += struct.calcsize("<H")
+    return body[offset:offset + length].decode("utf-8"), offset + length
+
+def encode(level: dict) -> bytes:
+    body = [struct.pack(HEADER_FORMAT, LEVEL_DATA_VERSION, level["level"], GAME_WIDTH),
+            pack_string(level["title"]),
+            pack_string(level["subtitle"]),
+            struct.pack("<I", len(level["records"]))]
+    for time, enemy_type, main_arg, args in level["records"]:
+        if enemy_type == ENEMY_TYPE_FLOODER_U:
+            x, y = int(main_arg), 0
+        else:
+            x, y = main_arg
+        body.append(struct.pack(RECORD_FORMAT, time, enemy_type, x, y, args[0] if args else 0))
+    body = b"".join(body)
+    return LEVEL_DATA_MAGIC + hashlib.sha256(body).digest() + body
+
+def decode(data: bytes) -> dict:
+    # Raise ValueError if the data is corrupted or was compiled for other settings
+    if data[:len(LEVEL_DATA_MAGIC)] != LEVEL_DATA_MAGIC:
+        raise ValueError("Not a compiled level")
+    digest_end = len(LEVEL_DATA_MAGIC) + hashlib.sha256().digest_size
+    body = data[digest_end:]
+    if hashlib.sha256(body).digest() != data[len(LEVEL_DATA_MAGIC):digest_end]:
+        raise ValueError("Compiled level failed the integrity check")
+    version, level_nbr, game_width = struct.unpack_from(HEADER_FORMAT, body)
+    if version != LEVEL_DATA_VERSION or game_width != GAME_WIDTH:
+        raise ValueError("Compiled level is out of date")
+    offset = struct.calcsize(HEADER_FORMAT)
+    title, offset = unpack_string(body, offset)
+    subtitle, offset = unpack_string(body, offset)
+    (count,) = struct.unpack_from("<I", body, offset)
+    offset += struct.calcsize("<I")
+    records = []
+    for time, enemy_type, x, y, direction in struct.iter_unpack(RECORD_FORMAT, body[offset:offset + count*struct.calcsize(RECORD_FORMAT)]):
+        main_arg = bool(x) if enemy_type == ENEMY_TYPE_FLOODER_U else (x, y)
+        records.append((time, enemy_type, main_arg, (direction,) if direction else ()))
+    return {"level": level_nbr, "title": title, "subtitle": subtitle, "records": records}
+
+def compile_level(name: str) -> None:
+    with open(get_path(name, "bin"), "wb") as file:
+        file.write(encode(load_source(get_path(name, "json"))))
+
+def load_level(name: str) -> dict:
+    # Load the compiled level, or its JSON source if it is not compiled (or was compiled for other settings).
+    # Run this module after editing a JSON source to compile it again.
+    compiled_path = get_path(name, "bin")
+    if os.path.exists(compiled_path):
+        with open(compiled_path, "rb") as file:
+            data = file.read()
+        try:
+            return decode(data)
+        except ValueError as error:
+            print(f"WARNING: {compiled_path}: {error}. Loading the JSON source instead.")
+    return load_source(get_path(name, "json"))
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Compile the {GAME_TITLE} levels.")
+    parser.add_argument("names", nargs="*", default=LEVEL_NAMES, help="level names (default: all)")
+    args = parser.parse_args()
+    for name in args.names:
+        compile_level(name)
+        print(f"Compiled {get_path(name, 'bin')} ({os.path.getsize(get_path(name, 'bin'))} bytes)")
+
+if __name__ == "__main__":
+    main()
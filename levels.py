@@ -1,7 +1,20 @@
 from __future__ import annotations
+import heapq
+from collections import deque
+from typing import Callable
 import pygame as pg
 from settings import *
 from sprites import *
+from collision import SpatialHash, MaskTester
+from bullets import BulletStore
+from pools import get_pool_stats
+from gameclock import GameClock
+from profiler import FrameProfiler
+from text import TextCache
+from assets import AssetStore
+from audio import Audio
+from leveldata import load_level
+from systems import EnemySystem, create_enemy_systems
 
 class EnemyRecord:
     def __init__(self, enemy_type: int, main_arg: tuple, args) -> None:
@@ -11,49 +24,162 @@ class EnemyRecord:
 
     def __repr__(self) -> str:
         return f"(enemy_type={self.enemy_type}, pos={self.main_arg})"
-    
+
+# Wave prefab: the records of a wave resolved once, when the level starts, to the enemy classes
+# (see ENEMY_TYPES) and their spawn arguments.
+class WavePrefab:
+    def __init__(self, time: float, records: list[EnemyRecord]) -> None:
+        self.time = time
+        self.records = records
+        self.spawns = [(ENEMY_TYPES[record.enemy_type], (record.main_arg,) + record.args) for record in records]
+        self.counts: dict[type[Enemy], int] = {}  # Number of enemies of each class
+        for enemy_class, _ in self.spawns:
+            self.counts[enemy_class] = self.counts.get(enemy_class, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self.spawns)
+
+    def __repr__(self) -> str:
+        return repr(self.records)
+
 class LevelStats:
     def __init__(self) -> None:
         self.font = pg.font.Font(STATS_FONT_PATH, STATS_FONT_SIZE)
+        self.rect = pg.Rect(GAME_WIDTH+2, 0, WIN_WIDTH-GAME_WIDTH-2, WIN_HEIGHT)    # HUD strip (right of the separator line)
+        self.last_values = None         # Values drawn last time
     
     def get_pos(self, index: int):
         assert index >=0 and index < STATS_LEN, f"Invalid stat index: {index}"
         return (GAME_WIDTH + STATS_LEFT, (STATS_CENTERY + int(STATS_HEIGHT*(-0.5 + index/(STATS_LEN-1)))))
 
-    def draw(self, surface: pg.Surface, level_id: int, score: int, lives: int, pow_level: int) -> None:
-        level_text = self.font.render(f"Level {level_id}", None, STATS_COLOR)
+    def draw(self, surface: pg.Surface, level_id: int, score: int, lives: int, pow_level: int, only_if_changed: bool = False) -> list[pg.Rect]:
+        # Return the rects of the HUD that were drawn (none if only_if_changed and the values did not change)
+        values = (level_id, score, lives, pow_level)
+        if only_if_changed and values == self.last_values:
+            return []
+        self.last_values = values
+        if only_if_changed:
+            surface.fill("black", self.rect)  # Erase the previous values
+
+        # Only the score changes often: it is drawn from digit glyphs after its cached label
+        text_cache = TextCache.instance()
+        level_text = text_cache.render(self.font, f"Level {level_id}", STATS_COLOR)
         level_rect = level_text.get_rect(midleft = self.get_pos(0))
-        score_text = self.font.render(f"Score: {score}", None, STATS_COLOR)
+        score_text = text_cache.render(self.font, "Score: ", STATS_COLOR)
         score_rect = score_text.get_rect(midleft = self.get_pos(1))
-        lives_text = self.font.render(f"Lives: {lives}", None, STATS_COLOR)
+        lives_text = text_cache.render(self.font, f"Lives: {lives}", STATS_COLOR)
         lives_rect = lives_text.get_rect(midleft = self.get_pos(2))
-        pow_level_text = self.font.render(f"Power level: {pow_level}", None, STATS_COLOR)
+        pow_level_text = text_cache.render(self.font, f"Power level: {pow_level}", STATS_COLOR)
         pow_level_rect = pow_level_text.get_rect(midleft = self.get_pos(3))
 
         surface.blit(level_text, level_rect)
         surface.blit(score_text, score_rect)
+        text_cache.draw_number(surface, self.font, score, STATS_COLOR, score_rect.topright)
         surface.blit(lives_text, lives_rect)
         surface.blit(pow_level_text, pow_level_rect)
+        return [self.rect]
 
     def update(self):
         pass
 
+# Timeline of timed actions (e.g. wave spawns) driven by game time.
+# Times are in seconds since the timeline started. All the actions due in an update are run in one batch,
+# in time order (actions with the same time run in the order they were scheduled).
+class Timeline:
+    def __init__(self, clock: GameClock = None) -> None:
+        self.clock = clock if clock else GameClock.instance()
+        self.queue: list[tuple[float, int, Callable[[], None]]] = []  # Heap of (time in ms, scheduling order, action)
+        self.order = 0
+        self.time = 0.0                 # Timeline time in ms
+        self.last_ticks = self.clock.ticks()
+        self.paused = False
+        self.time_scale = 1.0           # Timeline time elapsed per game time elapsed
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def start(self) -> None:
+        self.time = 0.0
+        self.last_ticks = self.clock.ticks()
+        self.paused = False
+
+    def schedule(self, time: float, action: Callable[[], None]) -> None:
+        heapq.heappush(self.queue, (time*1000, self.order, action))
+        self.order += 1
+
+    def clear(self) -> None:
+        self.queue.clear()
+
+    def pause(self) -> None:
+        self.advance()
+        self.paused = True
+
+    def resume(self) -> None:
+        self.last_ticks = self.clock.ticks()
+        self.paused = False
+
+    def set_time_scale(self, time_scale: float) -> None:
+        assert time_scale >= 0, "Timeline time scale cannot be negative"
+        self.advance()
+        self.time_scale = time_scale
+
+    def seek(self, time: float, skip: bool = False) -> None:
+        # Move to a time (in s). Unless skip, the actions that were passed are run by the next update.
+        self.advance()
+        self.time = time*1000
+        if skip:
+            while self.queue and self.queue[0][0] <= self.time:
+                heapq.heappop(self.queue)
+
+    def get_time(self) -> float:
+        return self.time / 1000
+
+    def get_next_time(self) -> float | None:
+        return self.queue[0][0] / 1000 if self.queue else None
+
+    def advance(self) -> None:
+        # Follow the game time elapsed since the last call
+        ticks = self.clock.ticks()
+        if not self.paused:
+            self.time += (ticks - self.last_ticks) * self.time_scale
+        self.last_ticks = ticks
+
+    def update(self) -> int:
+        # Run the actions that are due. Return the number of actions run.
+        self.advance()
+        batch = []
+        while self.queue and self.queue[0][0] <= self.time:
+            batch.append(heapq.heappop(self.queue)[2])
+        for action in batch:
+            action()
+        return len(batch)
+
 class Level:
     all_levels: list[Level] = []
     player: pg.sprite.GroupSingle = None
     stats: LevelStats = None
 
-    def __init__(self, level_nbr, title: str, subtitle: str) -> None:
+    def __init__(self, level_nbr, title: str, subtitle: str, clock: GameClock = None, data_name: str = None) -> None:
+        # data_name: name of the level data to load the title, subtitle and enemy schedule from (see leveldata.py)
+        self.clock = clock if clock else GameClock.instance()
         self.level_nbr = level_nbr
         self.title = title
         self.subtitle = subtitle
+        self.data_name = data_name
         self.enemy_schedule: dict[float,list[EnemyRecord]] = {}
-        self.enemy_stack: list[tuple[float,list[EnemyRecord]]] = []
+        self.timeline = Timeline(self.clock)
+        self.waves: dict[float, WavePrefab] = {}  # Waves of the level by time, while it is started
+        self.spawn_queue: deque[tuple[type[Enemy], tuple]] = deque() # Enemies of the spawned waves left to spawn
         self.enemies = pg.sprite.Group()
-        self.player_bullets = pg.sprite.Group()
-        self.enemy_bullets = pg.sprite.Group()
+        self.sprite_enemies = pg.sprite.Group()     # Enemies updated one by one (of a kind without a system)
+        self.systems: dict[type[Enemy], EnemySystem] = create_enemy_systems(self.clock) if ENEMY_SYSTEMS else {}
+        self.player_bullets = BulletStore()
+        self.enemy_bullets = BulletStore()
         self.collectibles = pg.sprite.Group()
         self.power_up_count = 0
+        self.grid = SpatialHash()
+        self.mask_tester = MaskTester() if PRECISE_COLLISIONS else None
+        self.profiler = FrameProfiler.instance()
         Level.all_levels.append(self)
 
     def add_enemy(self, time: float, enemy_type: int, main_arg, *args):
@@ -61,56 +187,95 @@ class Level:
             self.enemy_schedule[time] = []
         self.enemy_schedule[time].append(EnemyRecord(enemy_type, main_arg, args))
 
+    def load(self):
+        data = load_level(self.data_name)
+        self.title = data["title"]
+        self.subtitle = data["subtitle"]
+        self.enemy_schedule = {}
+        for time, enemy_type, main_arg, args in data["records"]:
+            self.add_enemy(time, enemy_type, main_arg, *args)
+
     def start(self):
+        if self.data_name and not self.enemy_schedule:
+            self.load()
         if not Level.player:
-            Level.player = pg.sprite.GroupSingle(Player())
+            Level.player = pg.sprite.GroupSingle(Player(self.clock))
         if not Level.stats:
             Level.stats = LevelStats()
         self.power_up_count = 0
-        self.player.sprite.prepare_for_level()
-        self.enemies.empty()
+        self.player.sprite.prepare_for_level(self)
+        self.kill_enemies()
         assert self.enemy_schedule, "Cannot start a level with an empty enemy schedule"
-        self.enemy_stack = sorted(self.enemy_schedule.items(), key = lambda x: x[0])
-        self.set_next_wave_timer(0)
-        if DEBUG:
-            print(f"FIRST WAVE: {self.enemy_stack[0]}")
-
-    def next_wave(self):
-        prev_time, new_enemies = self.enemy_stack.pop(0)
-        for record in new_enemies:
-            if record.enemy_type == ENEMY_TYPE_PARASITE:
-                if record.args:
-                    self.enemies.add(Parasite(record.main_arg, record.args[0]))
-                else: self.enemies.add(Parasite(record.main_arg))
-            elif record.enemy_type == ENEMY_TYPE_FLOODER_DOWN:
-                self.enemies.add(FlooderDown(record.main_arg))
-            elif record.enemy_type == ENEMY_TYPE_FLOODER_U:
-                self.enemies.add(FlooderU(record.main_arg))
-            elif record.enemy_type == ENEMY_TYPE_GEAR:
-                if record.args:
-                    self.enemies.add(Gear(record.main_arg, record.args[0]))
-                else: self.enemies.add(Gear(record.main_arg))
-            elif record.enemy_type == ENEMY_TYPE_BEAST:
-                self.enemies.add(Beast(record.main_arg))
-        if self.enemy_stack:
-            self.set_next_wave_timer(prev_time)
+        self.timeline.clear()
+        self.spawn_queue.clear()
+        self.waves = {time: WavePrefab(time, records) for time, records in self.enemy_schedule.items()}
+        max_counts: dict[type[Enemy], int] = {}
+        for wave in self.waves.values():
+            self.schedule_wave(wave)
+            for enemy_class, count in wave.counts.items():
+                max_counts[enemy_class] = max(max_counts.get(enemy_class, 0), count)
+        # Fill the enemy pools now so that even the largest wave spawns without building enemies
+        for enemy_class, count in max_counts.items():
+            enemy_class.pool.prefill(count)
+        self.timeline.start()
         if DEBUG:
-            next_wave_enemies = []
-            if self.enemy_stack:
-                next_wave_enemies = self.enemy_stack[0]
-            print(f"NEXT WAVE: {next_wave_enemies}")
+            print(f"FIRST WAVE AT: {self.timeline.get_next_time()}")
 
-    def set_next_wave_timer(self, prev_time) -> None:
-        pg.time.set_timer(LEVEL_NEXT_WAVE, 1000*(self.enemy_stack[0][0] - prev_time), 1)
+    def get_wave_idx(self) -> int:
+        # Index of the last wave spawned (-1 before the first one)
+        return len(self.waves) - len(self.timeline) - 1
+
+    def schedule_wave(self, wave: WavePrefab):
+        self.timeline.schedule(wave.time, lambda: self.spawn_wave(wave))
+
+    def spawn_wave(self, wave: WavePrefab):
+        # The enemies are spawned by the next spawn_pending() (over several frames if ENEMY_SPAWN_BATCH_SIZE is set)
+        self.spawn_queue.extend(wave.spawns)
+        if DEBUG:
+            print(f"WAVE AT {wave.time}: {wave}")
+            print(f"NEXT WAVE AT: {self.timeline.get_next_time()}")
+
+    def spawn_pending(self):
+        count = len(self.spawn_queue)
+        if ENEMY_SPAWN_BATCH_SIZE:
+            count = min(count, ENEMY_SPAWN_BATCH_SIZE)
+        for _ in range(count):
+            enemy_class, args = self.spawn_queue.popleft()
+            self.insert_enemy(enemy_class.spawn(*args, clock=self.clock))
+
+    def insert_enemy(self, enemy: Enemy):
+        self.enemies.add(enemy)
+        system = self.systems.get(type(enemy))
+        if system is not None:
+            system.add(enemy)
+        else:
+            self.sprite_enemies.add(enemy)
+
+    def kill_enemies(self):
+        # Kill the enemies (instead of emptying the group) so that they are released to their pool
+        for enemy in self.enemies.sprites():
+            enemy.kill()
 
     def clear(self):
-        pg.time.set_timer(LEVEL_NEXT_WAVE, 0)
-        self.enemy_stack.clear()
-        self.enemies.empty()
+        self.timeline.clear()
+        self.spawn_queue.clear()
+        self.waves = {}
+        if self.data_name:
+            self.enemy_schedule = {}    # Loaded again on the next start
+        self.kill_enemies()
         self.player_bullets.empty()
         self.enemy_bullets.empty()
-        self.collectibles.empty()
+        # Kill the collectibles (instead of emptying the group) so that they are released to their pool
+        for collectible in self.collectibles.sprites():
+            collectible.kill()
         self.power_up_count = 0
+        if DEBUG:
+            print(f"POOL STATS: {get_pool_stats()}")
+            print(f"TEXT CACHE STATS: {TextCache.instance().get_stats()}")
+            print(f"ASSET STATS: {AssetStore.instance().get_stats()}")
+            print(f"AUDIO STATS: {Audio.instance().get_stats()}")
+            if self.mask_tester:
+                print(f"MASK TEST STATS: {self.mask_tester.get_stats()}")
 
     def add_collectible(self, collectible: Collectible):
         if collectible:
@@ -124,373 +289,148 @@ class Level:
             if DEBUG: print(f"Collectible added: {type(collectible)}")
             self.collectibles.add(collectible)
 
-    def draw(self, surface: pg.Surface):
-        self.stats.draw(surface, 
-                        self.level_nbr, 
-                        self.player.sprite.score, 
-                        self.player.sprite.lives, 
-                        self.player.sprite.bullet_level)
-        self.player_bullets.draw(surface)
-        self.enemy_bullets.draw(surface)
-        self.collectibles.draw(surface)
-        self.player.draw(surface)
-        self.enemies.draw(surface)
+    def draw(self, surface: pg.Surface, alpha: float = 1):
+        # alpha: position between the previous and the current update (0 = previous, 1 = current)
+        self.draw_stats(surface)
+        self.draw_sprites(surface, alpha)
+
+    def draw_stats(self, surface: pg.Surface, only_if_changed: bool = False) -> list[pg.Rect]:
+        return self.stats.draw(surface, 
+                               self.level_nbr, 
+                               self.player.sprite.score, 
+                               self.player.sprite.lives, 
+                               self.player.sprite.bullet_level,
+                               only_if_changed)
+
+    def draw_sprites(self, surface: pg.Surface, alpha: float = 1) -> list[pg.Rect]:
+        # Return the rects drawn (used by the dirty-rect renderer)
+        rects = self.player_bullets.draw(surface, alpha)
+        rects += self.enemy_bullets.draw(surface, alpha)
+        rects += self.draw_interpolated(surface, self.collectibles, alpha)
+        rects += self.draw_interpolated(surface, self.player, alpha)
+        rects += self.draw_interpolated(surface, self.enemies, alpha)
+        return rects
+
+    def draw_interpolated(self, surface: pg.Surface, group: pg.sprite.Group, alpha: float) -> list[pg.Rect]:
+        blits = []
+        for sprite in group:
+            prev_left, prev_top = sprite.prev_pos
+            dx = sprite.rect.left - prev_left
+            dy = sprite.rect.top - prev_top
+            # Sprites that jumped (e.g. teleported) are drawn at their current position
+            if abs(dx) > INTERPOLATION_MAX_DISTANCE or abs(dy) > INTERPOLATION_MAX_DISTANCE:
+                blits.append((sprite.image, sprite.rect))
+            else:
+                blits.append((sprite.image, (round(prev_left + dx*alpha), round(prev_top + dy*alpha))))
+        return surface.blits(blits)
+
+    def save_positions(self):
+        for group in (self.enemies, self.collectibles, self.player):
+            for sprite in group:
+                sprite.prev_pos = sprite.rect.topleft
+
+    def check_collisions(self):
+        # Build the broadphase grid once for this frame
+        self.grid.clear()
+        self.grid.insert("enemies", self.enemies)
+        self.grid.insert_rects("player_bullets", *self.player_bullets.rects())
+        self.grid.insert_rects("enemy_bullets", *self.enemy_bullets.rects())
+        self.grid.insert("collectibles", self.collectibles)
+        if self.mask_tester:
+            self.mask_tester.clear()
+        player = self.player.sprite
+
+        # Check for collision with enemy bullets
+        for bullet_idx in self.grid.query(player.rect, "enemy_bullets"):
+            if not self.touches(player.image, player.rect, *self.enemy_bullets.get_image_rect(bullet_idx)):
+                continue
+            player.hit()
+            self.enemy_bullets.kill(bullet_idx)
+
+        # Check for collision with collectibles
+        for collectible in self.grid.query(player.rect, "collectibles"):
+            collectible.apply(player)
+            collectible.kill()
+
+        # Check for collision between enemies and player
+        for enemy in self.grid.query(player.rect, "enemies"):
+            if not self.touches(player.image, player.rect, enemy.image, enemy.rect):
+                continue
+            score_kill, collectible = enemy.hit(enemy.lives) # Simply kill the enemy
+            player.score += score_kill
+            player.hit()
+            self.add_collectible(collectible)
+
+        # Check for collision between enemies and player bullets
+        for enemy, bullet_idx in self.grid.pairs("enemies", "player_bullets"):
+            # Skip enemies killed and bullets used earlier in this frame
+            if not enemy.alive() or not self.player_bullets.alive[bullet_idx]:
+                continue
+            if not self.touches(enemy.image, enemy.rect, *self.player_bullets.get_image_rect(bullet_idx)):
+                continue
+            # Increment score, add collectible and kill bullet
+            score_kill, collectible = enemy.hit(int(self.player_bullets.damage[bullet_idx]))
+            player.score += score_kill
+            # If a collectible is generated, add it to its group unless the max limit of power ups is reached
+            self.add_collectible(collectible)
+            self.player_bullets.kill(bullet_idx)
+
+    def touches(self, image_a: pg.Surface, rect_a: pg.Rect, image_b: pg.Surface, rect_b: pg.Rect) -> bool:
+        # Whether two sprites whose rects overlap really touch (always true unless PRECISE_COLLISIONS)
+        # The collectibles are picked up on a rect overlap in both modes.
+        return self.mask_tester is None or self.mask_tester.overlap(image_a, rect_a, image_b, rect_b)
+
+    def update_enemies(self):
+        # The enemies of a kind that has a system are updated by it
+        for enemy in self.sprite_enemies.sprites():
+            enemy.update(self.enemy_bullets)
+        for system in self.systems.values():
+            system.update(self.enemy_bullets)
 
     def update(self):
+        # Spawn the waves that are due
+        self.timeline.update()
+        if self.spawn_queue:
+            self.spawn_pending()
+
+        self.save_positions()
+
         # Update level stats
         self.stats.update()
 
-        # Update player (and add player bullet)
-        new_bullet = self.player.sprite.update()
-        if new_bullet:
-            if isinstance(new_bullet, list):
-                for bullet in new_bullet:
-                    self.player_bullets.add(bullet)
-            else:
-                self.player_bullets.add(new_bullet)
-        
-        # Check for collision with enemy bullet
-        enemy_bullet_sprites = self.enemy_bullets.sprites()
-        enemy_bullet_rects = [s.rect for s in enemy_bullet_sprites]
-        collision_idx = self.player.sprite.rect.collidelist(enemy_bullet_rects)
-        if collision_idx != -1:
-            self.player.sprite.hit()
-            enemy_bullet_sprites[collision_idx].kill()
-
-        # Check for collision with collectible
-        collectible_sprites = self.collectibles.sprites()
-        collectible_rects = [s.rect for s in collectible_sprites]
-        collision_idx = self.player.sprite.rect.collidelist(collectible_rects)
-        if collision_idx != -1:
-            collectible_sprites[collision_idx].apply(self.player.sprite)
-            collectible_sprites[collision_idx].kill()
-
-        # Update enemies (and add enemy bullets)
-        curr_enemies = self.enemies.sprites()
-        for enemy in curr_enemies:
-            # Update enemy and add bullet
-            new_bullet = enemy.update()
-            if new_bullet:
-                self.enemy_bullets.add(new_bullet)
-
-            # Check for collision with player
-            if enemy.rect.colliderect(self.player.sprite.rect):
-                score_kill, collectible = enemy.hit(enemy.lives) # Simply kill the enemy
-                self.player.sprite.score += score_kill
-                self.player.sprite.hit()
-                self.add_collectible(collectible)
-                continue
-            
-            # Check for collision with player bullet
-            player_bullet_sprites = self.player_bullets.sprites()
-            player_bullet_rects = [s.rect for s in player_bullet_sprites]
-            collision_idx = enemy.rect.collidelist(player_bullet_rects)
-            if collision_idx != -1:
-                # Increment score, add collectible and kill bullet
-                score_kill, collectible = enemy.hit(player_bullet_sprites[collision_idx].damage)
-                self.player.sprite.score += score_kill
-                # If a collectible is generated, add it to its group unless the max limit of power ups is reached
-                self.add_collectible(collectible)
-                player_bullet_sprites[collision_idx].kill()
+        # Update player (and fire player bullets)
+        self.profiler.begin("Level.update/player")
+        self.player.sprite.update(self.player_bullets)
+        self.profiler.end("Level.update/player")
+
+        # Update enemies (and fire enemy bullets)
+        self.profiler.begin("Level.update/enemies")
+        self.update_enemies()
+        self.profiler.end("Level.update/enemies")
+
+        self.profiler.begin("Level.update/collisions")
+        self.check_collisions()
+        self.profiler.end("Level.update/collisions")
 
         # Update bullets
+        self.profiler.begin("Level.update/bullets")
         self.player_bullets.update()
         self.enemy_bullets.update()
         self.collectibles.update()
+        self.profiler.end("Level.update/bullets")
+
+        self.profiler.set_count("enemies", len(self.enemies))
+        self.profiler.set_count("player bullets", len(self.player_bullets))
+        self.profiler.set_count("enemy bullets", len(self.enemy_bullets))
+        self.profiler.set_count("collectibles", len(self.collectibles))
+        self.profiler.set_count("rect tests", self.grid.pairs_tested)
+        if self.mask_tester:
+            self.profiler.set_count("mask tests", self.mask_tester.tests)
 
         # Check if level is cleared
-        if (not self.enemy_stack) and (not self.enemies.sprites()) and (not self.collectibles.sprites()):
+        if (not self.timeline) and (not self.spawn_queue) and (not self.enemies.sprites()) and (not self.collectibles.sprites()):
             pg.event.post(pg.event.Event(LEVEL_CLEARED))
 
-level1 = Level(1, "LEVEL 1", "Where it all begins")
-
-level1.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2, 50))
-level1.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 50))
-level1.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 50))
-
-level1.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH - 30, 100), -1)
-level1.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH - 60, 100), -1)
-level1.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH - 90, 100), -1)
-level1.add_enemy(6, ENEMY_TYPE_PARASITE, (30, 100))
-level1.add_enemy(6, ENEMY_TYPE_PARASITE, (60, 100))
-level1.add_enemy(6, ENEMY_TYPE_PARASITE, (90, 100))
-
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 50), -1)
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 50), -1)
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 50), -1)
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 50), -1)
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 50))
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 50))
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 50))
-level1.add_enemy(10, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 50))
-
-level1.add_enemy(18, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 80, 50))
-level1.add_enemy(18, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 80, 50))
-
-level1.add_enemy(22, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 140, 80))
-level1.add_enemy(22, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 140, 80))
-
-level1.add_enemy(24, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 200, 100))
-level1.add_enemy(24, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2, 100))
-level1.add_enemy(24, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 200, 100))
-
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 50), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 50), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 50), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 50), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 50), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 50))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 50))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 50))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 50))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 50))
-
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 100), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 100), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 100), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 100), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 100), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 100))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 100))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 100))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 100))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 100))
-
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 150), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 150), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 150), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 150), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 150), -1)
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 150))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 150))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 150))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 150))
-level1.add_enemy(26, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 150))
-
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 200), -1)
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 200), -1)
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 200), -1)
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 200), -1)
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 200))
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 200))
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 200))
-level1.add_enemy(30, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 200))
-
-level1.add_enemy(35, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 40, 50))
-level1.add_enemy(35, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 40, 50))
-
-level2 = Level(2, "LEVEL 2", "Tensions are rising")
-
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 100), -1)
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 100), -1)
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 100), -1)
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 100))
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 100))
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 100))
-
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 150), -1)
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 150), -1)
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 150), -1)
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 150), -1)
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 150))
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 150))
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 150))
-level2.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 150))
-
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 200), -1)
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 200), -1)
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 200), -1)
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 200), -1)
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 200), -1)
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 200))
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 200))
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 200))
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 200))
-level2.add_enemy(5, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 200))
-
-level2.add_enemy(10, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 80, 100))
-level2.add_enemy(10, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 240, 50))
-level2.add_enemy(10, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 80, 100))
-level2.add_enemy(10, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 240, 50))
-
-level2.add_enemy(15, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 160, 100))
-level2.add_enemy(15, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2, 100))
-level2.add_enemy(15, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 160, 100))
-
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 50), -1)
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 50), -1)
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 50), -1)
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 50), -1)
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 50))
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 50))
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 50))
-level2.add_enemy(17, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 50))
-
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 150), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 150), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 150), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 150), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 150))
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 150))
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 150))
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 150))
-
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 200), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 200), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 200), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 200), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 200), -1)
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 200))
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 200))
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 200))
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 200))
-level2.add_enemy(20, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 200))
-
-level2.add_enemy(25, ENEMY_TYPE_FLOODER_U, False)
-
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 150), -1)
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 150), -1)
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 150), -1)
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 150), -1)
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 150))
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 150))
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 150))
-level2.add_enemy(33, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 150))
-
-level2.add_enemy(35, ENEMY_TYPE_FLOODER_U, True)
-level2.add_enemy(37, ENEMY_TYPE_FLOODER_U, False)
-
-level2.add_enemy(40, ENEMY_TYPE_GEAR, (50, 100))
-
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 100), -1)
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 100), -1)
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 100), -1)
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 100))
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 100))
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 100))
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 150), -1)
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 150), -1)
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 150), -1)
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 150), -1)
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 150))
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 150))
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 150))
-level2.add_enemy(44, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 150))
-
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 50), -1)
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 50), -1)
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 50), -1)
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 50), -1)
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 50))
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 50))
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 50))
-level2.add_enemy(46, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 50))
-
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 200), -1)
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 200), -1)
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 200), -1)
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 200), -1)
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 200), -1)
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 200))
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 200))
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 200))
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 200))
-level2.add_enemy(48, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 200))
-
-level2.add_enemy(49, ENEMY_TYPE_GEAR, (GAME_WIDTH - 50, 100), -1)
-
-level3 = Level(3, "LEVEL 3", "The end is near")
-
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 50), -1)
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 50), -1)
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 50), -1)
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 50), -1)
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 50), -1)
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 50))
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 50))
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 50))
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 50))
-level3.add_enemy(3, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 50))
-
-level3.add_enemy(4, ENEMY_TYPE_GEAR, (50, 100))
-level3.add_enemy(5, ENEMY_TYPE_GEAR, (GAME_WIDTH - 50, 100), -1)
-
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 150), -1)
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 150), -1)
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 150), -1)
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 150), -1)
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 150))
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 150))
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 150))
-level3.add_enemy(6, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 150))
-
-level3.add_enemy(8, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 80, 200))
-level3.add_enemy(8, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 240, 200))
-level3.add_enemy(8, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 80, 200))
-level3.add_enemy(8, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 240, 200))
-
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 100), -1)
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 100), -1)
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 100), -1)
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 100), -1)
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 100), -1)
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 100))
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 100))
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 100))
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 100))
-level3.add_enemy(9, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 100))
-
-level3.add_enemy(13, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 240, 100))
-level3.add_enemy(13, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 + 120, 100))
-level3.add_enemy(13, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2, 100))
-level3.add_enemy(13, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 120, 100))
-level3.add_enemy(13, ENEMY_TYPE_FLOODER_DOWN, (GAME_WIDTH//2 - 240, 100))
-
-level3.add_enemy(22, ENEMY_TYPE_BEAST, (GAME_WIDTH//2, 80))
-
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 50), -1)
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 50), -1)
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 50), -1)
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 50), -1)
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 50), -1)
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 50))
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 50))
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 50))
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 50))
-level3.add_enemy(25, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 50))
-
-level3.add_enemy(30, ENEMY_TYPE_FLOODER_U, False)
-
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 150), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 150), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 150), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 150), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 150), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 150))
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 150))
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 150))
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 150))
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 150))
-
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 30, 100), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 60, 100), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 90, 100), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 120, 100), -1)
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 30, 100))
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 60, 100))
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 90, 100))
-level3.add_enemy(40, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 120, 100))
-
-level3.add_enemy(50, ENEMY_TYPE_BEAST, (100, 50))
-level3.add_enemy(50, ENEMY_TYPE_BEAST, (GAME_WIDTH - 100, 50))
-
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 15, 50), -1)
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 45, 50), -1)
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 75, 50), -1)
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 105, 50), -1)
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 - 135, 50), -1)
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 15, 50))
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 45, 50))
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 75, 50))
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 105, 50))
-level3.add_enemy(55, ENEMY_TYPE_PARASITE, (GAME_WIDTH//2 + 135, 50))
\ No newline at end of file
+# The levels' data is only loaded when they start
+for i, name in enumerate(LEVEL_NAMES):
+    Level(i + 1, "", "", data_name=name)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import threading
+from time import perf_counter
+from typing import Any, Callable
+
+# Loads assets on a background thread, in the order they were added.
+# A task has two steps: load() runs on the loading thread and must not touch the display (read and decode files,
+# but no convert(), convert_alpha() or drawing: SDL video calls are not thread-safe), then finish(), if any, is
+# called on the main thread with the result of load() (e.g. to convert the decoded images). The main thread
+# finishes the loaded tasks in update() (called every frame) or when it needs them in get().
+# get() returns the result of a task, blocking only if it is not loaded yet.
+# Errors raised by a task are raised again by get().
+class AssetLoader:
+    def __init__(self, on_progress: Callable[[int, int, str], None] = None) -> None:
+        self.on_progress = on_progress      # Called from the loading thread with (loaded, total, name) after each task
+        self.tasks: list[tuple[str, Callable[[], Any]]] = []
+        self.finishers: dict[str, Callable[[Any], Any]] = {}
+        self.results: dict[str, Any] = {}
+        self.errors: dict[str, Exception] = {}
+        self.events: dict[str, threading.Event] = {}
+        self.finished: set[str] = set()     # Tasks whose result is ready for the main thread
+        self.thread: threading.Thread = None
+        self.loaded = 0                     # Number of tasks loaded by the loading thread
+        self.blocking_waits = 0             # Number of get() calls that had to wait for the loading thread
+        self.start_time = 0.0
+        self.load_time: float = None        # Time (in s) from start() until all the tasks were loaded
+        self.finish_time = 0.0              # Time (in s) spent by the main thread finishing tasks
+        self.done_time: float = None        # Time (in s) from start() until all the tasks were finished
+
+    def add(self, name: str, load: Callable[[], Any], finish: Callable[[Any], Any] = None) -> None:
+        # finish: called on the main thread with the result of load(), returns the result of the task
+        assert not self.thread, "Cannot add a task once the loader is started"
+        assert name not in self.events, f"Duplicate loader task: {name}"
+        self.tasks.append((name, load))
+        if finish:
+            self.finishers[name] = finish
+        self.events[name] = threading.Event()
+
+    def start(self) -> None:
+        self.start_time = perf_counter()
+        self.thread = threading.Thread(target=self.run, name="AssetLoader", daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        for name, load in self.tasks:
+            try:
+                self.results[name] = load()
+            except Exception as error:
+                self.errors[name] = error
+            self.loaded += 1
+            self.events[name].set()
+            if self.on_progress:
+                self.on_progress(self.loaded, len(self.tasks), name)
+        self.load_time = perf_counter() - self.start_time
+
+    def finish(self, name: str) -> None:
+        # Main thread only, once the task is loaded
+        if name in self.finished:
+            return
+        self.finished.add(name)
+        finish = self.finishers.get(name)
+        if finish and name not in self.errors:
+            start = perf_counter()
+            try:
+                self.results[name] = finish(self.results.get(name))
+            except Exception as error:
+                self.errors[name] = error
+            self.finish_time += perf_counter() - start
+        if self.is_done():
+            self.done_time = perf_counter() - self.start_time
+
+    def update(self) -> None:
+        # Finish the tasks loaded so far (main thread, e.g. once per frame)
+        for name, _ in self.tasks:
+            if name not in self.finished and self.events[name].is_set():
+                self.finish(name)
+
+    def is_loaded(self, name: str) -> bool:
+        # Whether get() would not block (the result may still have to be finished)
+        return self.events[name].is_set()
+
+    def is_done(self) -> bool:
+        return len(self.finished) == len(self.tasks)
+
+    def get_progress(self) -> float:
+        # Between 0 & 1
+        return len(self.finished) / len(self.tasks) if self.tasks else 1.0
+
+    def get(self, name: str) -> Any:
+        # Main thread only
+        if name not in self.finished:
+            event = self.events[name]
+            if not event.is_set():
+                if not self.thread:
+                    self.start()
+                self.blocking_waits += 1
+                event.wait()
+            self.finish(name)
+        if name in self.errors:
+            raise self.errors[name]
+        return self.results.get(name)
+
+    def get_stats(self) -> dict:
+        return {
+            "tasks": len(self.tasks),
+            "loaded": self.loaded,
+            "finished": len(self.finished),
+            "blocking_waits": self.blocking_waits,
+            "load_time": self.load_time,
+            "finish_time": self.finish_time,
+            "done_time": self.done_time,
+        }
@@ -1,25 +1,60 @@
+from time import perf_counter
 import pygame as pg
 from settings import *
 from sprites import *
 from levels import Level
 from audio import Audio
+from gameclock import GameClock
+from profiler import FrameProfiler
+from render import DirtyRenderer
+from text import TextCache
+from background import Background
+from assets import AssetStore, SPRITE_IMAGES
+from loader import AssetLoader
+from replay import ReplayRecorder, get_replay_path
+from inputs import InputSource, MouseKeyboardInput, Autopilot
+from snapshot import take_snapshot, restore_snapshot, write_snapshot
+from telemetry import FrameTelemetry
 
 # GAME SETUP
+startup_time = perf_counter()
+first_frame_time: float = None  # Time (in s) from startup to the first frame
 pg.init()
 screen = pg.display.set_mode((WIN_WIDTH,WIN_HEIGHT))
 pg.display.set_icon(pg.image.load(WIN_ICON_PATH))
 pg.display.set_caption(GAME_TITLE)
 pg.mouse.set_visible(DEBUG)
 clock = pg.time.Clock()
+game_clock = GameClock.instance()
+profiler = FrameProfiler.instance()
+telemetry = FrameTelemetry.instance()
 title_font = pg.font.Font(TITLE_FONT_PATH, TITLE_FONT_SIZE)
 subtitle_font = pg.font.Font(SUBTITLE_FONT_PATH, SUBTITLE_FONT_SIZE)
-audio = Audio.instance()
+
+# Assets that the title screen doesn't need are loaded in the background: the files are decoded on the loading
+# thread, then converted on the main thread (see update_loading())
+def on_loading_progress(loaded: int, total: int, name: str):
+    # Called from the loading thread
+    if DEBUG:
+        print(f"LOADED {name} ({loaded}/{total})")
+
+loader = AssetLoader(on_loading_progress)
+audio = Audio.init_async(loader)
+for image in SPRITE_IMAGES:
+    loader.add(image[0], lambda image=image: AssetStore.instance().decode([image]),
+               lambda _, image=image: AssetStore.instance().preload([image]))
+loader.add("background", Background.decode, Background)
+loader.start()
+text_cache = TextCache.instance()
 
 curr_level_idx = 0
 game_state = STATE_START
 level_cleared_timer = 0
 level_title_timer = 0
 last_score = 0              # Score from the last game played
+recorder: ReplayRecorder = None # Replay of the game being played (see REPLAY_RECORDING)
+input_source: InputSource = Autopilot(lambda: get_curr_level()) if INPUT_SOURCE == "autopilot" else MouseKeyboardInput()
+checkpoint: bytes = None    # Snapshot saved with SNAPSHOT_SAVE_KEY (see snapshot.py)
 
 game_title_text = title_font.render(GAME_TITLE, None, TITLE_COLOR)
 game_title_rect = game_title_text.get_rect(center = (GAME_WIDTH//2, (WIN_HEIGHT - TITLE_FONT_SIZE)//2))
@@ -38,58 +73,46 @@ game_cleared_rect = game_cleared_text.get_rect(center = (GAME_WIDTH//2, WIN_HEIG
 game_cleared_subtitle_text = subtitle_font.render(GAME_CLEARED_SUBTITLE, None, SUBTITLE_COLOR)
 game_cleared_subtitle_rect = game_cleared_subtitle_text.get_rect(center = (GAME_WIDTH//2, WIN_HEIGHT//2))
 
-bg_front = pg.image.load(BG_FRONT_PATH).convert_alpha()
-bg_front.set_alpha(100)
-bg_front_rect = bg_front.get_rect()
-bg_front_pos_x = float(bg_front_rect.left)
-bg_back = pg.image.load(BG_BACK_PATH).convert_alpha()
-bg_back.set_alpha(100)
-bg_back_rect = bg_back.get_rect()
-bg_back_pos_x = float(bg_back_rect.left)
-bg_direction = -1
 
 # GAME FUNCTIONS
 def handle_events():
     global running, game_state
-    for event in pg.event.get():
+    events = pg.event.get()
+    for event in events:
         if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
             running = False
-        elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
-            if game_state == STATE_START:
-                start_first_level()
-            elif game_state == STATE_GAME_CLEARED:
-                audio.play_click_sound()
-                game_state = STATE_START
-            elif game_state == STATE_GAME_OVER:
-                audio.play_click_sound()
-                game_state = STATE_START
-        elif event.type == LEVEL_NEXT_WAVE:
-            get_curr_level().next_wave()
+        elif event.type == pg.KEYDOWN and event.key == PROFILER_KEY:
+            profiler.toggle()
+        elif event.type == pg.KEYDOWN and event.key == SNAPSHOT_SAVE_KEY:
+            save_checkpoint()
+        elif event.type == pg.KEYDOWN and event.key == SNAPSHOT_RESTORE_KEY:
+            restore_checkpoint()
         elif event.type == LEVEL_CLEARED:
             handle_level_cleared()
         elif event.type == LEVEL_GAME_OVER:
             handle_game_over()
+    # The player's input only comes from the input source
+    if input_source.poll_confirm(events):
+        if game_state == STATE_START:
+            start_first_level()
+        elif game_state == STATE_GAME_CLEARED:
+            audio.play_click_sound()
+            game_state = STATE_START
+        elif game_state == STATE_GAME_OVER:
+            audio.play_click_sound()
+            game_state = STATE_START
 
-def draw_background():
-    screen.fill("black")
+def draw_background(surface: pg.Surface = screen):
     if game_state == STATE_PLAY:
-        screen.blit(bg_back, bg_back_rect)
-        screen.blit(bg_front, bg_front_rect)
-    pg.draw.rect(screen, "black", pg.Rect(GAME_WIDTH+1, 0, WIN_WIDTH-GAME_WIDTH-1, WIN_HEIGHT))
-    pg.draw.line(screen, "white", (GAME_WIDTH+1,0), (GAME_WIDTH+1,WIN_HEIGHT))
-
-def update_background():
-    global bg_front_pos_x, bg_back_pos_x, bg_direction
-    bg_front_pos_x += bg_direction * BG_FRONT_SPEED
-    bg_back_pos_x = bg_front_pos_x * BG_BACK_POS_RATIO
-    bg_front_rect.left = int(bg_front_pos_x)
-    bg_back_rect.left = int(bg_back_pos_x)
-    if bg_direction > 0 and bg_front_rect.left > 0:
-        bg_front_rect.left = 0
-        bg_direction = -1
-    elif bg_direction < 0 and bg_front_rect.right < WIN_WIDTH:
-        bg_front_rect.right = WIN_WIDTH
-        bg_direction = 1
+        get_background().draw(surface)
+    else:
+        surface.fill("black")
+    pg.draw.rect(surface, "black", pg.Rect(GAME_WIDTH+1, 0, WIN_WIDTH-GAME_WIDTH-1, WIN_HEIGHT))
+    pg.draw.line(surface, "white", (GAME_WIDTH+1,0), (GAME_WIDTH+1,WIN_HEIGHT))
+
+def get_background() -> Background:
+    # Waits for the background if it is still loading
+    return loader.get("background")
 
 def get_curr_level():
     return Level.all_levels[curr_level_idx]
@@ -98,11 +121,53 @@ def handle_level_cleared():
     global game_state, level_cleared_timer
     get_curr_level().clear()
     game_state = STATE_LEVEL_CLEARED
-    level_cleared_timer = pg.time.get_ticks()
+    level_cleared_timer = game_clock.ticks()
+
+def start_recording():
+    # Must be called before the first level starts (the recorder seeds the RNG)
+    global recorder
+    recorder = ReplayRecorder(get_replay_path(), [level.data_name for level in Level.all_levels], game_clock.time, source=input_source)
+
+def stop_recording():
+    global recorder
+    if recorder:
+        recorder.close()
+        Player.instance().input = recorder.source
+        recorder = None
+
+def save_checkpoint():
+    global checkpoint
+    if game_state != STATE_PLAY:
+        return
+    start = perf_counter()
+    checkpoint = take_snapshot(get_curr_level(), (level_title_timer,))
+    if DEBUG:
+        print(f"CHECKPOINT: {len(checkpoint)} bytes in {(perf_counter() - start)*1000:.3f} ms")
+    if SNAPSHOT_PATH:
+        write_snapshot(SNAPSHOT_PATH, checkpoint)
+
+def restore_checkpoint():
+    # Also works from the end screens (retry)
+    global curr_level_idx, game_state, level_title_timer
+    if not checkpoint:
+        return
+    # The recording would no longer match its seed
+    stop_recording()
+    start = perf_counter()
+    level, (level_title_timer,) = restore_snapshot(checkpoint)
+    if DEBUG:
+        print(f"CHECKPOINT RESTORED in {(perf_counter() - start)*1000:.3f} ms")
+    curr_level_idx = Level.all_levels.index(level)
+    if game_state in (STATE_START, STATE_GAME_OVER, STATE_GAME_CLEARED):
+        audio.play_bg_music()
+    game_state = STATE_PLAY
+    if renderer:
+        renderer.invalidate()
 
 def handle_game_over():
     global game_state, last_score
     get_curr_level().clear()
+    stop_recording()
     last_score = Player.instance().score
     Player.instance().reset()
     audio.stop_bg_music()
@@ -111,6 +176,7 @@ def handle_game_over():
 
 def handle_game_cleared():
     global game_state, last_score
+    stop_recording()
     last_score = Player.instance().score
     Player.instance().reset()
     audio.stop_bg_music()
@@ -123,10 +189,16 @@ def draw_level_cleared():
 def start_first_level():
     global curr_level_idx, game_state, level_title_timer
     curr_level_idx = 0
+    if REPLAY_RECORDING:
+        start_recording()
     get_curr_level().start()
+    # The player is created by the first level start, so its input source is set (and started) afterwards
+    player = Player.instance()
+    player.input = recorder if recorder else input_source
+    player.input.start_level(get_curr_level(), player.rect.centerx)
     audio.play_bg_music()
     audio.play_click_sound()
-    level_title_timer = pg.time.get_ticks()
+    level_title_timer = game_clock.ticks()
     game_state = STATE_PLAY
 
 def start_next_level():
@@ -136,24 +208,27 @@ def start_next_level():
         handle_game_cleared()
     else:
         get_curr_level().start()
-        level_title_timer = pg.time.get_ticks()
+        level_title_timer = game_clock.ticks()
         game_state = STATE_PLAY
 
 def draw_game_title():
     screen.blit(game_title_text, game_title_rect)
     screen.blit(game_subtitle_text, game_subtitle_rect)
+    if not loader.is_done():
+        loading_text = text_cache.render(subtitle_font, f"{LOADING_TEXT} {int(loader.get_progress()*100)}%", SUBTITLE_COLOR)
+        screen.blit(loading_text, loading_text.get_rect(midbottom = (GAME_WIDTH//2, WIN_HEIGHT - LOADING_TEXT_OFFSET)))
 
 def draw_level_title():
-    level_title_text = title_font.render(get_curr_level().title, None, TITLE_COLOR)
+    level_title_text = text_cache.render(title_font, get_curr_level().title, TITLE_COLOR)
     level_title_rect = level_title_text.get_rect(center = (GAME_WIDTH//2, (WIN_HEIGHT - TITLE_FONT_SIZE)//2))
-    level_subtitle_text = subtitle_font.render(get_curr_level().subtitle, None, SUBTITLE_COLOR)
+    level_subtitle_text = text_cache.render(subtitle_font, get_curr_level().subtitle, SUBTITLE_COLOR)
     level_subtitle_rect = level_subtitle_text.get_rect(center = (GAME_WIDTH//2, (WIN_HEIGHT + TITLE_FONT_SIZE)//2))
 
     screen.blit(level_title_text, level_title_rect)
     screen.blit(level_subtitle_text, level_subtitle_rect)
 
 def draw_game_over():
-    score_text = subtitle_font.render(f"Your score: {last_score}", None, SUBTITLE_COLOR)
+    score_text = text_cache.render(subtitle_font, f"Your score: {last_score}", SUBTITLE_COLOR)
     score_rect = score_text.get_rect(center = (GAME_WIDTH//2, WIN_HEIGHT//2 + TITLE_FONT_SIZE))
 
     screen.blit(game_over_text, game_over_rect)
@@ -161,7 +236,7 @@ def draw_game_over():
     screen.blit(game_over_subtitle_text, game_over_subtitle_rect)
 
 def draw_game_cleared():
-    score_text = subtitle_font.render(f"Your score: {last_score}", None, SUBTITLE_COLOR)
+    score_text = text_cache.render(subtitle_font, f"Your score: {last_score}", SUBTITLE_COLOR)
     score_rect = score_text.get_rect(center = (GAME_WIDTH//2, WIN_HEIGHT//2 + TITLE_FONT_SIZE))
 
     screen.blit(game_cleared_text, game_cleared_rect)
@@ -171,32 +246,112 @@ def draw_game_cleared():
 def show_debug_info():
     pg.display.set_caption(f"FPS: {clock.get_fps(): .2f}")
 
-# MAIN LOOP
-running = True
-while running:
-    handle_events()
-    draw_background()
-    update_background()
+def update_loading():
+    # Finish the assets loaded since the last frame, and report the cold start timings once all are loaded
+    profiler.begin("load_assets")
+    loader.update()
+    profiler.end("load_assets")
+    if loader.is_done():
+        stats = loader.get_stats()
+        telemetry.set_startup_time("assets_decoded", stats["load_time"])
+        telemetry.set_startup_time("assets_converted", stats["finish_time"])
+        telemetry.set_startup_time("assets_ready", stats["done_time"])
+        if DEBUG:
+            print(f"STARTUP: fully loaded after {stats['done_time']:.3f} s ({stats['finish_time']*1000:.1f} ms on the main thread)")
 
+def update_game():
+    if loader.is_loaded("background"):
+        profiler.begin("update_background")
+        get_background().update()
+        profiler.end("update_background")
+    if game_state == STATE_PLAY:
+        profiler.begin("Level.update")
+        get_curr_level().update()
+        profiler.end("Level.update")
+    elif game_state == STATE_LEVEL_CLEARED:
+        if (game_clock.ticks() - level_cleared_timer) >= (LEVEL_CLEARED_DURATION*1000):
+            start_next_level()
+
+def draw_game(alpha: float):
+    # alpha: position between the previous and the current simulation step (used to interpolate sprites)
+    # Return the rects to update, or None if the whole display must be updated
+    if renderer:
+        # The dirty-rect renderer only handles the play state without any overlay
+        if game_state == STATE_PLAY and not profiler.enabled and (game_clock.ticks() - level_title_timer) >= (LEVEL_START_TITLE_DURATION*1000):
+            profiler.begin("Level.draw")
+            dirty_rects = renderer.draw_level(get_curr_level(), alpha, get_background().get_offsets())
+            profiler.end("Level.draw")
+            return dirty_rects
+        renderer.invalidate()
+    profiler.begin("draw_background")
+    draw_background()
+    profiler.end("draw_background")
     if game_state == STATE_START:
         draw_game_title()
     elif game_state == STATE_PLAY:
-        get_curr_level().draw(screen)
-        get_curr_level().update()
-        if (pg.time.get_ticks() - level_title_timer) < (LEVEL_START_TITLE_DURATION*1000):
+        profiler.begin("Level.draw")
+        get_curr_level().draw(screen, alpha)
+        profiler.end("Level.draw")
+        if (game_clock.ticks() - level_title_timer) < (LEVEL_START_TITLE_DURATION*1000):
             draw_level_title()
     elif game_state == STATE_LEVEL_CLEARED:
         draw_level_cleared()
-        if (pg.time.get_ticks() - level_cleared_timer) >= (LEVEL_CLEARED_DURATION*1000):
-            start_next_level()
     elif game_state == STATE_GAME_CLEARED:
         draw_game_cleared()
     elif game_state == STATE_GAME_OVER:
         draw_game_over()
+    return None
+
+# MAIN LOOP
+# The simulation runs with a fixed time step (see SIM_RATE) and rendering interpolates between steps
+renderer = DirtyRenderer(screen, draw_background) if DIRTY_RECT_RENDERING else None
+running = True
+accumulator = 0     # Real time (in ms) not yet simulated
+loader_reported = False # Whether all the assets were loaded (and their timings reported)
+while running:
+    accumulator += clock.tick(FRAME_RATE)
+    telemetry.begin_frame()
+    profiler.begin("frame")
+    if not loader_reported:
+        update_loading()
+        loader_reported = loader.is_done()
+    steps = 0
+    while accumulator >= game_clock.step_ms and steps < SIM_MAX_STEPS_PER_FRAME:
+        profiler.begin("handle_events")
+        handle_events()
+        profiler.end("handle_events")
+        update_game()
+        game_clock.advance()
+        accumulator -= game_clock.step_ms
+        steps += 1
+    # Drop the time that could not be simulated (the game slows down instead of spiraling)
+    if steps == SIM_MAX_STEPS_PER_FRAME:
+        accumulator = min(accumulator, game_clock.step_ms)
+    telemetry.end_phase("update")
 
+    dirty_rects = draw_game(accumulator / game_clock.step_ms)
+    profiler.draw(screen)
     if DEBUG: show_debug_info()
-    pg.display.flip()
-    clock.tick(FRAME_RATE)
+    telemetry.end_phase("draw")
+    profiler.begin("flip")
+    if renderer:
+        renderer.present(dirty_rects)
+    else:
+        pg.display.flip()
+    profiler.end("flip")
+    telemetry.end_phase("present")
+    if first_frame_time is None:
+        first_frame_time = perf_counter() - startup_time
+        telemetry.set_startup_time("first_frame", first_frame_time)
+        if DEBUG:
+            print(f"STARTUP: first frame after {first_frame_time:.3f} s")
+    profiler.end("frame")
+    profiler.end_frame()
+    telemetry.end_frame(steps, game_state, get_curr_level() if game_state == STATE_PLAY else None)
 
 # GAME EXIT
+stop_recording()
+telemetry_path = telemetry.write_session()
+if DEBUG and telemetry_path:
+    print(f"TELEMETRY: {telemetry_path}")
 pg.quit()
\ No newline at end of file
@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import Callable
+
+# Fixed-capacity free list of reusable objects.
+# Objects are created by the factory only when the free list is empty (a "miss").
+class Pool:
+    all_pools: list[Pool] = []
+
+    def __init__(self, name: str, factory: Callable, capacity: int) -> None:
+        self.name = name
+        self.factory = factory
+        self.capacity = capacity        # Maximum number of objects kept in the free list
+        self.free = []
+        self.acquired = 0               # Total number of acquire() calls
+        self.misses = 0                 # Number of acquire() calls that had to create a new object
+        self.dropped = 0                # Number of released objects discarded because the free list was full
+        self.in_use = 0
+        self.high_water = 0             # Maximum number of objects in use at the same time
+        Pool.all_pools.append(self)
+
+    def acquire(self):
+        self.acquired += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        if self.free:
+            obj = self.free.pop()
+        else:
+            self.misses += 1
+            obj = self.factory()
+        obj.pooled = False
+        return obj
+
+    def release(self, obj) -> None:
+        # Releasing an object twice is ignored
+        if obj.pooled:
+            return
+        obj.pooled = True
+        self.in_use -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    def prefill(self, count: int) -> None:
+        while len(self.free) < min(count, self.capacity):
+            obj = self.factory()
+            obj.pooled = True
+            self.free.append(obj)
+
+    def clear(self) -> None:
+        # Drop the free objects (the objects in use are released as usual)
+        self.free.clear()
+
+    @property
+    def reuse_rate(self) -> float:
+        if not self.acquired:
+            return 0.0
+        return (self.acquired - self.misses) / self.acquired
+
+    def get_stats(self) -> dict:
+        return {
+            "acquired": self.acquired,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "in_use": self.in_use,
+            "free": len(self.free),
+            "high_water": self.high_water,
+            "reuse_rate": self.reuse_rate,
+        }
+
+def get_pool_stats() -> dict[str, dict]:
+    return {pool.name: pool.get_stats() for pool in Pool.all_pools}
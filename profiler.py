@@ -0,0 +1,104 @@
+from __future__ import annotations
+from collections import deque
+from time import perf_counter
+import pygame as pg
+from settings import *
+
+# Per-phase frame profiler with an in-game overlay (toggled with PROFILER_KEY).
+# Phases are timed with begin()/end() pairs. A phase run several times in a frame (e.g. once per
+# simulation step) is summed. Sub-phases are named "<phase>/<sub-phase>" and shown indented.
+class FrameProfiler:
+    _profiler = None # FrameProfiler singleton. Use instance() to access it.
+    def __init__(self, window: int = PROFILER_WINDOW) -> None:
+        self.enabled = False
+        self.toggle_requested = False                   # Toggling is applied at the end of the frame
+        self.window = window                            # Number of frames kept to compute averages and worst times
+        self.history: dict[str, deque[float]] = {}      # Phase durations (in s) of the last frames
+        self.frame_times: dict[str, float] = {}         # Phase durations of the current frame
+        self.starts: dict[str, float] = {}
+        self.counts: dict[str, int] = {}                # Live entity counts
+        self.font: pg.font.Font = None
+        self.lines: list[pg.Surface] = []               # Rendered overlay lines (refreshed every PROFILER_REFRESH_FRAMES)
+        self.frames_since_refresh = 0
+
+    @staticmethod
+    def instance() -> FrameProfiler:
+        if not FrameProfiler._profiler:
+            FrameProfiler._profiler = FrameProfiler()
+        return FrameProfiler._profiler
+
+    def toggle(self) -> None:
+        self.toggle_requested = True
+
+    def apply_toggle(self) -> None:
+        self.toggle_requested = False
+        self.enabled = not self.enabled
+        self.history.clear()
+        self.frame_times.clear()
+        self.starts.clear()
+        self.lines.clear()
+
+    def begin(self, name: str) -> None:
+        if self.enabled:
+            if name not in self.frame_times:
+                self.frame_times[name] = 0  # Phases are listed in the order they begin
+            self.starts[name] = perf_counter()
+
+    def end(self, name: str) -> None:
+        # Phases that began before the profiler was enabled are ignored
+        if self.enabled and name in self.starts:
+            self.frame_times[name] += perf_counter() - self.starts[name]
+
+    def set_count(self, name: str, count: int) -> None:
+        if self.enabled:
+            self.counts[name] = count
+
+    def end_frame(self) -> None:
+        if self.toggle_requested:
+            self.apply_toggle()
+            return
+        if not self.enabled:
+            return
+        for name, duration in self.frame_times.items():
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self.window)
+            self.history[name].append(duration)
+        # Phases that did not run this frame (e.g. no simulation step) count as 0
+        for name, durations in self.history.items():
+            if name not in self.frame_times:
+                durations.append(0)
+        self.frame_times.clear()
+        self.starts.clear()
+
+    def get_stats(self) -> dict[str, tuple[float, float]]:
+        # Average and worst duration (in ms) of each phase over the window
+        return {name: (1000*sum(durations)/len(durations), 1000*max(durations)) for name, durations in self.history.items()}
+
+    def draw(self, surface: pg.Surface) -> None:
+        if not self.enabled:
+            return
+        if not self.font:
+            self.font = pg.font.Font(STATS_FONT_PATH, PROFILER_FONT_SIZE)
+        self.frames_since_refresh += 1
+        if self.frames_since_refresh >= PROFILER_REFRESH_FRAMES or not self.lines:
+            self.frames_since_refresh = 0
+            rows = [("phase (ms)", "avg", "worst")]
+            for name, (avg, worst) in self.get_stats().items():
+                label = ("   - " + name.split("/")[-1]) if "/" in name else name
+                rows.append((label, f"{avg:.2f}", f"{worst:.2f}"))
+            rows.append((", ".join(f"{name}: {count}" for name, count in self.counts.items()), "", ""))
+            self.lines = [tuple(self.font.render(text, None, PROFILER_COLOR) for text in row) for row in rows]
+
+        # Columns: phase name, then average and worst times right-aligned
+        line_height = self.font.get_height()
+        width = max(PROFILER_LABEL_WIDTH + PROFILER_COLUMN_WIDTH*2, max(line[0].get_width() for line in self.lines)) + 2*PROFILER_MARGIN
+        height = line_height*len(self.lines) + 2*PROFILER_MARGIN
+        background = pg.Surface((width, height))
+        background.set_alpha(PROFILER_BG_ALPHA)
+        surface.blit(background, (0, 0))
+        y = PROFILER_MARGIN
+        for label, avg, worst in self.lines:
+            surface.blit(label, (PROFILER_MARGIN, y))
+            surface.blit(avg, avg.get_rect(topright = (PROFILER_MARGIN + PROFILER_LABEL_WIDTH + PROFILER_COLUMN_WIDTH, y)))
+            surface.blit(worst, worst.get_rect(topright = (PROFILER_MARGIN + PROFILER_LABEL_WIDTH + PROFILER_COLUMN_WIDTH*2, y)))
+            y += line_height
@@ -0,0 +1,55 @@
+from __future__ import annotations
+from typing import Callable
+import pygame as pg
+from settings import *
+from levels import Level
+
+# Dirty-rectangle renderer for the play state. Instead of redrawing and flipping the whole window,
+# it erases the sprites drawn last frame with the background, redraws the sprites (and the HUD strip
+# only when its values change) and updates only the changed regions of the display.
+#
+# The renderer only saves work while the background is still. The background is two translucent parallax layers
+# moving at different speeds: when either moves (every 1/BG_FRONT_SPEED steps for the front layer), nearly every
+# pixel of the window changes, so the frame can't be scrolled and patched and the whole window is repainted
+# and updated. With the default settings, this is one frame out of five.
+class DirtyRenderer:
+    def __init__(self, screen: pg.Surface, draw_background: Callable[[pg.Surface], None]) -> None:
+        self.screen = screen
+        self.draw_background = draw_background          # Draws the full background (without sprites nor HUD text) to a surface
+        self.background = pg.Surface(screen.get_size()).convert()
+        self.background_key = None                      # Background state the background surface was drawn for
+        self.prev_rects: list[pg.Rect] = []             # Sprite rects drawn last frame
+        self.valid = False                              # False when the screen content is unknown and must be fully redrawn
+
+    def invalidate(self) -> None:
+        self.valid = False
+
+    def draw_level(self, level: Level, alpha: float, background_key) -> list[pg.Rect] | None:
+        # background_key: any value that changes when the background changes (e.g. its scroll offsets)
+        # Return the rects to update, or None if the whole display must be updated
+        # A background move repaints everything (see above)
+        if background_key != self.background_key:
+            self.draw_background(self.background)
+            self.background_key = background_key
+            self.valid = False
+
+        if self.valid:
+            for rect in self.prev_rects:
+                self.screen.blit(self.background, rect, rect)
+        else:
+            self.screen.blit(self.background, (0, 0))
+        stats_rects = level.draw_stats(self.screen, only_if_changed=self.valid)
+        sprite_rects = level.draw_sprites(self.screen, alpha)
+
+        dirty_rects = None
+        if self.valid:
+            dirty_rects = self.prev_rects + sprite_rects + stats_rects
+        self.prev_rects = sprite_rects
+        self.valid = True
+        return dirty_rects
+
+    def present(self, dirty_rects: list[pg.Rect] | None) -> None:
+        if dirty_rects is None:
+            pg.display.flip()
+        else:
+            pg.display.update(dirty_rects)
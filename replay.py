@@ -0,0 +1,313 @@
+from __future__ import annotations
+import os
+import argparse
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+from random import seed as seed_random
+import pygame as pg
+from settings import *
+from sprites import Player
+from inputs import InputSource, MouseKeyboardInput
+from levels import Level
+from gameclock import GameClock
+from systems import create_enemy_systems
+from collision import MaskTester
+
+# Replays. The simulation is deterministic, so a game is recorded as the RNG seed, the game time it started at
+# and the player's input (x position and fire button) for each player update. Playing the input back from the
+# same seed and time (and with the same settings) gives the same game.
+#
+# File: header, then the input stream until the end of the file
+#   header: REPLAY_MAGIC, version (B), sim rate (H), seed (Q), start time in ms (d), flags (B),
+#           spawn batch size (H), number of levels (B), level names (B length + UTF-8 each)
+#   input: runs of identical updates, each as two varints: value, count
+#          value = zigzag(x - previous x) << 1 | fire (the first x is relative to 0)
+
+REPLAY_MAGIC = b"SWRP"
+REPLAY_VERSION = 1
+HEADER_FORMAT = "<BHQdBHB"
+FLAG_ENEMY_SYSTEMS = 1
+FLAG_PRECISE_COLLISIONS = 2
+
+def get_flags() -> int:
+    return (FLAG_ENEMY_SYSTEMS if ENEMY_SYSTEMS else 0) | (FLAG_PRECISE_COLLISIONS if PRECISE_COLLISIONS else 0)
+
+def zigzag(value: int) -> int:
+    # Signed to unsigned (0, -1, 1, -2... -> 0, 1, 2, 3...), so that small deltas are small varints
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+def unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def get_replay_path() -> str:
+    return os.path.join(REPLAY_DIR, f"replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.swr")
+
+# Records a game from its first level. Creating the recorder seeds the RNG.
+# Use it as the player's input source: it reads the input from its own source (the mouse and keyboard by
+# default) and records it.
+# The file is written by a background thread, in chunks of REPLAY_CHUNK_SIZE bytes.
+class ReplayRecorder(InputSource):
+    def __init__(self, path: str, level_names: list[str], start_time: float, seed: int = None, source: InputSource = None) -> None:
+        self.path = path
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(8), "little")
+        self.source = source if source else MouseKeyboardInput()
+        self.frames = 0
+        self.prev_x = 0
+        self.run_value = None       # Value of the current run of identical updates (not written yet)
+        self.run_count = 0
+        self.buffer = bytearray()
+        self.size = 0               # Bytes handed to the writer thread
+        self.queue: queue.Queue[bytes | None] = queue.Queue()
+        self.error: Exception = None
+        seed_random(self.seed)
+
+        header = bytearray(REPLAY_MAGIC)
+        header += struct.pack(HEADER_FORMAT, REPLAY_VERSION, SIM_RATE, self.seed, start_time, get_flags(), ENEMY_SPAWN_BATCH_SIZE, len(level_names))
+        for name in level_names:
+            encoded = name.encode("utf-8")
+            header += struct.pack("<B", len(encoded)) + encoded
+        self.queue.put(bytes(header))
+        self.size += len(header)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.thread = threading.Thread(target=self.write, name="replay-writer", daemon=True)
+        self.thread.start()
+
+    def write(self) -> None:
+        # Runs on the writer thread
+        try:
+            with open(self.path, "wb") as file:
+                while True:
+                    chunk = self.queue.get()
+                    if chunk is None:
+                        return
+                    file.write(chunk)
+        except OSError as error:
+            self.error = error
+
+    def read(self) -> tuple[int, bool]:
+        x, fire = self.source.read()
+        value = zigzag(x - self.prev_x) << 1 | bool(fire)
+        self.prev_x = x
+        if value == self.run_value:
+            self.run_count += 1
+        else:
+            self.end_run()
+            self.run_value = value
+            self.run_count = 1
+        self.frames += 1
+        return x, fire
+
+    def start_level(self, level: Level, x: int) -> None:
+        self.source.start_level(level, x)
+
+    def poll_confirm(self, events: list[pg.event.Event]) -> bool:
+        return self.source.poll_confirm(events)
+
+    def end_run(self) -> None:
+        if self.run_count:
+            write_varint(self.buffer, self.run_value)
+            write_varint(self.buffer, self.run_count)
+            self.run_count = 0
+            if len(self.buffer) >= REPLAY_CHUNK_SIZE:
+                self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.queue.put(bytes(self.buffer))
+            self.size += len(self.buffer)
+            self.buffer.clear()
+
+    def close(self) -> None:
+        # Write what is left and wait for the writer thread
+        self.end_run()
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        if self.error:
+            print(f"WARNING: could not write the replay {self.path}: {self.error}")
+        elif DEBUG:
+            print(f"REPLAY: {self.path} ({self.frames} updates in {self.size} bytes)")
+
+class Replay:
+    def __init__(self, seed: int, start_time: float, flags: int, spawn_batch_size: int, level_names: list[str], inputs: list[tuple[int, bool]]) -> None:
+        self.seed = seed
+        self.start_time = start_time
+        self.flags = flags
+        self.spawn_batch_size = spawn_batch_size
+        self.level_names = level_names
+        self.inputs = inputs        # (x, fire) of each player update
+
+def load_replay(path: str) -> Replay:
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+        raise ValueError(f"{path} is not a replay")
+    offset = len(REPLAY_MAGIC)
+    version, sim_rate, seed, start_time, flags, spawn_batch_size, nbr_levels = struct.unpack_from(HEADER_FORMAT, data, offset)
+    if version != REPLAY_VERSION or sim_rate != SIM_RATE:
+        raise ValueError(f"{path} was recorded with another version or simulation rate")
+    offset += struct.calcsize(HEADER_FORMAT)
+    level_names = []
+    for _ in range(nbr_levels):
+        length = data[offset]
+        level_names.append(data[offset + 1:offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    inputs = []
+    x = 0
+    while offset < len(data):
+        value, offset = read_varint(data, offset)
+        count, offset = read_varint(data, offset)
+        delta = unzigzag(value >> 1)
+        fire = bool(value & 1)
+        if delta:
+            for _ in range(count):
+                x += delta
+                inputs.append((x, fire))
+        else:
+            inputs.extend([(x, fire)] * count)
+    return Replay(seed, start_time, flags, spawn_batch_size, level_names, inputs)
+
+# Input source that plays the input of a replay back
+class ReplayInput(InputSource):
+    def __init__(self, inputs: list[tuple[int, bool]]) -> None:
+        self.inputs = inputs
+        self.index = 0
+
+    @property
+    def done(self) -> bool:
+        return self.index >= len(self.inputs)
+
+    def read(self) -> tuple[int, bool]:
+        if self.done:
+            return self.inputs[-1][0] if self.inputs else GAME_WIDTH//2, False
+        self.index += 1
+        return self.inputs[self.index - 1]
+
+def play(replay: Replay, screen: pg.Surface = None) -> dict:
+    # Play a replay like the game loop of main.py does. If screen is given, each update is drawn to it in real
+    # time. Otherwise, it runs as fast as possible without rendering.
+    levels = Level.all_levels
+    if replay.level_names != [level.data_name for level in levels]:
+        raise ValueError(f"The replay was recorded with the levels {replay.level_names}")
+    if replay.spawn_batch_size != ENEMY_SPAWN_BATCH_SIZE:
+        print(f"WARNING: the replay was recorded with ENEMY_SPAWN_BATCH_SIZE = {replay.spawn_batch_size}")
+    for level in levels:
+        level.systems = create_enemy_systems(level.clock) if replay.flags & FLAG_ENEMY_SYSTEMS else {}
+        level.mask_tester = MaskTester() if replay.flags & FLAG_PRECISE_COLLISIONS else None
+    seed_random(replay.seed)
+    clock = GameClock.instance()
+    clock.time = replay.start_time
+    display_clock = pg.time.Clock()
+    background = None
+    if screen:
+        from background import Background
+        background = Background()
+
+    level_idx = 0
+    levels[level_idx].start()
+    player = Player.instance()
+    player.reset()
+    prev_input = player.input
+    player.input = replay_input = ReplayInput(replay.inputs)
+    playing = True
+    level_cleared_timer = 0
+    outcome = None
+    wall_start = time.perf_counter()
+    start_time = clock.time
+    while not outcome:
+        # Same steps as handle_events() and update_game() in main.py
+        for event in pg.event.get():
+            if event.type == LEVEL_CLEARED:
+                levels[level_idx].clear()
+                playing = False
+                level_cleared_timer = clock.ticks()
+            elif event.type == LEVEL_GAME_OVER:
+                outcome = "game_over"
+            elif event.type == pg.QUIT:
+                outcome = "quit"
+        if outcome:
+            break
+        if playing:
+            if replay_input.done:
+                outcome = "ended"   # The recording stopped during the level
+                break
+            levels[level_idx].update()
+        elif (clock.ticks() - level_cleared_timer) >= (LEVEL_CLEARED_DURATION*1000):
+            level_idx += 1
+            if level_idx >= len(levels):
+                outcome = "game_cleared"
+                break
+            levels[level_idx].start()
+            playing = True
+        clock.advance()
+        if screen:
+            background.update()
+            background.draw(screen)
+            if playing:
+                levels[level_idx].draw(screen)
+            pg.draw.line(screen, "white", (GAME_WIDTH+1,0), (GAME_WIDTH+1,WIN_HEIGHT))
+            pg.display.flip()
+            display_clock.tick(SIM_RATE)
+    wall_time = time.perf_counter() - wall_start
+    level_idx = min(level_idx, len(levels) - 1)
+    levels[level_idx].clear()
+    player.input = prev_input
+    sim_time = (clock.time - start_time) / 1000
+    return {
+        "outcome": outcome,
+        "level": levels[level_idx].level_nbr,
+        "score": player.score,
+        "lives": player.lives,
+        "updates": replay_input.index,
+        "sim_time": sim_time,
+        "wall_time": wall_time,
+        "speed": sim_time / wall_time if wall_time else 0.0,    # Simulated seconds per wall-clock second
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Play a {GAME_TITLE} replay back.")
+    parser.add_argument("path", help="replay file (see REPLAY_RECORDING)")
+    parser.add_argument("--visual", action="store_true", help="draw the game in a window, in real time (default: as fast as possible, without rendering)")
+    args = parser.parse_args()
+
+    replay = load_replay(args.path)
+    if args.visual:
+        from audio import Audio
+        from assets import AssetStore
+        pg.init()
+        screen = pg.display.set_mode((WIN_WIDTH,WIN_HEIGHT))
+        pg.display.set_caption(f"{GAME_TITLE} - {os.path.basename(args.path)}")
+        Audio.disable()
+        AssetStore.instance().preload()
+    else:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        from headless import init_headless
+        init_headless()
+        screen = None
+    result = play(replay, screen)
+    print(f"Replay: {result['outcome']} on level {result['level']} (score: {result['score']}, lives: {result['lives']})")
+    print(f"Played {result['updates']} updates ({result['sim_time']:.1f} s) in {result['wall_time']:.2f} s ({result['speed']:.1f} simulated s per wall s)")
+    pg.quit()
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from pygame import event
+from pygame import event, K_F3, K_F5, K_F9, K_LEFT, K_RIGHT, K_a, K_d, K_SPACE, K_RETURN
 
 DEBUG = False
 
@@ -15,7 +15,13 @@ GAME_OVER_TEXT = "GAME OVER"
 GAME_OVER_SUBTITLE = "-- left-click to restart --"
 GAME_CLEARED_TEXT = "GAME CLEARED"
 GAME_CLEARED_SUBTITLE = "-- left-click to restart --"
-FRAME_RATE = 60
+LOADING_TEXT = "Loading"
+LOADING_TEXT_OFFSET = 20        # Distance between the loading text and the bottom of the window
+FRAME_RATE = 60                 # Maximum number of rendered frames per second (can be raised for high refresh rate displays)
+SIM_RATE = 60                   # Number of simulation steps per second (all speeds are given in pixels per step)
+SIM_MAX_STEPS_PER_FRAME = 5     # Maximum number of catch-up steps per rendered frame (the game slows down beyond this)
+INTERPOLATION_MAX_DISTANCE = 32 # Sprites moving further than this in one step are drawn without interpolation
+DIRTY_RECT_RENDERING = False    # Only redraw and update the screen regions that changed during play. Only pays off between background moves (see render.py)
 
 TITLE_FONT_PATH = "./assets/font/Pixeltype.ttf"
 TITLE_FONT_SIZE = 30
@@ -34,12 +40,15 @@ BG_BACK_PATH = "./assets/img/bg_space_back.png"
 BG_FRONT_PATH = "./assets/img/bg_space_front.png"
 BG_FRONT_SPEED = 0.2
 BG_BACK_POS_RATIO = 0.5         # Between 0 & 1. Low values produces a strong parallax effect
+BG_ALPHA = 100                  # Opacity of the background layers (0-255)
+BG_CACHE_SIZE = 4               # Maximum number of composited backgrounds kept
 
 # STATS
 STATS_LEFT = 10
 STATS_HEIGHT = 100
 STATS_CENTERY = WIN_HEIGHT//2
 STATS_LEN = 4                   # Number of stats to show
+TEXT_CACHE_CAPACITY = 64        # Maximum number of rendered texts kept in the text cache
 
 # GAME STATE
 STATE_START = 0
@@ -52,11 +61,67 @@ LEVEL_CLEARED_DURATION = 1.5
 LEVEL_START_TITLE_DURATION = 2.5
 
 # LEVEL EVENTS
-LEVEL_NEXT_WAVE = event.custom_type()
 LEVEL_CLEARED = event.custom_type()
 LEVEL_GAME_OVER = event.custom_type()
 
+# HEADLESS SIMULATION
+HEADLESS_MAX_LEVEL_TIME = 300   # Simulated seconds after which a level is abandoned
+
+# REPLAY
+REPLAY_RECORDING = False        # Record every game to REPLAY_DIR (play it back with replay.py)
+REPLAY_DIR = "./replays"
+REPLAY_CHUNK_SIZE = 4096        # Bytes of input buffered before they are handed to the writer thread
+
+# BATCH SIMULATION
+BATCH_GAMES = 100               # Games played for each set of parameter overrides
+BATCH_SEED = 0                  # Game i of a set is seeded with BATCH_SEED + i (the same seeds for every set)
+BATCH_OUTPUT = "./batch_results.csv"
+
+# SNAPSHOT
+SNAPSHOT_SAVE_KEY = K_F5        # Save a checkpoint of the level being played (see snapshot.py)
+SNAPSHOT_RESTORE_KEY = K_F9     # Go back to the last checkpoint
+SNAPSHOT_PATH = "./snapshots/checkpoint.sws" # The checkpoints are also written there (see benchmark.py --snapshot). None: memory only
+
+# PROFILER
+PROFILER_KEY = K_F3             # Key toggling the profiler overlay
+PROFILER_WINDOW = 120           # Number of frames used for the averages and worst times
+PROFILER_REFRESH_FRAMES = 15    # The overlay text is re-rendered every N frames
+PROFILER_FONT_SIZE = 18
+PROFILER_COLOR = "yellow"
+PROFILER_BG_ALPHA = 180
+PROFILER_MARGIN = 4
+PROFILER_LABEL_WIDTH = 110      # Width of the phase name column
+PROFILER_COLUMN_WIDTH = 45      # Width of the time columns
+
+# TELEMETRY
+TELEMETRY_ENABLED = True        # Record the timing of every frame and write a summary of the session on exit (see telemetry.py)
+TELEMETRY_DIR = "./telemetry"
+TELEMETRY_CAPACITY = 2**16      # Frames kept (the oldest are overwritten: about 18 minutes at 60 FPS)
+TELEMETRY_BUDGET_MS = 1000 / FRAME_RATE # Frames whose work (update, draw and present) takes longer are over budget
+TELEMETRY_WORST_WAVES = 5       # Waves listed in the summary (highest p99 work time first)
+
+# BENCHMARK
+BENCHMARK_SEED = 0
+BENCHMARK_FRAMES = 600              # Measured frames per scenario
+BENCHMARK_WARMUP_FRAMES = 120       # Frames run before measuring (lets the enemies finish their entrance)
+BENCHMARK_MICRO_CALLS = 500         # Measured calls per microbenchmark
+BENCHMARK_NBR_PARASITES = 45
+BENCHMARK_NBR_GEARS = 4
+BENCHMARK_NBR_HORDE = 300           # Parasites in the enemy update microbenchmarks
+BENCHMARK_NBR_BULLETS = 300         # Bullets per side in the microbenchmarks
+BENCHMARK_INVINCIBLE_LIVES = 10**9  # Lives given to the player and enemies so that the load stays constant
+BENCHMARK_PEAK_LEVEL = 3            # Level whose heaviest moment (most enemies and bullets) the "peak" scenario starts from
+BENCHMARK_REPEATS = 5               # Runs of each benchmark (see combine_runs() in benchmark.py)
+BENCHMARK_TOLERANCE = 0.1           # Allowed slowdown against the baseline (0.1 = 10%)
+BENCHMARK_MAX_TOLERANCE = 0.25      # Cap of the allowed slowdown, even if a larger one is asked for (--tolerance)
+
+# COLLISION
+COLLISION_CELL_SIZE = 32        # Cell size (in pixels) of the broadphase grid
+PRECISE_COLLISIONS = False      # Confirm the hits found with rects using the masks of the images (see collision.py)
+
 # LEVEL SETTINGS
+LEVEL_DATA_DIR = "./assets/levels"
+LEVEL_NAMES = ["level1", "level2", "level3"]    # Levels in the order they are played (see leveldata.py)
 LEVEL_MAX_POWER_UPS = {
     1: 0,
     2: 1,
@@ -76,10 +141,13 @@ BULLET1_DAMAGE = 2
 
 BULLET_LEVEL_3_SPREAD = 12
 
+BULLET_STORE_CAPACITY = 256    # Initial number of slots of a bullet store (doubles when full)
+
 # COLLECTIBLE
 COLLECTIBLE_SPEED = 1
 COLLECTIBLE_BASE_SCORE = 20
 COLLECTIBLE_PROBABILITY = 0.35
+COLLECTIBLE_IMG_SCALE = 0.7
 
 EXTRA_SCORE_10_IMG_PATH = "./assets/img/collect_extra_score_10.png"
 
@@ -87,18 +155,38 @@ POWER_UP_IMG_PATH = "./assets/img/collect_power_up.png"
 POWER_UP_PROBABILITY = 0.3
 POWER_UP_SCORE = 10
 
+COLLECTIBLE_POOL_CAPACITY = 16  # Maximum number of free collectibles kept per collectible type
+
 # PLAYER
 PLAYER_IMG_PATH = "./assets/img/player.png"
 PLAYER_HEIGHT = 10
 PLAYER_FIRE_DELAY = 0.3
 PLAYER_LIVES = 3
 PLAYER_HIT_DURATION = 0.5
+HIT_ALPHA = 125                 # Opacity (0-255) of the player and the enemies while hit
+
+# INPUT
+INPUT_SOURCE = "mouse"          # Player input in the game: "mouse" (mouse and keyboard) or "autopilot" (plays by itself)
+INPUT_KEY_SPEED = 8             # px the player moves per update while a move key is held
+INPUT_LEFT_KEYS = (K_LEFT, K_a)
+INPUT_RIGHT_KEYS = (K_RIGHT, K_d)
+INPUT_FIRE_KEYS = (K_SPACE,)
+INPUT_CONFIRM_KEYS = (K_RETURN,) # Start a game or leave the end screens (like a left click)
+AUTOPILOT_SPEED = 8             # Maximum px the autopilot moves the player per update
+AUTOPILOT_CANDIDATES = 12       # Positions scored on each side of the player (every AUTOPILOT_SPEED px)
+AUTOPILOT_LOOKAHEAD = 40        # Updates ahead the autopilot looks for bullets and enemies hitting the player
+AUTOPILOT_MARGIN = 4            # px kept between the player and the threats
+AUTOPILOT_TRACK_WEIGHT = 0.5    # Preference for the positions under the lowest enemy (a threat costs up to 1)
 
 # ENEMY
 ENEMY_STATE_ENTRANCE = 0    # State when the enemy is entering the scene
 ENEMY_STATE_ACTION = 1      # State when the enemy is acting normally (after entrance)
 
 ENEMY_ENTRANCE_SPEED = 3
+ENEMY_POOL_CAPACITY = 48      # Maximum number of free enemies kept per enemy type
+ENEMY_SPAWN_BATCH_SIZE = 0    # Maximum number of enemies spawned per frame (0 = whole waves in one frame)
+ENEMY_SYSTEMS = False         # Update the parasites, gears and beasts by kind with NumPy (see systems.py)
+ENEMY_SYSTEM_CAPACITY = 64    # Initial number of enemies per system (grows as needed)
 ENEMY_HIT_DURATION = 0.2
 
 ENEMY_PARASITE_IMG_PATH = "./assets/img/enemy_parasite.png"
@@ -133,6 +221,7 @@ ENEMY_GEAR_WAVE_FREQ = 3        # Wave frequency in rads
 ENEMY_GEAR_NBR_BULLETS = 16     # Number of bullets fired at once
 
 ENEMY_BEAST_IMG_PATH = "./assets/img/enemy_beast.png"
+ENEMY_BEAST_IMG_SCALE = 2
 ENEMY_BEAST_FIRE_START_TIME = 2.5
 ENEMY_BEAST_FIRE_STOP_TIME = 3.5
 ENEMY_BEAST_FIRE_DELAY = 0.3
@@ -172,4 +261,31 @@ PARASITE_BULLET_SOUND_PATH = "./assets/audio/enemy_parasite_bullet.wav"
 FLOODER_BULLET_SOUND_PATH = "./assets/audio/enemy_flooder_bullet.wav"
 GEAR_BULLET_SOUND_PATH = "./assets/audio/enemy_gear_bullet.wav"
 BEAST_BULLET_SOUND_PATH = "./assets/audio/enemy_beast_bullet.wav"
-ENEMY_DEATH_SOUND_PATH = "./assets/audio/enemy_death.wav"
\ No newline at end of file
+ENEMY_DEATH_SOUND_PATH = "./assets/audio/enemy_death.wav"
+
+AUDIO_NBR_VOICES = 20           # Number of mixer channels shared by all the sound effects
+AUDIO_RATE_WINDOW = 1           # Time window (in s) of the played/culled sounds per second counters
+
+SOUND_PRIORITY_LOW = 0          # Enemy fire
+SOUND_PRIORITY_NORMAL = 1       # Player fire & collectibles
+SOUND_PRIORITY_HIGH = 2         # Player hit & death, enemy death & menu sounds
+
+# Playback rules of each sound: (priority, cooldown in s, maximum number of instances playing at once)
+# A sound requested during its cooldown is culled. A sound playing too many instances restarts its oldest one.
+# If all the voices are busy, the oldest voice with the lowest priority (not above the sound's) is stolen.
+SOUND_RULES = {
+    "click": (SOUND_PRIORITY_HIGH, 0, 1),
+    "game_cleared": (SOUND_PRIORITY_HIGH, 0, 1),
+    "bullet0": (SOUND_PRIORITY_NORMAL, 0.05, 2),
+    "bullet1": (SOUND_PRIORITY_NORMAL, 0.05, 2),
+    "bullet2": (SOUND_PRIORITY_NORMAL, 0.05, 2),
+    "player_hit": (SOUND_PRIORITY_HIGH, 0, 1),
+    "player_death": (SOUND_PRIORITY_HIGH, 0, 1),
+    "extra_score": (SOUND_PRIORITY_NORMAL, 0, 2),
+    "power_up": (SOUND_PRIORITY_NORMAL, 0, 2),
+    "parasite_bullet": (SOUND_PRIORITY_LOW, 0.1, 2),
+    "flooder_bullet": (SOUND_PRIORITY_LOW, 0.1, 1),
+    "gear_bullet": (SOUND_PRIORITY_LOW, 0.1, 2),
+    "beast_bullet": (SOUND_PRIORITY_LOW, 0.1, 1),
+    "enemy_death": (SOUND_PRIORITY_HIGH, 0.05, 2),
+}
\ No newline at end of file
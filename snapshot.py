@@ -0,0 +1,262 @@
+from __future__ import annotations
+import os
+import struct
+from random import getstate, setstate
+import numpy as np
+from settings import *
+from sprites import Enemy, Parasite, FlooderDown, FlooderU, Gear, Beast, Collectible, ExtraScore10, PowerUp, ENEMY_TYPES
+from levels import Level
+from bullets import BulletStore
+
+# Snapshots of the world while a level is played: the level's enemies, bullets, collectibles, timeline and
+# spawn queue, the player and the RNG state, in a compact binary blob. Restoring one puts the world back in
+# that state (checkpoints, rewind, benchmarks starting from a given moment).
+# The timers are saved relative to the game time: a snapshot is restored at the current game time (the clock
+# is not rewound). Enemy systems write their state back to the enemies first (see EnemySystem.sync()).
+# A snapshot is only valid for the game version and the level data it was taken with.
+#
+# Blob: SNAPSHOT_MAGIC, header, then each section in this order
+#   header: version (B), sim rate (H), level index (B), number of extra timers (B) and the timers (d each)
+#   rng: Mersenne Twister state (625 I), whether a gauss value is pending (B), gauss value (d)
+#   timeline: time (d), last ticks (d), paused (B), time scale (d), number of waves left (H), their times in ms (d each)
+#   spawn queue: number of enemies (H), then the time in ms (d) of their wave and their index in it (H)
+#   player: left, top, previous left, previous top (i), fire and hit timers (d), bullet level (B), lives (i), score (q)
+#   enemies: power up count (H), number of enemies (H), then for each enemy in the level's order: type (B),
+#            slot in its system (h, -1 if none), ENEMY_FIELDS and its type's fields (d each)
+#   collectibles: number of collectibles (H), then type (B), left, top, previous left, previous top (i) each
+#   bullet images: number of images (B), then the path of each image (B length + UTF-8)
+#   bullets: for the player's then the enemies' store, number of bullets (I) then the arrays of BulletStore (raw)
+
+SNAPSHOT_MAGIC = b"SWSS"
+SNAPSHOT_VERSION = 1
+HEADER_FORMAT = "<BHBB"
+RNG_FORMAT = "<625IBd"
+TIMELINE_FORMAT = "<ddBdH"
+PLAYER_FORMAT = "<iiiiddBiq"
+COLLECTIBLE_FORMAT = "<Biiii"
+ENEMY_HEADER_FORMAT = "<Bh"
+
+# Fields of every enemy, then the fields of each type. The timers (and entrance_end_time) are game times.
+ENEMY_FIELDS = ("left", "top", "prev_left", "prev_top", "final_left", "final_top",
+                "state", "lives", "fire_timer", "hit_timer", "entrance_end_time")
+ENEMY_TYPE_FIELDS: dict[type[Enemy], tuple[str, ...]] = {
+    Parasite: ("direction", "top", "curr_fire_delay"),
+    FlooderDown: ("fire_start_timer", "fire_stop_timer", "move_down_timer"),
+    FlooderU: ("direction", "move_down_timer"),
+    Gear: ("direction", "curr_image_idx", "animation_timer"),
+    Beast: ("fire_start_timer", "fire_stop_timer"),
+}
+INT_FIELDS = {"direction", "curr_image_idx"}
+ENEMY_TYPE_IDS = {enemy_class: enemy_type for enemy_type, enemy_class in ENEMY_TYPES.items()}
+ENEMY_STRUCTS = {enemy_class: struct.Struct(f"<{len(ENEMY_FIELDS) + len(fields)}d") for enemy_class, fields in ENEMY_TYPE_FIELDS.items()}
+COLLECTIBLE_TYPES: list[type[Collectible]] = [ExtraScore10, PowerUp]
+
+def pack_enemy(buffer: bytearray, enemy: Enemy, now: int) -> None:
+    enemy_class = type(enemy)
+    values = [enemy.rect.left, enemy.rect.top, *enemy.prev_pos, *enemy.final_top_pos, enemy.state, enemy.lives,
+              enemy.fire_timer - now, enemy.hit_timer - now, enemy.entrance_end_time - now]
+    for name in ENEMY_TYPE_FIELDS[enemy_class]:
+        value = getattr(enemy, name)
+        values.append(value - now if name.endswith("_timer") else value)
+    buffer += struct.pack(ENEMY_HEADER_FORMAT, ENEMY_TYPE_IDS[enemy_class], enemy.slot if enemy.system is not None else -1)
+    buffer += ENEMY_STRUCTS[enemy_class].pack(*values)
+
+def unpack_enemy(data: bytes, offset: int, level: Level, now: int) -> tuple[Enemy, int, int]:
+    # Return the enemy (not inserted in the level yet), its slot in its system and the offset after it
+    enemy_type, slot = struct.unpack_from(ENEMY_HEADER_FORMAT, data, offset)
+    offset += struct.calcsize(ENEMY_HEADER_FORMAT)
+    enemy_class = ENEMY_TYPES[enemy_type]
+    enemy_struct = ENEMY_STRUCTS[enemy_class]
+    values = enemy_struct.unpack_from(data, offset)
+    offset += enemy_struct.size
+    left, top, prev_left, prev_top, final_left, final_top, state, lives, fire_timer, hit_timer, entrance_end_time = values[:len(ENEMY_FIELDS)]
+    enemy = enemy_class.pool.acquire()
+    enemy.clock = level.clock
+    enemy.final_top_pos = (int(final_left), int(final_top))
+    enemy.state = int(state)
+    enemy.lives = int(lives)
+    enemy.fire_timer = now + fire_timer
+    enemy.hit_timer = now + hit_timer
+    enemy.entrance_end_time = int(now + entrance_end_time)
+    for name, value in zip(ENEMY_TYPE_FIELDS[enemy_class], values[len(ENEMY_FIELDS):]):
+        if name.endswith("_timer"):
+            value += now
+        elif name in INT_FIELDS:
+            value = int(value)
+        setattr(enemy, name, value)
+    if enemy_class is Gear:
+        enemy.variants = enemy.frames[enemy.curr_image_idx]
+    enemy.update_image()
+    enemy.rect = enemy.image.get_rect(topleft = (int(left), int(top)))
+    enemy.prev_pos = (int(prev_left), int(prev_top))
+    return enemy, slot, offset
+
+def take_snapshot(level: Level, extra_timers: tuple[float, ...] = ()) -> bytes:
+    # extra_timers: game times of the caller (e.g. the level title timer of main.py), given back by restore_snapshot()
+    clock = level.clock
+    now = clock.ticks()
+    buffer = bytearray(SNAPSHOT_MAGIC)
+    buffer += struct.pack(HEADER_FORMAT, SNAPSHOT_VERSION, SIM_RATE, Level.all_levels.index(level), len(extra_timers))
+    buffer += struct.pack(f"<{len(extra_timers)}d", *(timer - now for timer in extra_timers))
+
+    _, mt_state, gauss_next = getstate()
+    buffer += struct.pack(RNG_FORMAT, *mt_state, gauss_next is not None, gauss_next or 0.0)
+
+    timeline = level.timeline
+    wave_times = [entry[0] for entry in sorted(timeline.queue, key=lambda entry: entry[1])]   # In scheduling order
+    buffer += struct.pack(TIMELINE_FORMAT, timeline.time, timeline.last_ticks - now, timeline.paused, timeline.time_scale, len(wave_times))
+    buffer += struct.pack(f"<{len(wave_times)}d", *wave_times)
+
+    # The spawn queue holds the spawn tuples of the waves (see WavePrefab)
+    buffer += struct.pack("<H", len(level.spawn_queue))
+    if level.spawn_queue:
+        spawn_ids = {id(spawn): (wave.time*1000, i) for wave in level.waves.values() for i, spawn in enumerate(wave.spawns)}
+        for spawn in level.spawn_queue:
+            buffer += struct.pack("<dH", *spawn_ids[id(spawn)])
+
+    player = level.player.sprite
+    buffer += struct.pack(PLAYER_FORMAT, *player.rect.topleft, *player.prev_pos, player.fire_timer - now, player.hit_timer - now,
+                          player.bullet_level, player.lives, player.score)
+
+    for system in level.systems.values():
+        system.sync()
+    buffer += struct.pack("<HH", level.power_up_count, len(level.enemies))
+    for enemy in level.enemies:
+        pack_enemy(buffer, enemy, now)
+
+    buffer += struct.pack("<H", len(level.collectibles))
+    for collectible in level.collectibles:
+        buffer += struct.pack(COLLECTIBLE_FORMAT, COLLECTIBLE_TYPES.index(type(collectible)), *collectible.rect.topleft, *collectible.prev_pos)
+
+    # Image ids depend on the order the images were first used in: the paths are saved to map them back
+    buffer += struct.pack("<B", len(BulletStore.image_ids))
+    for path in BulletStore.image_ids:
+        encoded = path.encode("utf-8")
+        buffer += struct.pack("<B", len(encoded)) + encoded
+    for store in (level.player_bullets, level.enemy_bullets):
+        buffer += struct.pack("<I", store.count)
+        for array in store.get_arrays():
+            buffer += array[:store.count].tobytes()
+    return bytes(buffer)
+
+def clear_world(level: Level) -> None:
+    # Remove the enemies, bullets, collectibles and scheduled waves of a started level
+    level.kill_enemies()
+    level.player_bullets.empty()
+    level.enemy_bullets.empty()
+    for collectible in level.collectibles.sprites():
+        collectible.kill()
+    level.spawn_queue.clear()
+    level.timeline.clear()
+
+def restore_snapshot(data: bytes) -> tuple[Level, tuple[float, ...]]:
+    # Put the world back in the state of a snapshot, at the current game time. The level of the snapshot is
+    # started if needed (and any other started level is cleared).
+    # Return the level and the extra timers given to take_snapshot().
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError("Not a snapshot")
+    offset = len(SNAPSHOT_MAGIC)
+    version, sim_rate, level_idx, nbr_timers = struct.unpack_from(HEADER_FORMAT, data, offset)
+    if version != SNAPSHOT_VERSION or sim_rate != SIM_RATE:
+        raise ValueError("The snapshot was taken with another version or simulation rate")
+    offset += struct.calcsize(HEADER_FORMAT)
+    level = Level.all_levels[level_idx]
+    for other in Level.all_levels:
+        if other is not level and other.waves:
+            other.clear()
+    if not level.waves:
+        level.start()
+    clear_world(level)
+    clock = level.clock
+    now = clock.ticks()
+    extra_timers = tuple(now + timer for timer in struct.unpack_from(f"<{nbr_timers}d", data, offset))
+    offset += 8*nbr_timers
+
+    *mt_state, has_gauss, gauss_next = struct.unpack_from(RNG_FORMAT, data, offset)
+    offset += struct.calcsize(RNG_FORMAT)
+    setstate((3, tuple(mt_state), gauss_next if has_gauss else None))
+
+    timeline = level.timeline
+    timeline.time, last_ticks, paused, timeline.time_scale, nbr_waves = struct.unpack_from(TIMELINE_FORMAT, data, offset)
+    offset += struct.calcsize(TIMELINE_FORMAT)
+    timeline.last_ticks = now + last_ticks
+    timeline.paused = bool(paused)
+    waves = {wave.time*1000: wave for wave in level.waves.values()}
+    for wave_time in struct.unpack_from(f"<{nbr_waves}d", data, offset):
+        level.schedule_wave(waves[wave_time])
+    offset += 8*nbr_waves
+
+    nbr_spawns, = struct.unpack_from("<H", data, offset)
+    offset += 2
+    for _ in range(nbr_spawns):
+        wave_time, i = struct.unpack_from("<dH", data, offset)
+        level.spawn_queue.append(waves[wave_time].spawns[i])
+        offset += struct.calcsize("<dH")
+
+    player = level.player.sprite
+    left, top, prev_left, prev_top, fire_timer, hit_timer, player.bullet_level, player.lives, player.score = struct.unpack_from(PLAYER_FORMAT, data, offset)
+    offset += struct.calcsize(PLAYER_FORMAT)
+    player.rect.topleft = (left, top)
+    player.prev_pos = (prev_left, prev_top)
+    player.fire_timer = now + fire_timer
+    player.hit_timer = now + hit_timer
+    player.image = player.variants[1 if (now - player.hit_timer) < (PLAYER_HIT_DURATION*1000) else 0]
+    player.input.start_level(level, player.rect.centerx)
+
+    # The enemies are added to the level in their order, then to their system in their slot order (and numbered
+    # in their order again), so that they are updated (and fire, and consume random numbers) in the same order
+    # as before
+    level.power_up_count, nbr_enemies = struct.unpack_from("<HH", data, offset)
+    offset += 4
+    system_slots = []
+    for _ in range(nbr_enemies):
+        enemy, slot, offset = unpack_enemy(data, offset, level, now)
+        level.enemies.add(enemy)
+        if slot >= 0:
+            system_slots.append((slot, enemy))
+        else:
+            level.sprite_enemies.add(enemy)
+    for slot, enemy in sorted(system_slots, key=lambda item: item[0]):
+        level.systems[type(enemy)].add(enemy)
+    for system in level.systems.values():
+        system.set_spawn_order(level.enemies.sprites())
+
+    nbr_collectibles, = struct.unpack_from("<H", data, offset)
+    offset += 2
+    for _ in range(nbr_collectibles):
+        collectible_type, left, top, prev_left, prev_top = struct.unpack_from(COLLECTIBLE_FORMAT, data, offset)
+        offset += struct.calcsize(COLLECTIBLE_FORMAT)
+        collectible = COLLECTIBLE_TYPES[collectible_type].acquire((0, 0))
+        collectible.rect.topleft = (left, top)
+        collectible.prev_pos = (prev_left, prev_top)
+        level.collectibles.add(collectible)
+
+    nbr_images = data[offset]
+    offset += 1
+    image_ids = []
+    for _ in range(nbr_images):
+        length = data[offset]
+        image_ids.append(BulletStore.get_image_id(data[offset + 1:offset + 1 + length].decode("utf-8")))
+        offset += 1 + length
+    image_ids = np.array(image_ids, dtype=np.int32)
+    for store in (level.player_bullets, level.enemy_bullets):
+        count, = struct.unpack_from("<I", data, offset)
+        offset += 4
+        while store.capacity < count:
+            store.allocate(store.capacity * 2)
+        for array in store.get_arrays():
+            size = count * array.itemsize
+            array[:count] = np.frombuffer(data, dtype=array.dtype, count=count, offset=offset)
+            offset += size
+        store.image_id[:count] = image_ids[store.image_id[:count]]
+        store.count = count
+    return level, extra_timers
+
+def write_snapshot(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+
+def read_snapshot(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
@@ -1,57 +1,81 @@
 from __future__ import annotations
+import copy
+from typing import Callable
 import pygame as pg
 from settings import *
 from audio import Audio
-from random import random
-from math import cos, sin, pi
-
-# Base class for bullets
-class Bullet(pg.sprite.Sprite):
-    images: dict[str, pg.Surface] = {}
-    def __init__(self, img_path: str, start_pos: tuple, direction: pg.Vector2 | int, speed: float, damage: int) -> None:
-        super().__init__()
-        if not img_path in Bullet.images.keys():
-            Bullet.images[img_path] = pg.image.load(img_path).convert_alpha()
-        self.image = Bullet.images[img_path]
-        self.rect = self.image.get_rect(center = start_pos)
-        self.damage = damage
-        self.pos = start_pos
-
-        # Set direction (if int: -1 = down, 1 = up) (if Vector2: normalize and assign)
+from pools import Pool
+from assets import AssetStore
+from bullets import BulletStore
+from gameclock import GameClock
+from trajectory import FLOODER_U_PATH, BEAST_CIRCLE, get_ring_velocities
+from inputs import InputSource, MouseKeyboardInput
+from random import random, getstate as get_random_state, setstate as set_random_state
+from math import sin, sqrt
+
+# Bullet types. A shot is emitted straight into a BulletStore (see bullets.py), which holds the state of all
+# the bullets: there are no bullet objects. The settings of the type are read on each shot.
+class Bullet:
+    @staticmethod
+    def emit(bullets: BulletStore, start_pos: tuple, direction: tuple | int, img_path: str, speed: float, damage: int) -> None:
+        # Set velocity from direction (if int: -1 = down, 1 = up) (if (dx, dy): normalize and scale by speed,
+        # with the same operations as pg.Vector2.normalize(), without creating vectors)
         if isinstance(direction, int):
             assert direction != 0, "Bullet direction cannot be zero"
-            self.direction = pg.Vector2(0, -direction).normalize()
+            vx = 0.0
+            vy = -speed if direction > 0 else speed
         else:
-            self.direction = direction.normalize()
-        self.speed = speed
+            dx, dy = direction
+            length = sqrt(dx*dx + dy*dy)
+            assert length != 0, "Bullet direction cannot be zero"
+            vx = dx / length * speed
+            vy = dy / length * speed
+        bullets.emit(start_pos[0], start_pos[1], vx, vy, damage, BulletStore.get_image_id(img_path))
 
-    def update(self) -> None:
-        self.pos += self.direction * self.speed
-        self.rect.center = self.pos
-        if self.rect.left > GAME_WIDTH or self.rect.right < 0 or self.rect.top > WIN_HEIGHT or self.rect.bottom < 0:
-            self.kill()
+    @staticmethod
+    def emit_ring(bullets: BulletStore, center: tuple, count: int, img_path: str, speed: float, damage: int) -> None:
+        # Fire count bullets in all directions at once (see get_ring_velocities())
+        vx, vy = get_ring_velocities(count, speed)
+        bullets.emit_many(center[0], center[1], vx, vy, damage, BulletStore.get_image_id(img_path))
 
 # Bullet 0
 class Bullet0(Bullet):
-    def __init__(self, start_pos: tuple, direction: pg.Vector2 | int) -> None:
-        super().__init__(BULLET0_IMG_PATH, start_pos, direction, BULLET0_SPEED, BULLET0_DAMAGE)
+    @staticmethod
+    def fire(bullets: BulletStore, start_pos: tuple, direction: tuple | int) -> None:
+        Bullet.emit(bullets, start_pos, direction, BULLET0_IMG_PATH, BULLET0_SPEED, BULLET0_DAMAGE)
 
 # Bullet 1
 class Bullet1(Bullet):
-    def __init__(self, start_pos: tuple, direction: pg.Vector2 | int) -> None:
-        super().__init__(BULLET1_IMG_PATH, start_pos, direction, BULLET1_SPEED, BULLET1_DAMAGE)
+    @staticmethod
+    def fire(bullets: BulletStore, start_pos: tuple, direction: tuple | int) -> None:
+        Bullet.emit(bullets, start_pos, direction, BULLET1_IMG_PATH, BULLET1_SPEED, BULLET1_DAMAGE)
+
+    @staticmethod
+    def fire_ring(bullets: BulletStore, center: tuple, count: int) -> None:
+        Bullet.emit_ring(bullets, center, count, BULLET1_IMG_PATH, BULLET1_SPEED, BULLET1_DAMAGE)
 
 # Base class for collectibles
+# Use acquire() to get a collectible from the pool of its type. kill() releases it back to the pool.
 class Collectible(pg.sprite.Sprite):
-    images: dict[str, pg.Surface] = {}
+    pool: Pool = None
     def __init__(self, img_path: str, start_pos: tuple, score_extra: int = COLLECTIBLE_BASE_SCORE) -> None:
         super().__init__()
-        if not img_path in Collectible.images.keys():
-            Collectible.images[img_path] = pg.image.load(img_path).convert_alpha()
-        self.image = Collectible.images[img_path]
-        self.image = pg.transform.scale_by(self.image, 0.7)
+        self.image = AssetStore.instance().get_image(img_path, COLLECTIBLE_IMG_SCALE)
         self.rect = self.image.get_rect(center = start_pos)
+        self.prev_pos = self.rect.topleft # Position before the last update (used to interpolate rendering)
         self.score_extra = score_extra
+        self.pooled = True  # Collectibles that were not acquired from the pool are never released to it
+
+    @classmethod
+    def acquire(cls, start_pos: tuple) -> Collectible:
+        collectible = cls.pool.acquire()
+        collectible.rect.center = start_pos
+        collectible.prev_pos = collectible.rect.topleft
+        return collectible
+
+    def kill(self) -> None:
+        super().kill()
+        type(self).pool.release(self)
 
     def apply(self, player: Player):
         player.score += self.score_extra
@@ -70,6 +94,8 @@ class ExtraScore10(Collectible):
         super().apply(player)
         Audio.instance().play_extra_score_sound()
 
+ExtraScore10.pool = Pool("extra_score_10", lambda: ExtraScore10((0, 0)), COLLECTIBLE_POOL_CAPACITY)
+
 # Collectible - Power up
 class PowerUp(Collectible):
     def __init__(self, start_pos: tuple) -> None:
@@ -83,18 +109,24 @@ class PowerUp(Collectible):
             player.bullet_level += 1
         Audio.instance().play_power_up_sound()
 
+PowerUp.pool = Pool("power_up", lambda: PowerUp((0, 0)), COLLECTIBLE_POOL_CAPACITY)
+
 # Main player
 class Player(pg.sprite.Sprite):
     _player = None  # Player singleton instance. Do not access it directly, instead use instance().
-    def __init__(self) -> None:
+    def __init__(self, clock: GameClock = None) -> None:
         super().__init__()
-        self.image = pg.image.load(PLAYER_IMG_PATH).convert_alpha()
+        self.clock = clock if clock else GameClock.instance()
+        self.variants = AssetStore.instance().get_variants(PLAYER_IMG_PATH) # Shared normal and hit images
+        self.image = self.variants[0]
         self.rect = self.image.get_rect(midbottom = (GAME_WIDTH//2, WIN_HEIGHT - PLAYER_HEIGHT))
-        self.fire_timer = pg.time.get_ticks()
+        self.prev_pos = self.rect.topleft # Position before the last update (used to interpolate rendering)
+        self.fire_timer = self.clock.ticks()
         self.bullet_level = 0 # Tracks the type of bullet you can fire
         self.lives = PLAYER_LIVES
-        self.hit_timer = pg.time.get_ticks() - PLAYER_HIT_DURATION*1000
+        self.hit_timer = self.clock.ticks() - PLAYER_HIT_DURATION*1000
         self.score = 0
+        self.input: InputSource = MouseKeyboardInput() # Where the player's input comes from (see inputs.py)
         Player._player = self
 
     @staticmethod
@@ -103,53 +135,50 @@ class Player(pg.sprite.Sprite):
             raise RuntimeError("Tried to get uninitialized instance of Player")
         return Player._player
 
-    def update(self) -> Bullet:
+    def update(self, bullets: BulletStore) -> None:
+        # bullets: the store the player's shots go to
         # Set x coordinate
-        self.rect.centerx = pg.mouse.get_pos()[0]
+        x, fire = self.input.read()
+        self.rect.centerx = x
         if self.rect.right > GAME_WIDTH:
             self.rect.right = GAME_WIDTH
         elif self.rect.left < 0:
             self.rect.left = 0
 
         # Make transparent if hit
-        if (pg.time.get_ticks() - self.hit_timer) < (PLAYER_HIT_DURATION*1000):
-            self.image.set_alpha(125)
+        if (self.clock.ticks() - self.hit_timer) < (PLAYER_HIT_DURATION*1000):
+            self.image = self.variants[1]
         else:
-            self.image.set_alpha(255)
+            self.image = self.variants[0]
 
-        # Create bullet & play bullet sound
-        new_bullet = None
-        left_click = pg.mouse.get_pressed()[0]
-        can_fire = (pg.time.get_ticks() - self.fire_timer) >= (PLAYER_FIRE_DELAY * 1000)
-        if left_click and can_fire:
+        # Fire & play bullet sound
+        can_fire = (self.clock.ticks() - self.fire_timer) >= (PLAYER_FIRE_DELAY * 1000)
+        if fire and can_fire:
             if self.bullet_level == 0:
-                new_bullet = Bullet0((self.rect.centerx, self.rect.top), 1)
+                Bullet0.fire(bullets, (self.rect.centerx, self.rect.top), 1)
             elif self.bullet_level == 1:
-                new_bullet = Bullet1((self.rect.centerx, self.rect.top), 1)
+                Bullet1.fire(bullets, (self.rect.centerx, self.rect.top), 1)
             elif self.bullet_level == 2:
-                new_bullet = []
-                new_bullet.append(Bullet0((self.rect.centerx - BULLET_LEVEL_3_SPREAD, self.rect.top), 1))
-                new_bullet.append(Bullet1((self.rect.centerx, self.rect.top), 1))
-                new_bullet.append(Bullet0((self.rect.centerx + BULLET_LEVEL_3_SPREAD, self.rect.top), 1))
+                Bullet0.fire(bullets, (self.rect.centerx - BULLET_LEVEL_3_SPREAD, self.rect.top), 1)
+                Bullet1.fire(bullets, (self.rect.centerx, self.rect.top), 1)
+                Bullet0.fire(bullets, (self.rect.centerx + BULLET_LEVEL_3_SPREAD, self.rect.top), 1)
             Audio.instance().play_player_bullet_sound(self.bullet_level)
-            self.fire_timer = pg.time.get_ticks()
-
-        return new_bullet
+            self.fire_timer = self.clock.ticks()
     
-    def prepare_for_level(self):
-        # Place the player in the middle (both rect and mouse)
+    def prepare_for_level(self, level: Level = None):
+        # Place the player in the middle (both rect and input)
         self.rect.midbottom = (GAME_WIDTH//2, WIN_HEIGHT - PLAYER_HEIGHT)
-        pg.mouse.set_pos((GAME_WIDTH//2, WIN_HEIGHT//2))
+        self.input.start_level(level, self.rect.centerx)
         # Reset the fire timer (so that the player doesn't fire instantaneously)
-        self.fire_timer = pg.time.get_ticks()
+        self.fire_timer = self.clock.ticks()
     
     def hit(self) -> None:
-        if (pg.time.get_ticks() - self.hit_timer) < (PLAYER_HIT_DURATION*1000):
+        if (self.clock.ticks() - self.hit_timer) < (PLAYER_HIT_DURATION*1000):
             return
         self.lives -= 1
         if self.bullet_level > 0:
             self.bullet_level -= 1
-        self.hit_timer = pg.time.get_ticks()
+        self.hit_timer = self.clock.ticks()
         if self.lives <= 0:
             self.destroy()
         else:
@@ -162,55 +191,86 @@ class Player(pg.sprite.Sprite):
         self.lives = PLAYER_LIVES
         self.bullet_level = 0
         self.score = 0
+        self.hit_timer = self.clock.ticks() - PLAYER_HIT_DURATION*1000
 
 # Base class for enemies
+# Use spawn() to get an enemy from the pool of its type (see EnemyPrefab). kill() releases it back to the pool.
+# The constructor only sets what all the enemies of a type share: the spawn state is set by reset().
 class Enemy(pg.sprite.Sprite):
-    images: dict[str, pg.Surface] = {}
-    def __init__(self, img_path: str, final_top_pos: tuple, fire_delay: float, lives: int, score_kill: int) -> None:
+    img_scale: float = 1
+    pool: Pool = None
+    prefab: EnemyPrefab = None  # Template the pool clones its enemies from
+    system: EnemySystem = None  # System that updates the enemy (see systems.py), if any
+    slot = 0                    # Index of the enemy in the arrays of its system
+    def __init__(self, img_path: str, fire_delay: float, lives: int, score_kill: int) -> None:
         super().__init__()
-        if not img_path in Enemy.images.keys():
-            Enemy.images[img_path] = pg.image.load(img_path).convert_alpha()
-        self.image = pg.transform.scale_by(Enemy.images[img_path], 1) # Essentially clones the image
+        self.variants = AssetStore.instance().get_variants(img_path, self.img_scale) # Shared normal and hit images
+        self.image = self.variants[0]
+        self.base_fire_delay = fire_delay * 1000
+        self.max_lives = lives
+        self.score_kill = score_kill
+        self.pooled = True  # Enemies that were not spawned from the pool are never released to it
+
+    @classmethod
+    def spawn(cls, *args, clock: GameClock = None) -> Enemy:
+        # args: the arguments of the enemy type's constructor (e.g. final_top_pos, direction)
+        enemy = cls.pool.acquire()
+        enemy.reset(*args, clock=clock)
+        return enemy
+
+    def reset(self, final_top_pos: tuple, clock: GameClock = None) -> None:
+        self.clock = clock if clock else GameClock.instance()
+        self.image = self.variants[0]
         self.rect = self.image.get_rect(midbottom = (final_top_pos[0], 0))
+        self.prev_pos = self.rect.topleft # Position before the last update (used to interpolate rendering)
         self.final_top_pos = final_top_pos
         self.state = ENEMY_STATE_ENTRANCE
-        self.base_fire_delay = fire_delay * 1000
-        self.fire_timer = pg.time.get_ticks()
-        self.lives = lives
-        self.hit_timer = pg.time.get_ticks() - PLAYER_HIT_DURATION*1000
-        self.score_kill = score_kill
+        self.fire_timer = self.clock.ticks()
+        self.lives = self.max_lives
+        self.hit_timer = self.clock.ticks() - PLAYER_HIT_DURATION*1000
         self.entrance_end_time = 0
 
-    def update(self) -> Bullet:
+    def kill(self) -> None:
+        if self.system is not None:
+            self.system.remove(self)
+        super().kill()
+        type(self).pool.release(self)
+
+    def update(self, bullets: BulletStore) -> None:
+        # bullets: the store the enemy's shots go to
         # Move from the top of the screen to its final position
         if self.state == ENEMY_STATE_ENTRANCE:
             self.rect.top += ENEMY_ENTRANCE_SPEED
             if self.rect.top >= self.final_top_pos[1]:
                 self.rect.top = self.final_top_pos[1]
-                self.entrance_end_time = pg.time.get_ticks()
+                self.entrance_end_time = self.clock.ticks()
                 self.state = ENEMY_STATE_ACTION
         # Otherwise, kill enemy if out of bounds
         elif self.rect.left > GAME_WIDTH or self.rect.right < 0 or self.rect.top > WIN_HEIGHT or self.rect.bottom < 0:
             self.kill()
         
+        self.update_image()
+
+    def update_image(self) -> None:
         # Make transparent if hit
-        if (pg.time.get_ticks() - self.hit_timer) < (ENEMY_HIT_DURATION*1000):
-            self.image.set_alpha(125)
+        if (self.clock.ticks() - self.hit_timer) < (ENEMY_HIT_DURATION*1000):
+            self.image = self.variants[1]
         else:
-            self.image.set_alpha(255)
-        return None
+            self.image = self.variants[0]
 
     def hit(self, damage) -> tuple[int, Collectible]:
         self.lives -= damage
-        self.hit_timer = pg.time.get_ticks()
+        self.hit_timer = self.clock.ticks()
+        if self.system is not None:
+            self.system.hit_timer[self.slot] = self.hit_timer
         if self.lives <= 0:
             # Return a tuple containing the score for the kill and the collectible if applicable
             collectible = None
             if random() < COLLECTIBLE_PROBABILITY:
                 if random() < POWER_UP_PROBABILITY:
-                    collectible = PowerUp(self.rect.center)
+                    collectible = PowerUp.acquire(self.rect.center)
                 else:
-                    collectible = ExtraScore10(self.rect.center)
+                    collectible = ExtraScore10.acquire(self.rect.center)
             Audio.instance().play_enemy_death_sound()
             self.kill()
             return self.score_kill, collectible
@@ -219,19 +279,22 @@ class Enemy(pg.sprite.Sprite):
 
 # Enemy - Parasite
 class Parasite(Enemy):
-    def __init__(self, final_top_pos: tuple, direction: int = 1) -> None:
+    def __init__(self, final_top_pos: tuple, direction: int = 1, clock: GameClock = None) -> None:
         super().__init__(
             ENEMY_PARASITE_IMG_PATH, 
-            final_top_pos, 
             ENEMY_PARASITE_BASE_FIRE_DELAY, 
             ENEMY_PARASITE_LIVES,
             ENEMY_PARASITE_SCORE_KILL)
+        self.reset(final_top_pos, direction, clock)
+
+    def reset(self, final_top_pos: tuple, direction: int = 1, clock: GameClock = None) -> None:
+        super().reset(final_top_pos, clock)
         self.curr_fire_delay = self.base_fire_delay + random()*ENEMY_PARASITE_FIRE_DELAY_RANGE*1000
         self.direction = direction
         self.top = final_top_pos[1]
 
-    def update(self) -> Bullet:
-        super().update()
+    def update(self, bullets: BulletStore) -> None:
+        super().update(bullets)
         # Move left/right
         if self.state == ENEMY_STATE_ACTION:
             self.top += ENEMY_PARASITE_DOWN_SPEED
@@ -247,90 +310,97 @@ class Parasite(Enemy):
                     self.rect.left = 0
                     self.direction *= -1
 
-        new_bullet = None
-        can_fire = (pg.time.get_ticks() - self.fire_timer) >= self.curr_fire_delay
+        can_fire = (self.clock.ticks() - self.fire_timer) >= self.curr_fire_delay
         if can_fire:
-            new_bullet = Bullet0((self.rect.centerx, self.rect.bottom), -1)
-            self.fire_timer = pg.time.get_ticks()
+            Bullet0.fire(bullets, (self.rect.centerx, self.rect.bottom), -1)
+            self.fire_timer = self.clock.ticks()
             self.curr_fire_delay = self.base_fire_delay + random()*ENEMY_PARASITE_FIRE_DELAY_RANGE*1000
             Audio.instance().play_enemy_bullet_sound(ENEMY_TYPE_PARASITE)
-        return new_bullet
 
 # Enemy - Flooder Down (goes down only)
 class FlooderDown(Enemy):
-    def __init__(self, final_top_pos: tuple) -> None:
+    def __init__(self, final_top_pos: tuple, clock: GameClock = None) -> None:
         super().__init__(ENEMY_FLOODER_IMG_PATH, 
-                         final_top_pos, 
                          ENEMY_FLOODER_DOWN_FIRE_DELAY, 
                          ENEMY_FLOODER_LIVES, 
                          ENEMY_FLOODER_SCORE_KILL)
-        self.fire_start_timer = pg.time.get_ticks()
-        self.fire_stop_timer = pg.time.get_ticks()
-        self.move_down_timer = pg.time.get_ticks()
+        self.reset(final_top_pos, clock)
+
+    def reset(self, final_top_pos: tuple, clock: GameClock = None) -> None:
+        super().reset(final_top_pos, clock)
+        self.fire_start_timer = self.clock.ticks()
+        self.fire_stop_timer = self.clock.ticks()
+        self.move_down_timer = self.clock.ticks()
     
-    def update(self) -> None:
-        super().update()
-        new_bullet = None
-        must_start = (pg.time.get_ticks() - self.fire_start_timer) >= ENEMY_FLOODER_DOWN_FIRE_START_TIME*1000
-        must_stop = (pg.time.get_ticks() - self.fire_stop_timer) >= ENEMY_FLOODER_DOWN_FIRE_STOP_TIME*1000
-        must_go_down = (pg.time.get_ticks() - self.move_down_timer) >= ENEMY_FLOODER_DOWN_MOVE_TIME*1000
-        can_fire = (pg.time.get_ticks() - self.fire_timer) >= self.base_fire_delay
+    def update(self, bullets: BulletStore) -> None:
+        super().update(bullets)
+        must_start = (self.clock.ticks() - self.fire_start_timer) >= ENEMY_FLOODER_DOWN_FIRE_START_TIME*1000
+        must_stop = (self.clock.ticks() - self.fire_stop_timer) >= ENEMY_FLOODER_DOWN_FIRE_STOP_TIME*1000
+        must_go_down = (self.clock.ticks() - self.move_down_timer) >= ENEMY_FLOODER_DOWN_MOVE_TIME*1000
+        can_fire = (self.clock.ticks() - self.fire_timer) >= self.base_fire_delay
 
         if must_go_down:
             self.rect.centery += ENEMY_FLOODER_SPEED
         elif must_start and not must_stop:
             if can_fire:
-                new_bullet = Bullet0((self.rect.centerx, self.rect.bottom), -1)
+                Bullet0.fire(bullets, (self.rect.centerx, self.rect.bottom), -1)
                 Audio.instance().play_enemy_bullet_sound(ENEMY_TYPE_FLOODER_DOWN)
-                self.fire_timer = pg.time.get_ticks()
-        return new_bullet
+                self.fire_timer = self.clock.ticks()
 
 # Enemy - Flooder U (displacement in a U-like shape)
 class FlooderU(Enemy):
-    def __init__(self, start_left: bool) -> None:
+    def __init__(self, start_left: bool, clock: GameClock = None) -> None:
         super().__init__(ENEMY_FLOODER_IMG_PATH, 
-                         (ENEMY_FLOODER_U_BORDER_OFFSET,ENEMY_FLOODER_U_BORDER_OFFSET) 
-                            if start_left else 
-                            (GAME_WIDTH-ENEMY_FLOODER_U_BORDER_OFFSET,ENEMY_FLOODER_U_BORDER_OFFSET), 
                          ENEMY_FLOODER_DOWN_FIRE_DELAY, 
                          ENEMY_FLOODER_LIVES, 
                          ENEMY_FLOODER_SCORE_KILL)
+        self.reset(start_left, clock)
+
+    def reset(self, start_left: bool, clock: GameClock = None) -> None:
+        super().reset((ENEMY_FLOODER_U_BORDER_OFFSET,ENEMY_FLOODER_U_BORDER_OFFSET) 
+                        if start_left else 
+                        (GAME_WIDTH-ENEMY_FLOODER_U_BORDER_OFFSET,ENEMY_FLOODER_U_BORDER_OFFSET), 
+                      clock)
         self.direction = 1 if start_left else -1
-        self.move_down_timer = pg.time.get_ticks()
+        self.move_down_timer = self.clock.ticks()
 
-    def update(self) -> None:
-        super().update()
-        must_go_down = (pg.time.get_ticks() - self.move_down_timer) >= ENEMY_FLOODER_U_MOVE_TIME*1000
+    def update(self, bullets: BulletStore) -> None:
+        super().update(bullets)
+        must_go_down = (self.clock.ticks() - self.move_down_timer) >= ENEMY_FLOODER_U_MOVE_TIME*1000
         if must_go_down:
             self.rect.centerx += self.direction * ENEMY_FLOODER_U_SPEED
-            self.rect.top = int(WIN_HEIGHT - ENEMY_FLOODER_U_BORDER_OFFSET - (WIN_HEIGHT - 2*ENEMY_FLOODER_U_BORDER_OFFSET)*(((2*(self.rect.centerx-ENEMY_FLOODER_U_BORDER_OFFSET)/(GAME_WIDTH-2*ENEMY_FLOODER_U_BORDER_OFFSET)) - 1)**2))
+            self.rect.top = FLOODER_U_PATH[self.rect.centerx]
             if self.direction == 1 and self.rect.centerx > GAME_WIDTH - ENEMY_FLOODER_U_BORDER_OFFSET:
                 self.rect.midtop = (GAME_WIDTH - ENEMY_FLOODER_U_BORDER_OFFSET, ENEMY_FLOODER_U_BORDER_OFFSET)
                 self.direction = -1
-                self.move_down_timer = pg.time.get_ticks()
+                self.move_down_timer = self.clock.ticks()
             elif self.direction == -1 and self.rect.centerx < ENEMY_FLOODER_U_BORDER_OFFSET:
                 self.rect.midtop = (ENEMY_FLOODER_U_BORDER_OFFSET, ENEMY_FLOODER_U_BORDER_OFFSET)
                 self.direction = 1
-                self.move_down_timer = pg.time.get_ticks()
+                self.move_down_timer = self.clock.ticks()
 
 # Enemy - Gear
 class Gear(Enemy):
-    def __init__(self, final_top_pos: tuple, direction: int = 1) -> None:
+    def __init__(self, final_top_pos: tuple, direction: int = 1, clock: GameClock = None) -> None:
         super().__init__(ENEMY_GEAR_IMG0_PATH, 
-                         final_top_pos, 
                          ENEMY_GEAR_FIRE_DELAY, 
                          ENEMY_GEAR_LIVES, 
                          ENEMY_GEAR_SCORE_KILL)
-        self.images = [self.image, pg.image.load(ENEMY_GEAR_IMG1_PATH).convert_alpha()]
+        self.frames = [self.variants, AssetStore.instance().get_variants(ENEMY_GEAR_IMG1_PATH)]
+        self.reset(final_top_pos, direction, clock)
+
+    def reset(self, final_top_pos: tuple, direction: int = 1, clock: GameClock = None) -> None:
+        self.variants = self.frames[0]
+        super().reset(final_top_pos, clock)
         self.curr_image_idx = 0
-        self.animation_timer = pg.time.get_ticks()
+        self.animation_timer = self.clock.ticks()
         self.direction = direction
 
-    def update(self) -> Bullet:
-        super().update()
+    def update(self, bullets: BulletStore) -> None:
+        super().update(bullets)
         # Move left/right and wave
         if self.state == ENEMY_STATE_ACTION:
-            t = (pg.time.get_ticks() - self.entrance_end_time) / 1000
+            t = (self.clock.ticks() - self.entrance_end_time) / 1000
             self.rect.top = int(self.final_top_pos[1] + ENEMY_GEAR_WAVE_AMP*sin(ENEMY_GEAR_WAVE_FREQ*t))
             if self.direction > 0:
                 self.rect.right += ENEMY_GEAR_SPEED
@@ -344,64 +414,110 @@ class Gear(Enemy):
                     self.direction *= -1
         
         # Animation
-        switch_image = (pg.time.get_ticks() - self.animation_timer) >= ENEMY_GEAR_FRAME_DURATION*1000
+        switch_image = (self.clock.ticks() - self.animation_timer) >= ENEMY_GEAR_FRAME_DURATION*1000
         if switch_image:
             self.curr_image_idx += 1
             self.curr_image_idx %= 2
-            self.image = self.images[self.curr_image_idx]
-            self.animation_timer = pg.time.get_ticks()
+            self.variants = self.frames[self.curr_image_idx]
+            self.update_image()
+            self.animation_timer = self.clock.ticks()
 
         # Fire bullets
-        new_bullet = None
-        can_fire = (pg.time.get_ticks() - self.fire_timer) >= self.base_fire_delay
+        can_fire = (self.clock.ticks() - self.fire_timer) >= self.base_fire_delay
         if can_fire:
             # Fire bullets in all directions
-            new_bullet = []
-            for i in range(ENEMY_GEAR_NBR_BULLETS):
-                x = cos((i/ENEMY_GEAR_NBR_BULLETS)*2*pi)
-                y = sin((i/ENEMY_GEAR_NBR_BULLETS)*2*pi)
-                new_bullet.append(Bullet1(self.rect.center, pg.Vector2(x,y)))
+            Bullet1.fire_ring(bullets, self.rect.center, ENEMY_GEAR_NBR_BULLETS)
             Audio.instance().play_enemy_bullet_sound(ENEMY_TYPE_GEAR)
-            self.fire_timer = pg.time.get_ticks()
-        return new_bullet
+            self.fire_timer = self.clock.ticks()
 
 # Enemy - Beast
 class Beast(Enemy):
-    def __init__(self, final_top_pos: tuple) -> None:
+    img_scale = ENEMY_BEAST_IMG_SCALE
+    def __init__(self, final_top_pos: tuple, clock: GameClock = None) -> None:
         super().__init__(ENEMY_BEAST_IMG_PATH, 
-                         final_top_pos, 
                          ENEMY_BEAST_FIRE_DELAY, 
                          ENEMY_BEAST_LIVES, 
                          ENEMY_BEAST_SCORE_KILL)
-        self.image = pg.transform.scale_by(self.image, 2)
-        self.rect = self.image.get_rect(midbottom = (final_top_pos[0], 0))
-        self.fire_start_timer = pg.time.get_ticks()
-        self.fire_stop_timer = pg.time.get_ticks()
+        self.reset(final_top_pos, clock)
+
+    def reset(self, final_top_pos: tuple, clock: GameClock = None) -> None:
+        super().reset(final_top_pos, clock)
+        self.fire_start_timer = self.clock.ticks()
+        self.fire_stop_timer = self.clock.ticks()
         
-    def update(self) -> Bullet:
-        super().update()
+    def update(self, bullets: BulletStore) -> None:
+        super().update(bullets)
         # Move in circles
         if self.state == ENEMY_STATE_ACTION:
-            t = (pg.time.get_ticks() - self.entrance_end_time) / 1000
-            self.rect.centerx = self.final_top_pos[0] + int(ENEMY_BEAST_WAVE_AMP * sin(ENEMY_BEAST_WAVE_FREQ*t*2*pi))
-            self.rect.top = self.final_top_pos[1] + ENEMY_BEAST_WAVE_AMP  - int(ENEMY_BEAST_WAVE_AMP * cos(ENEMY_BEAST_WAVE_FREQ*t*2*pi))
+            x_offset, y_offset = BEAST_CIRCLE.get_offset(self.clock.ticks() - self.entrance_end_time)
+            self.rect.centerx = self.final_top_pos[0] + x_offset
+            self.rect.top = self.final_top_pos[1] + ENEMY_BEAST_WAVE_AMP - y_offset
 
         # Firing sequence
-        new_bullet = None
-        can_do_fire_sequence = (pg.time.get_ticks() - self.fire_start_timer) >= ENEMY_BEAST_FIRE_START_TIME*1000
+        can_do_fire_sequence = (self.clock.ticks() - self.fire_start_timer) >= ENEMY_BEAST_FIRE_START_TIME*1000
         if can_do_fire_sequence:
-            can_fire = (pg.time.get_ticks() - self.fire_timer) >= self.base_fire_delay
+            can_fire = (self.clock.ticks() - self.fire_timer) >= self.base_fire_delay
             if can_fire:
-                player_pos_vect = pg.Vector2(Player.instance().rect.center)
+                player_x, player_y = Player.instance().rect.center
                 bullet0_pos = (self.rect.midbottom[0] - ENEMY_BEAST_BULLET_SEPARATION, self.rect.midbottom[1])
                 bullet1_pos = (self.rect.midbottom[0] + ENEMY_BEAST_BULLET_SEPARATION, self.rect.midbottom[1])
-                new_bullet = []
-                new_bullet.append(Bullet1(bullet0_pos, player_pos_vect - pg.Vector2(bullet0_pos)))
-                new_bullet.append(Bullet1(bullet1_pos, player_pos_vect - pg.Vector2(bullet1_pos)))
+                Bullet1.fire(bullets, bullet0_pos, (player_x - bullet0_pos[0], player_y - bullet0_pos[1]))
+                Bullet1.fire(bullets, bullet1_pos, (player_x - bullet1_pos[0], player_y - bullet1_pos[1]))
                 Audio.instance().play_enemy_bullet_sound(ENEMY_TYPE_BEAST)
-                self.fire_timer = pg.time.get_ticks()
-            should_stop_firing = (pg.time.get_ticks() - self.fire_stop_timer) >= ENEMY_BEAST_FIRE_STOP_TIME*1000
+                self.fire_timer = self.clock.ticks()
+            should_stop_firing = (self.clock.ticks() - self.fire_stop_timer) >= ENEMY_BEAST_FIRE_STOP_TIME*1000
             if should_stop_firing:
-                self.fire_start_timer = pg.time.get_ticks()
-                self.fire_stop_timer = pg.time.get_ticks()
-        return new_bullet
\ No newline at end of file
+                self.fire_start_timer = self.clock.ticks()
+                self.fire_stop_timer = self.clock.ticks()
+
+# Enemy prefab: a template enemy built once per enemy type (on first use, once the images are loaded).
+# New enemies are shallow copies of the template, which skips the constructors and the image lookups.
+# The state shared with the template (images, animation frames, constants) must never be modified in place.
+class EnemyPrefab:
+    def __init__(self, build: Callable[[], Enemy]) -> None:
+        self.build = build
+        self.template: Enemy = None
+        self.clones = 0
+
+    def clone(self) -> Enemy:
+        if not self.template:
+            # Building the template must not use up random numbers, so that games can be replayed from a seed
+            random_state = get_random_state()
+            self.template = self.build()
+            set_random_state(random_state)
+        self.clones += 1
+        enemy = copy.copy(self.template)
+        pg.sprite.Sprite.__init__(enemy)  # Not in the groups of the template
+        enemy.rect = self.template.rect.copy()
+        return enemy
+
+    def clear(self) -> None:
+        # The next clone builds a new template (e.g. after the settings changed)
+        self.template = None
+
+Parasite.prefab = EnemyPrefab(lambda: Parasite((0, 0)))
+FlooderDown.prefab = EnemyPrefab(lambda: FlooderDown((0, 0)))
+FlooderU.prefab = EnemyPrefab(lambda: FlooderU(True))
+Gear.prefab = EnemyPrefab(lambda: Gear((0, 0)))
+Beast.prefab = EnemyPrefab(lambda: Beast((0, 0)))
+Parasite.pool = Pool("parasite", Parasite.prefab.clone, ENEMY_POOL_CAPACITY)
+FlooderDown.pool = Pool("flooder_down", FlooderDown.prefab.clone, ENEMY_POOL_CAPACITY)
+FlooderU.pool = Pool("flooder_u", FlooderU.prefab.clone, ENEMY_POOL_CAPACITY)
+Gear.pool = Pool("gear", Gear.prefab.clone, ENEMY_POOL_CAPACITY)
+Beast.pool = Pool("beast", Beast.prefab.clone, ENEMY_POOL_CAPACITY)
+
+# Enemy type registry (enemy type id -> class). Spawn an enemy with ENEMY_TYPES[enemy_type].spawn(*args).
+ENEMY_TYPES: dict[int, type[Enemy]] = {
+    ENEMY_TYPE_PARASITE: Parasite,
+    ENEMY_TYPE_FLOODER_DOWN: FlooderDown,
+    ENEMY_TYPE_FLOODER_U: FlooderU,
+    ENEMY_TYPE_GEAR: Gear,
+    ENEMY_TYPE_BEAST: Beast,
+}
+
+def clear_enemy_pools() -> None:
+    # Drop the pooled enemies and the templates they are cloned from, so that the next enemies are built
+    # from the current settings
+    for enemy_class in ENEMY_TYPES.values():
+        enemy_class.pool.clear()
+        enemy_class.prefab.clear()
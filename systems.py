@@ -0,0 +1,333 @@
+from __future__ import annotations
+import numpy as np
+import pygame as pg
+from settings import *
+from sprites import *
+from audio import Audio
+from gameclock import GameClock
+from bullets import BulletStore
+from trajectory import BEAST_CIRCLE
+from random import random
+
+# Enemy systems (see ENEMY_SYSTEMS): the enemies of a kind keep their movement and timer state in the shared
+# arrays of their system, which updates the whole kind at once with NumPy. The enemies stay sprites: each
+# update writes the positions back to their rects (used for drawing and collisions) and sets their images.
+# While an enemy is in a system, its own movement attributes (direction, fire_timer...) are out of date.
+# Only the firing enemies (a few per frame) and the enemies leaving the screen are handled one by one.
+class EnemySystem:
+    kind: type[Enemy] = None
+
+    def __init__(self, clock: GameClock = None, capacity: int = ENEMY_SYSTEM_CAPACITY) -> None:
+        self.clock = clock if clock else GameClock.instance()
+        self.enemies: list[Enemy] = []  # Enemy in each slot
+        self.rects: list[pg.Rect] = []  # Rect of the enemy in each slot (see write_back())
+        self.capacity = 0
+        self.spawned = 0                # Number of enemies added (see spawn_order)
+        self.arrays: list[str] = []     # Names of the state arrays (one value per slot)
+        self.add_array("left", np.int64)
+        self.add_array("top", np.int64)
+        self.add_array("width", np.int64)
+        self.add_array("height", np.int64)
+        self.add_array("final_top", np.int64)
+        self.add_array("state", np.int8)
+        self.add_array("entrance_end_time", np.int64)
+        self.add_array("fire_timer", np.float64)
+        self.add_array("hit_timer", np.float64)     # Set by Enemy.hit()
+        self.add_array("image_index", np.int8)      # Index of the image shown (see get_image_indices())
+        self.add_array("spawn_order", np.int64)     # Order of the enemies in the level's group (see get_firing_slots())
+        self.resize(capacity)
+
+    def __len__(self) -> int:
+        return len(self.enemies)
+
+    def add_array(self, name: str, dtype) -> None:
+        self.arrays.append(name)
+        setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+
+    def resize(self, capacity: int) -> None:
+        for name in self.arrays:
+            array = getattr(self, name)
+            resized = np.zeros(capacity, dtype=array.dtype)
+            resized[:len(self.enemies)] = array[:len(self.enemies)]
+            setattr(self, name, resized)
+        self.capacity = capacity
+
+    def add(self, enemy: Enemy) -> None:
+        # Move the state of a freshly spawned enemy to the arrays
+        if len(self.enemies) == self.capacity:
+            self.resize(self.capacity * 2)
+        slot = len(self.enemies)
+        self.enemies.append(enemy)
+        self.rects.append(enemy.rect)
+        enemy.system = self
+        enemy.slot = slot
+        self.left[slot] = enemy.rect.left
+        self.top[slot] = enemy.rect.top
+        self.width[slot] = enemy.rect.width
+        self.height[slot] = enemy.rect.height
+        self.final_top[slot] = enemy.final_top_pos[1]
+        self.state[slot] = enemy.state
+        self.entrance_end_time[slot] = enemy.entrance_end_time
+        self.fire_timer[slot] = enemy.fire_timer
+        self.hit_timer[slot] = enemy.hit_timer
+        self.image_index[slot] = -1
+        self.spawn_order[slot] = self.spawned
+        self.spawned += 1
+        self.add_state(enemy, slot)
+
+    def add_state(self, enemy: Enemy, slot: int) -> None:
+        # Move the state specific to the kind
+        pass
+
+    def sync(self) -> None:
+        # Write the state of the arrays back to the enemies' attributes (e.g. before a snapshot, see snapshot.py)
+        for slot, enemy in enumerate(self.enemies):
+            enemy.state = int(self.state[slot])
+            enemy.entrance_end_time = int(self.entrance_end_time[slot])
+            enemy.fire_timer = float(self.fire_timer[slot])
+            enemy.hit_timer = float(self.hit_timer[slot])
+            self.sync_state(enemy, slot)
+
+    def sync_state(self, enemy: Enemy, slot: int) -> None:
+        # Write back the state specific to the kind (the reverse of add_state())
+        pass
+
+    def set_spawn_order(self, enemies: list[Enemy]) -> None:
+        # Number the enemies in the order of the level's group (e.g. after they were restored in slot order)
+        for enemy in enemies:
+            if enemy.system is self:
+                self.spawn_order[enemy.slot] = self.spawned
+                self.spawned += 1
+
+    def remove(self, enemy: Enemy) -> None:
+        # The last enemy takes the slot of the removed one
+        slot = enemy.slot
+        last = len(self.enemies) - 1
+        if slot != last:
+            moved = self.enemies[last]
+            self.enemies[slot] = moved
+            self.rects[slot] = moved.rect
+            moved.slot = slot
+            for name in self.arrays:
+                array = getattr(self, name)
+                array[slot] = array[last]
+        self.enemies.pop()
+        self.rects.pop()
+        enemy.system = None
+
+    def clear(self) -> None:
+        for enemy in self.enemies:
+            enemy.system = None
+        self.enemies.clear()
+        self.rects.clear()
+
+    def update(self, bullets: BulletStore) -> None:
+        # Same steps as Enemy.update() and the update() of the kind. The shots go to bullets.
+        n = len(self.enemies)
+        if not n:
+            return
+        ticks = self.clock.ticks()
+        left, top, width, height = self.left[:n], self.top[:n], self.width[:n], self.height[:n]
+        state = self.state[:n]
+
+        # Enemies out of the screen are killed after this update (like in Enemy.update())
+        out = ((state == ENEMY_STATE_ACTION) &
+               ((left > GAME_WIDTH) | (left + width < 0) | (top > WIN_HEIGHT) | (top + height < 0)))
+
+        # Entrance (skipped once every enemy has arrived, which is most of the time)
+        entering = state == ENEMY_STATE_ENTRANCE
+        if entering.any():
+            top[entering] += ENEMY_ENTRANCE_SPEED
+            arrived = entering & (top >= self.final_top[:n])
+            top[arrived] = self.final_top[:n][arrived]
+            self.entrance_end_time[:n][arrived] = ticks
+            state[arrived] = ENEMY_STATE_ACTION
+            acting = state == ENEMY_STATE_ACTION
+        else:
+            acting = ~entering
+
+        self.move(n, ticks, acting)
+        self.fire(n, ticks, bullets)
+        self.write_back(n, ticks)
+        if out.any():
+            for slot in np.flatnonzero(out)[::-1]:  # From the last slot, since killing moves the last enemy
+                self.enemies[slot].kill()
+
+    def move(self, n: int, ticks: int, acting: np.ndarray) -> None:
+        pass
+
+    def fire(self, n: int, ticks: int, bullets: BulletStore) -> None:
+        pass
+
+    def get_firing_slots(self, firing: np.ndarray) -> list[int]:
+        # Slots of the firing enemies in the order of the level's group, which is the order the enemies fire
+        # (and draw random numbers) in when they are updated one by one: a seed plays the same game either way
+        slots = firing.nonzero()[0]
+        if len(slots) <= 1:
+            return slots.tolist()
+        return slots[np.argsort(self.spawn_order[slots])].tolist()
+
+    def bounce(self, n: int, acting: np.ndarray, direction: np.ndarray, speed: int) -> None:
+        # Move left/right and turn around at the edges of the screen (a few enemies per frame)
+        left, width = self.left[:n], self.width[:n]
+        going_right = direction > 0
+        left += np.where(going_right, speed, -speed) * acting
+        past_right = acting & going_right & (left + width > GAME_WIDTH)
+        past_left = acting & ~going_right & (left < 0)
+        turned = past_right | past_left
+        if turned.any():
+            left[past_right] = GAME_WIDTH - width[past_right]
+            left[past_left] = 0
+            direction[turned] *= -1
+
+    def get_image_indices(self, n: int, ticks: int) -> np.ndarray:
+        # 0 = normal image, 1 = hit image (see set_image())
+        return ((ticks - self.hit_timer[:n]) < ENEMY_HIT_DURATION*1000).astype(np.int8)
+
+    def set_image(self, enemy: Enemy, image_index: int) -> None:
+        enemy.image = enemy.variants[image_index]
+
+    def write_back(self, n: int, ticks: int) -> None:
+        # Setting a rect costs about 0.15 us, which is most of the cost per enemy of a large system
+        for rect, left, top in zip(self.rects, self.left[:n].tolist(), self.top[:n].tolist()):
+            rect.topleft = (left, top)
+        # Only the images that change are set
+        image_index = self.get_image_indices(n, ticks)
+        changed = (image_index != self.image_index[:n]).nonzero()[0]
+        if len(changed):
+            self.image_index[changed] = image_index[changed]
+            for slot, index in zip(changed.tolist(), image_index[changed].tolist()):
+                self.set_image(self.enemies[slot], index)
+
+# Parasites: move left/right while slowly going down
+class ParasiteSystem(EnemySystem):
+    kind = Parasite
+
+    def __init__(self, clock: GameClock = None, capacity: int = ENEMY_SYSTEM_CAPACITY) -> None:
+        super().__init__(clock, capacity)
+        self.add_array("direction", np.int64)
+        self.add_array("exact_top", np.float64)
+        self.add_array("curr_fire_delay", np.float64)
+        self.resize(self.capacity)
+
+    def add_state(self, enemy: Parasite, slot: int) -> None:
+        self.direction[slot] = enemy.direction
+        self.exact_top[slot] = enemy.top
+        self.curr_fire_delay[slot] = enemy.curr_fire_delay
+
+    def sync_state(self, enemy: Parasite, slot: int) -> None:
+        enemy.direction = int(self.direction[slot])
+        enemy.top = float(self.exact_top[slot])
+        enemy.curr_fire_delay = float(self.curr_fire_delay[slot])
+
+    def move(self, n: int, ticks: int, acting: np.ndarray) -> None:
+        # The enemies still entering move by 0 (the masks are applied by value, which is cheaper than indexing)
+        exact_top = self.exact_top[:n]
+        exact_top += ENEMY_PARASITE_DOWN_SPEED * acting
+        np.copyto(self.top[:n], exact_top.astype(np.int64), where=acting)
+        self.bounce(n, acting, self.direction[:n], ENEMY_PARASITE_SPEED)
+
+    def fire(self, n: int, ticks: int, bullets: BulletStore) -> None:
+        for slot in self.get_firing_slots((ticks - self.fire_timer[:n]) >= self.curr_fire_delay[:n]):
+            centerx = int(self.left[slot] + self.width[slot]//2)
+            bottom = int(self.top[slot] + self.height[slot])
+            Bullet0.fire(bullets, (centerx, bottom), -1)
+            self.fire_timer[slot] = ticks
+            self.curr_fire_delay[slot] = ENEMY_PARASITE_BASE_FIRE_DELAY*1000 + random()*ENEMY_PARASITE_FIRE_DELAY_RANGE*1000
+            Audio.instance().play_enemy_bullet_sound(ENEMY_TYPE_PARASITE)
+
+# Gears: move left/right in a wave and fire bullets in all directions
+class GearSystem(EnemySystem):
+    kind = Gear
+
+    def __init__(self, clock: GameClock = None, capacity: int = ENEMY_SYSTEM_CAPACITY) -> None:
+        super().__init__(clock, capacity)
+        self.add_array("direction", np.int64)
+        self.add_array("frame", np.int8)
+        self.add_array("animation_timer", np.float64)
+        self.resize(self.capacity)
+
+    def add_state(self, enemy: Gear, slot: int) -> None:
+        self.direction[slot] = enemy.direction
+        self.frame[slot] = enemy.curr_image_idx
+        self.animation_timer[slot] = enemy.animation_timer
+
+    def sync_state(self, enemy: Gear, slot: int) -> None:
+        # curr_image_idx follows the frame through set_image()
+        enemy.direction = int(self.direction[slot])
+        enemy.animation_timer = float(self.animation_timer[slot])
+
+    def move(self, n: int, ticks: int, acting: np.ndarray) -> None:
+        t = (ticks - self.entrance_end_time[:n]) / 1000
+        wave_top = (self.final_top[:n] + ENEMY_GEAR_WAVE_AMP*np.sin(ENEMY_GEAR_WAVE_FREQ*t)).astype(np.int64)
+        np.copyto(self.top[:n], wave_top, where=acting)
+        self.bounce(n, acting, self.direction[:n], ENEMY_GEAR_SPEED)
+
+        # Animation
+        switch_frame = (ticks - self.animation_timer[:n]) >= ENEMY_GEAR_FRAME_DURATION*1000
+        self.frame[:n][switch_frame] ^= 1
+        self.animation_timer[:n][switch_frame] = ticks
+
+    def fire(self, n: int, ticks: int, bullets: BulletStore) -> None:
+        for slot in self.get_firing_slots((ticks - self.fire_timer[:n]) >= ENEMY_GEAR_FIRE_DELAY*1000):
+            center = (int(self.left[slot] + self.width[slot]//2), int(self.top[slot] + self.height[slot]//2))
+            Bullet1.fire_ring(bullets, center, ENEMY_GEAR_NBR_BULLETS)
+            Audio.instance().play_enemy_bullet_sound(ENEMY_TYPE_GEAR)
+            self.fire_timer[slot] = ticks
+
+    def get_image_indices(self, n: int, ticks: int) -> np.ndarray:
+        # 2*frame + hit
+        return super().get_image_indices(n, ticks) + 2*self.frame[:n]
+
+    def set_image(self, enemy: Gear, image_index: int) -> None:
+        enemy.curr_image_idx = image_index // 2
+        enemy.variants = enemy.frames[enemy.curr_image_idx]
+        enemy.image = enemy.variants[image_index % 2]
+
+# Beasts: move in circles and fire bursts of aimed bullets
+class BeastSystem(EnemySystem):
+    kind = Beast
+
+    def __init__(self, clock: GameClock = None, capacity: int = ENEMY_SYSTEM_CAPACITY) -> None:
+        super().__init__(clock, capacity)
+        self.add_array("final_centerx", np.int64)
+        self.add_array("fire_start_timer", np.float64)
+        self.add_array("fire_stop_timer", np.float64)
+        self.resize(self.capacity)
+
+    def add_state(self, enemy: Beast, slot: int) -> None:
+        self.final_centerx[slot] = enemy.final_top_pos[0]
+        self.fire_start_timer[slot] = enemy.fire_start_timer
+        self.fire_stop_timer[slot] = enemy.fire_stop_timer
+
+    def sync_state(self, enemy: Beast, slot: int) -> None:
+        enemy.fire_start_timer = float(self.fire_start_timer[slot])
+        enemy.fire_stop_timer = float(self.fire_stop_timer[slot])
+
+    def move(self, n: int, ticks: int, acting: np.ndarray) -> None:
+        x_offsets, y_offsets = BEAST_CIRCLE.get_offsets(ticks - self.entrance_end_time[:n][acting])
+        self.left[:n][acting] = self.final_centerx[:n][acting] + x_offsets - self.width[:n][acting]//2
+        self.top[:n][acting] = self.final_top[:n][acting] + ENEMY_BEAST_WAVE_AMP - y_offsets
+
+    def fire(self, n: int, ticks: int, bullets: BulletStore) -> None:
+        in_sequence = (ticks - self.fire_start_timer[:n]) >= ENEMY_BEAST_FIRE_START_TIME*1000
+        firing = in_sequence & ((ticks - self.fire_timer[:n]) >= ENEMY_BEAST_FIRE_DELAY*1000)
+        if firing.any():
+            player_x, player_y = Player.instance().rect.center
+            for slot in self.get_firing_slots(firing):
+                centerx = int(self.left[slot] + self.width[slot]//2)
+                bottom = int(self.top[slot] + self.height[slot])
+                bullet0_pos = (centerx - ENEMY_BEAST_BULLET_SEPARATION, bottom)
+                bullet1_pos = (centerx + ENEMY_BEAST_BULLET_SEPARATION, bottom)
+                Bullet1.fire(bullets, bullet0_pos, (player_x - bullet0_pos[0], player_y - bullet0_pos[1]))
+                Bullet1.fire(bullets, bullet1_pos, (player_x - bullet1_pos[0], player_y - bullet1_pos[1]))
+                Audio.instance().play_enemy_bullet_sound(ENEMY_TYPE_BEAST)
+            self.fire_timer[:n][firing] = ticks
+        stopping = in_sequence & ((ticks - self.fire_stop_timer[:n]) >= ENEMY_BEAST_FIRE_STOP_TIME*1000)
+        self.fire_start_timer[:n][stopping] = ticks
+        self.fire_stop_timer[:n][stopping] = ticks
+
+ENEMY_SYSTEM_TYPES: list[type[EnemySystem]] = [ParasiteSystem, GearSystem, BeastSystem]
+
+def create_enemy_systems(clock: GameClock = None) -> dict[type[Enemy], EnemySystem]:
+    return {system_type.kind: system_type(clock) for system_type in ENEMY_SYSTEM_TYPES}
@@ -0,0 +1,198 @@
+from __future__ import annotations
+import os
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from time import perf_counter
+import numpy as np
+import pygame as pg
+from settings import *
+
+# Frame telemetry: an always-on recorder of the timing of every frame of the game loop, tagged with what was
+# being played. The frames are stored in a preallocated ring buffer (the oldest are overwritten once it is full).
+# On exit, the session is written to TELEMETRY_DIR: a JSON summary (frame time percentiles, frames over budget,
+# worst waves, machine and settings) and the raw frames (.npy, load them with numpy.load()), so that sessions
+# of different builds and machines can be compared. Summarize a raw dump again with: python telemetry.py FILE.npy
+#
+# Times are in ms. frame_ms is the time since the previous frame started (pacing), work_ms the time the frame
+# spent in its phases (the rest was spent waiting for the frame rate cap). The cold start timings (see
+# set_startup_time()) are written with the session.
+
+PHASES = ("update", "draw", "present")
+FRAME_DTYPE = np.dtype([
+    ("frame_ms", np.float32),
+    ("work_ms", np.float32),
+    ("update_ms", np.float32),      # Events and simulation steps
+    ("draw_ms", np.float32),
+    ("present_ms", np.float32),     # Display flip or update
+    ("steps", np.uint8),            # Simulation steps run
+    ("state", np.uint8),            # Game state (see STATE_START...)
+    ("level", np.uint8),            # Level number (0 when no level is played)
+    ("wave", np.int16),             # Index of the last wave spawned in the level (-1 before the first one)
+    ("enemies", np.uint16),
+    ("bullets", np.uint16),         # Player and enemy bullets
+    ("collectibles", np.uint16),
+])
+
+def get_percentiles(values: np.ndarray) -> dict:
+    if not len(values):
+        return {}
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {"mean": round(float(values.mean()), 3), "p50": round(float(p50), 3), "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3), "max": round(float(values.max()), 3)}
+
+def summarize(frames: np.ndarray, budget_ms: float = TELEMETRY_BUDGET_MS, worst_waves: int = TELEMETRY_WORST_WAVES) -> dict:
+    # Summary of recorded frames (in the order they were played)
+    work_ms = frames["work_ms"]
+    over_budget = work_ms > budget_ms
+    summary = {
+        "frames": len(frames),
+        "frame_ms": get_percentiles(frames["frame_ms"][1:]),   # The first frame has no previous frame
+        "work_ms": get_percentiles(work_ms),
+        "phases_ms": {phase: get_percentiles(frames[f"{phase}_ms"]) for phase in PHASES},
+        "budget_ms": round(budget_ms, 3),
+        "over_budget": int(np.count_nonzero(over_budget)),
+        "over_budget_ratio": round(float(over_budget.mean()), 5) if len(frames) else 0.0,
+    }
+
+    # Waves of the levels played, the worst (highest p99 work time) first
+    waves = []
+    playing = frames["level"] > 0
+    keys = frames["level"].astype(np.int64) << 16 | (frames["wave"].astype(np.int64) + 1)
+    for key in np.unique(keys[playing]).tolist():
+        selected = playing & (keys == key)
+        wave_work_ms = work_ms[selected]
+        waves.append({
+            "level": key >> 16,
+            "wave": (key & 0xFFFF) - 1,
+            "frames": int(np.count_nonzero(selected)),
+            "work_ms": get_percentiles(wave_work_ms),
+            "over_budget": int(np.count_nonzero(over_budget[selected])),
+            "max_enemies": int(frames["enemies"][selected].max()),
+            "max_bullets": int(frames["bullets"][selected].max()),
+        })
+    waves.sort(key=lambda wave: wave["work_ms"]["p99"], reverse=True)
+    summary["worst_waves"] = waves[:worst_waves]
+    return summary
+
+def get_machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "pygame": pg.version.ver,
+        "numpy": np.__version__,
+    }
+
+def get_settings_info() -> dict:
+    # Settings that change the cost of a frame
+    return {
+        "FRAME_RATE": FRAME_RATE,
+        "SIM_RATE": SIM_RATE,
+        "DIRTY_RECT_RENDERING": DIRTY_RECT_RENDERING,
+        "ENEMY_SYSTEMS": ENEMY_SYSTEMS,
+        "PRECISE_COLLISIONS": PRECISE_COLLISIONS,
+        "ENEMY_SPAWN_BATCH_SIZE": ENEMY_SPAWN_BATCH_SIZE,
+        "INPUT_SOURCE": INPUT_SOURCE,
+    }
+
+class FrameTelemetry:
+    _telemetry = None # FrameTelemetry singleton. Use instance() to access it.
+    def __init__(self, capacity: int = TELEMETRY_CAPACITY, enabled: bool = TELEMETRY_ENABLED) -> None:
+        self.enabled = enabled
+        self.frames = np.zeros(capacity if enabled else 0, dtype=FRAME_DTYPE)
+        self.count = 0                  # Frames recorded since the start (the last len(self.frames) are kept)
+        self.start_time = datetime.now()
+        self.frame_start: float = None
+        self.phase_start = 0.0
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.frame_ms = 0.0
+        self.startup_ms: dict[str, float] = {}     # Cold start timings (e.g. time to the first frame)
+
+    @staticmethod
+    def instance() -> FrameTelemetry:
+        if not FrameTelemetry._telemetry:
+            FrameTelemetry._telemetry = FrameTelemetry()
+        return FrameTelemetry._telemetry
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self.frame_ms = (now - self.frame_start)*1000 if self.frame_start is not None else 0.0
+        self.frame_start = self.phase_start = now
+
+    def end_phase(self, phase: str) -> None:
+        # The phases run one after the other: each one ends where the next one begins
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self.phase_times[phase] = (now - self.phase_start)*1000
+        self.phase_start = now
+
+    def set_startup_time(self, name: str, seconds: float) -> None:
+        self.startup_ms[name] = round(seconds*1000, 3)
+
+    def end_frame(self, steps: int, game_state: int, level: Level = None) -> None:
+        # level: the level being played, if any
+        if not self.enabled:
+            return
+        update_ms, draw_ms, present_ms = self.phase_times.values()
+        if level:
+            tags = (level.level_nbr, level.get_wave_idx(), len(level.enemies),
+                    len(level.player_bullets) + len(level.enemy_bullets), len(level.collectibles))
+        else:
+            tags = (0, -1, 0, 0, 0)
+        self.frames[self.count % len(self.frames)] = (self.frame_ms, update_ms + draw_ms + present_ms, update_ms, draw_ms,
+                                                      present_ms, min(steps, 255), game_state) + tags
+        self.count += 1
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+
+    def get_frames(self) -> np.ndarray:
+        # Recorded frames in the order they were played
+        if self.count <= len(self.frames):
+            return self.frames[:self.count]
+        split = self.count % len(self.frames)
+        return np.concatenate((self.frames[split:], self.frames[:split]))
+
+    def write_session(self, directory: str = TELEMETRY_DIR) -> str:
+        # Write the summary and the raw frames of the session. Return the path of the summary (None if nothing
+        # was recorded).
+        if not self.enabled or not self.count:
+            return None
+        frames = self.get_frames()
+        summary = {
+            "session": {
+                "start": self.start_time.isoformat(timespec="seconds"),
+                "duration_s": round((datetime.now() - self.start_time).total_seconds(), 3),
+                "frames_played": self.count,
+                "frames_kept": len(frames),
+            },
+            "startup_ms": self.startup_ms,
+            "machine": get_machine_info(),
+            "settings": get_settings_info(),
+        }
+        summary.update(summarize(frames))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"session_{self.start_time.strftime('%Y%m%d_%H%M%S')}")
+        np.save(f"{path}.npy", frames)
+        with open(f"{path}.json", "w") as file:
+            json.dump(summary, file, indent=4)
+        return f"{path}.json"
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Summarize the raw frames of a {GAME_TITLE} session.")
+    parser.add_argument("path", help="raw frames of a session (.npy, see TELEMETRY_DIR)")
+    parser.add_argument("--budget", type=float, default=TELEMETRY_BUDGET_MS, help="frame budget in ms")
+    args = parser.parse_args()
+    frames = np.load(args.path)
+    if frames.dtype != FRAME_DTYPE:
+        sys.exit(f"{args.path} was recorded by another version of the telemetry")
+    json.dump(summarize(frames, args.budget), sys.stdout, indent=4)
+    print()
+
+if __name__ == "__main__":
+    main()
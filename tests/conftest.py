@@ -0,0 +1,42 @@
+from __future__ import annotations
+import os
+import sys
+
+# The game modules are flat modules at the root of the repository, and their asset and level paths are
+# relative to it
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.chdir(ROOT_DIR)
+
+import headless     # Selects the dummy SDL drivers (must be imported before pygame is initialized)
+import pygame as pg
+import pytest
+from sprites import Player
+from gameclock import GameClock
+from levels import Level
+
+@pytest.fixture(scope="session", autouse=True)
+def init_pygame():
+    headless.init_headless()
+    yield
+    pg.quit()
+
+@pytest.fixture
+def player() -> Player:
+    # The player, reset for a new game (and given its input source back after the test)
+    if not Level.player:
+        Level.player = pg.sprite.GroupSingle(Player())     # Like the first Level.start() does
+    player = Player.instance()
+    prev_input = player.input
+    player.reset()
+    pg.event.clear()
+    yield player
+    player.input = prev_input
+    player.reset()
+
+@pytest.fixture
+def clock() -> GameClock:
+    # The game clock, from game time 0
+    clock = GameClock.instance()
+    clock.time = 0.0
+    return clock
@@ -0,0 +1,49 @@
+from __future__ import annotations
+import threading
+import pygame as pg
+from settings import ENEMY_BEAST_IMG_PATH, ENEMY_BEAST_IMG_SCALE, ENEMY_HIT_DURATION, ENEMY_PARASITE_IMG_PATH, HIT_ALPHA
+from assets import SPRITE_IMAGES, AssetStore
+from bullets import BulletStore
+from sprites import Parasite
+
+def test_each_file_is_loaded_once():
+    store = AssetStore()
+    image = store.get_image(ENEMY_BEAST_IMG_PATH)
+    scaled = store.get_image(ENEMY_BEAST_IMG_PATH, ENEMY_BEAST_IMG_SCALE)
+    assert store.get_image(ENEMY_BEAST_IMG_PATH) is image
+    assert store.get_image(ENEMY_BEAST_IMG_PATH, ENEMY_BEAST_IMG_SCALE) is scaled
+    assert scaled.get_width() == round(image.get_width() * ENEMY_BEAST_IMG_SCALE)
+    assert store.load_counts == {ENEMY_BEAST_IMG_PATH: 1}
+    assert store.get_stats()["hits"] == 3     # The scaled variant is made from the stored image
+
+def test_preload_converts_decoded_files():
+    store = AssetStore()
+    thread = threading.Thread(target=store.decode)      # Like the loading thread
+    thread.start()
+    thread.join()
+    assert len(store.decoded) == len({path for path, _, _ in SPRITE_IMAGES}) and not store.images
+    store.preload()
+    assert not store.decoded
+    assert all(count == 1 for count in store.load_counts.values())
+    assert store.get_image(ENEMY_PARASITE_IMG_PATH).get_flags() & pg.SRCALPHA
+
+def test_hit_variant_is_shared_and_translucent():
+    store = AssetStore()
+    normal, hit = store.get_variants(ENEMY_PARASITE_IMG_PATH)
+    assert store.get_variants(ENEMY_PARASITE_IMG_PATH)[1] is hit
+    normal_alpha = pg.surfarray.pixels_alpha(normal).astype(int)
+    hit_alpha = pg.surfarray.pixels_alpha(hit).astype(int)
+    assert abs(hit_alpha - normal_alpha * HIT_ALPHA // 255).max() <= 1
+    assert (pg.surfarray.pixels3d(hit) == pg.surfarray.pixels3d(normal))[normal_alpha > 0].all()
+
+def test_enemies_show_the_shared_hit_image(clock):
+    enemies = [Parasite((100, 100)), Parasite((200, 100))]
+    normal, hit = AssetStore.instance().get_variants(ENEMY_PARASITE_IMG_PATH)
+    bullets = BulletStore()
+    enemies[0].hit(1)
+    for enemy in enemies:
+        enemy.update(bullets)
+    assert enemies[0].image is hit and enemies[1].image is normal
+    clock.time += ENEMY_HIT_DURATION*1000
+    enemies[0].update(bullets)
+    assert enemies[0].image is normal
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from audio import VoiceManager
+from gameclock import GameClock
+
+# Stand-in for a mixer channel: busy from play() until the test frees it
+class FakeChannel:
+    def __init__(self) -> None:
+        self.sound = None
+        self.busy = False
+
+    def play(self, sound) -> None:
+        self.sound = sound
+        self.busy = True
+
+    def get_busy(self) -> bool:
+        return self.busy
+
+def create_voices(nbr_voices: int) -> tuple[VoiceManager, GameClock, list[FakeChannel]]:
+    clock = GameClock()
+    channels = [FakeChannel() for _ in range(nbr_voices)]
+    return VoiceManager(nbr_voices, clock, channels), clock, channels
+
+def advance(clock: GameClock, ms: float) -> None:
+    clock.time += ms
+
+def test_free_voices_then_steal_oldest_lowest_priority():
+    voices, clock, channels = create_voices(3)
+    assert voices.play("parasite_bullet", "p")          # Low priority
+    advance(clock, 200)
+    assert voices.play("gear_bullet", "g")              # Low priority, younger
+    advance(clock, 200)
+    assert voices.play("player_hit", "h")               # High priority
+    assert [channel.sound for channel in channels] == ["p", "g", "h"]
+    advance(clock, 200)
+    assert voices.play("extra_score", "e")              # Normal priority: steals the oldest low priority voice
+    assert [channel.sound for channel in channels] == ["e", "g", "h"]
+    assert voices.counts["stolen"] == 1
+    advance(clock, 200)
+    assert voices.play("beast_bullet", "b")             # Low priority: may only steal the other low priority voice
+    assert [channel.sound for channel in channels] == ["e", "b", "h"]
+    advance(clock, 200)
+    assert voices.play("click", "c")                    # High priority: the lowest priority first, even if younger
+    assert [channel.sound for channel in channels] == ["e", "c", "h"]
+    assert voices.counts["stolen"] == 3
+    channels[2].busy = False                            # A voice that finished playing is free again
+    advance(clock, 200)
+    assert voices.play("power_up", "u")
+    assert channels[2].sound == "u" and voices.counts["stolen"] == 3
+
+def test_lower_priority_cannot_steal():
+    voices, clock, channels = create_voices(2)
+    assert voices.play("player_hit", "h")
+    assert voices.play("click", "c")
+    assert not voices.play("parasite_bullet", "p")
+    assert voices.counts["culled"] == 1
+    assert [channel.sound for channel in channels] == ["h", "c"]
+
+def test_max_instances_restart_the_oldest():
+    voices, clock, channels = create_voices(4)
+    assert voices.play("bullet0", "first")
+    advance(clock, 100)
+    assert voices.play("bullet0", "second")
+    advance(clock, 100)
+    assert voices.play("bullet0", "third")      # bullet0 plays 2 instances at most: the oldest is restarted
+    assert [channel.sound for channel in channels[:2]] == ["third", "second"]
+    assert not channels[2].busy
+    assert voices.counts["restarted"] == 1
+
+def test_cooldown_in_game_time():
+    voices, clock, channels = create_voices(4)
+    assert voices.play("parasite_bullet", "p")
+    assert not voices.play("parasite_bullet", "p")      # Same game time, whatever the wall clock says
+    advance(clock, 99)
+    assert not voices.play("parasite_bullet", "p")
+    advance(clock, 1)
+    assert voices.play("parasite_bullet", "p")          # 0.1 s cooldown
+    assert voices.counts == {"requested": 4, "played": 2, "culled": 2, "restarted": 0, "stolen": 0}
+    # Setting the clock back (e.g. a replay restarting it) forgets the cooldowns
+    clock.time = 0.0
+    assert voices.play("parasite_bullet", "p")
+
+def test_rates_over_the_game_time_window():
+    voices, clock, channels = create_voices(4)
+    for _ in range(10):
+        voices.play("click", "c")
+        advance(clock, 100)
+    rates = voices.get_stats()["per_second"]
+    assert rates["requested"] == 9.0 and rates["played"] == 9.0    # The first one is a second old
+    advance(clock, 1000)
+    assert voices.get_stats()["per_second"]["requested"] == 0.0
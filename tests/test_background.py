@@ -0,0 +1,37 @@
+from __future__ import annotations
+import numpy as np
+import pygame as pg
+from settings import BG_ALPHA, BG_BACK_PATH, BG_FRONT_PATH, WIN_HEIGHT, WIN_WIDTH
+from background import Background
+
+def draw_layers(background: Background) -> pg.Surface:
+    # The background drawn like before the composites: both dimmed layers blitted over black every frame
+    surface = pg.Surface((WIN_WIDTH, WIN_HEIGHT))
+    surface.fill("black")
+    for path, rect in ((BG_BACK_PATH, background.back_rect), (BG_FRONT_PATH, background.front_rect)):
+        layer = pg.image.load(path).convert_alpha()
+        layer.set_alpha(BG_ALPHA)
+        surface.blit(layer, rect)
+    return surface
+
+def test_composite_matches_layers():
+    background = Background()
+    for _ in range(3):
+        expected = pg.surfarray.pixels3d(draw_layers(background)).astype(np.int16)
+        actual = pg.surfarray.pixels3d(background.get_surface()).astype(np.int16)
+        assert np.abs(actual - expected).max() <= 2     # Rounding of the pre-multiplied alpha
+        for _ in range(50):
+            background.update()
+
+def test_composites_are_cached():
+    background = Background(cache_size=2)
+    first = background.get_surface()
+    assert background.get_surface() is first
+    offsets = [background.get_offsets()]
+    while len(offsets) < 4:
+        background.update()
+        if background.get_offsets() not in offsets:
+            offsets.append(background.get_offsets())
+            background.get_surface()
+    assert background.get_stats() == {"hits": 1, "misses": 4, "size": 2}    # The 2 most recent are kept
+    assert list(background.composites) == offsets[2:]
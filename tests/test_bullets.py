@@ -0,0 +1,34 @@
+from __future__ import annotations
+from math import cos, pi, sin
+import pygame as pg
+import pytest
+from settings import BULLET1_SPEED
+from bullets import BulletStore
+from sprites import Bullet1
+from trajectory import get_ring_velocities
+
+def test_aimed_velocity_matches_vector2():
+    # Same floats as pg.Vector2.normalize() (a seed must play the same game as with vectors)
+    store = BulletStore()
+    for direction in [(3, 4), (-7, 250), (0.3, -0.9), (-1, 0)]:
+        idx = store.count
+        Bullet1.fire(store, (100, 200), direction)
+        velocity = pg.Vector2(direction).normalize() * BULLET1_SPEED
+        assert (store.vx[idx], store.vy[idx]) == (velocity.x, velocity.y)
+    with pytest.raises(AssertionError):
+        Bullet1.fire(store, (100, 200), (0, 0))
+
+def test_ring_matches_single_shots():
+    count = 12
+    vx, vy = get_ring_velocities(count, BULLET1_SPEED)
+    assert get_ring_velocities(count, BULLET1_SPEED)[0] is vx   # Computed once
+    singles = BulletStore(capacity=4)
+    ring = BulletStore(capacity=4)     # Grows to fit the ring
+    for store in (singles, ring):
+        Bullet1.fire(store, (0, 0), 1)
+    for i in range(count):
+        Bullet1.fire(singles, (50, 60), (cos((i/count)*2*pi), sin((i/count)*2*pi)))
+    Bullet1.fire_ring(ring, (50, 60), count)
+    assert ring.count == singles.count == count + 1
+    for ring_array, singles_array in zip(ring.get_arrays(), singles.get_arrays()):
+        assert ring_array[:ring.count].tolist() == singles_array[:singles.count].tolist()
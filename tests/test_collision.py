@@ -0,0 +1,41 @@
+from __future__ import annotations
+from random import Random
+import pygame as pg
+from collision import SpatialHash
+
+def random_rects(rng: Random, count: int) -> list[pg.Rect]:
+    # Rects of all sizes, some of them partly off the screen (negative coordinates)
+    return [pg.Rect(rng.randint(-50, 600), rng.randint(-50, 700), rng.randint(1, 90), rng.randint(1, 90)) for _ in range(count)]
+
+def build(rects_a: list[pg.Rect], rects_b: list[pg.Rect], cell_size: int) -> SpatialHash:
+    grid = SpatialHash(cell_size)
+    grid.insert_rects("a", range(len(rects_a)), rects_a)
+    grid.insert_rects("b", range(len(rects_b)), rects_b)
+    return grid
+
+def test_pairs_match_brute_force():
+    rng = Random(1)
+    for cell_size in (8, 32, 128):
+        rects_a, rects_b = random_rects(rng, 80), random_rects(rng, 120)
+        pairs = build(rects_a, rects_b, cell_size).pairs("a", "b")
+        expected = {(i, j) for i, rect_a in enumerate(rects_a) for j, rect_b in enumerate(rects_b) if rect_a.colliderect(rect_b)}
+        assert len(pairs) == len(set(pairs))    # Each pair is reported once
+        assert set(pairs) == expected
+
+def test_query_matches_brute_force():
+    rng = Random(2)
+    rects_a, rects_b = random_rects(rng, 10), random_rects(rng, 150)
+    grid = build(rects_a, rects_b, 32)
+    for rect in random_rects(rng, 50):
+        found = grid.query(rect, "b")
+        assert len(found) == len(set(found))
+        assert set(found) == {j for j, rect_b in enumerate(rects_b) if rect.colliderect(rect_b)}
+
+def test_missing_layer_and_clear():
+    grid = build([pg.Rect(0, 0, 10, 10)], [pg.Rect(5, 5, 10, 10)], 32)
+    assert grid.pairs("a", "b") == [(0, 0)]
+    assert grid.pairs("a", "c") == []
+    assert grid.query(pg.Rect(0, 0, 10, 10), "c") == []
+    grid.clear()
+    assert grid.pairs("a", "b") == []
+    assert grid.pairs_tested == 0
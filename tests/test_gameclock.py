@@ -0,0 +1,34 @@
+from __future__ import annotations
+import pygame as pg
+import pytest
+from settings import INTERPOLATION_MAX_DISTANCE, SIM_RATE
+from gameclock import GameClock
+from levels import Level
+
+def test_fixed_steps():
+    clock = GameClock(sim_rate=SIM_RATE)
+    for _ in range(SIM_RATE):
+        clock.advance()
+    assert clock.steps == SIM_RATE
+    assert clock.time == pytest.approx(1000)    # One second of game time, whatever time the steps took
+    clock.time = 0.0
+    clock.advance()
+    assert clock.ticks() == int(1000/SIM_RATE)  # Whole ms, like pg.time.get_ticks()
+
+def create_sprite(prev_pos: tuple[int, int], pos: tuple[int, int]) -> pg.sprite.Sprite:
+    sprite = pg.sprite.Sprite()
+    sprite.image = pg.Surface((10, 10))
+    sprite.rect = sprite.image.get_rect(topleft = pos)
+    sprite.prev_pos = prev_pos
+    return sprite
+
+def test_sprites_are_drawn_between_steps():
+    level = Level.all_levels[0]
+    surface = pg.Surface((400, 400))
+    moving = create_sprite((100, 100), (110, 90))
+    jumping = create_sprite((0, 0), (INTERPOLATION_MAX_DISTANCE + 1, 0))   # e.g. teleported
+    group = pg.sprite.Group(moving, jumping)
+    rects = level.draw_interpolated(surface, group, 0.5)
+    assert [rect.topleft for rect in rects] == [(105, 95), jumping.rect.topleft]
+    assert level.draw_interpolated(surface, group, 0)[0].topleft == (100, 100)
+    assert level.draw_interpolated(surface, group, 1)[0].topleft == (110, 90)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import random
+import pytest
+from settings import AUTOPILOT_SPEED, GAME_WIDTH
+from benchmark import add_enemy, create_level
+from inputs import Autopilot, InputSource
+from sprites import Bullet1, Parasite
+
+def test_input_source_is_abstract():
+    with pytest.raises(TypeError):
+        InputSource()
+
+@pytest.fixture
+def level(player, clock):
+    # A level with no schedule, the player in the middle of the screen
+    level = create_level()
+    player.rect.centerx = GAME_WIDTH//2
+    yield level
+    level.clear()
+
+def test_autopilot_dodges_a_falling_bullet(level, player):
+    autopilot = Autopilot(lambda: level)
+    Bullet1.fire(level.enemy_bullets, (player.rect.centerx, player.rect.top - 60), -1)
+    state = random.getstate()
+    x, fire = autopilot.read()
+    assert fire
+    assert abs(x - player.rect.centerx) == AUTOPILOT_SPEED     # As fast as it may
+    assert random.getstate() == state   # It only reads the level
+
+def test_autopilot_tracks_the_lowest_enemy(level, player):
+    autopilot = Autopilot(lambda: level)
+    for final_top_pos in ((player.rect.centerx - 150, 40), (player.rect.centerx + 150, 120)):   # The second is lower
+        enemy = Parasite(final_top_pos)
+        enemy.rect.top = final_top_pos[1]    # Entered
+        add_enemy(level, enemy)
+    for _ in range(5):
+        x, _ = autopilot.read()
+        assert x == player.rect.centerx + AUTOPILOT_SPEED
+        player.rect.centerx = x
@@ -0,0 +1,34 @@
+from __future__ import annotations
+import pytest
+import leveldata
+from leveldata import LEVEL_DATA_MAGIC, encode, decode, load_source, get_path
+from settings import LEVEL_NAMES
+
+@pytest.fixture(params=LEVEL_NAMES)
+def source(request) -> dict:
+    return load_source(get_path(request.param, "json"))
+
+def test_encode_decode_round_trip(source: dict):
+    assert decode(encode(source)) == source
+
+def test_compiled_levels_are_up_to_date(source: dict):
+    with open(get_path(f"level{source['level']}", "bin"), "rb") as file:
+        assert decode(file.read()) == source
+
+def test_corrupted_data_fails_the_integrity_check(source: dict):
+    data = bytearray(encode(source))
+    data[-1] ^= 1
+    with pytest.raises(ValueError, match="integrity"):
+        decode(bytes(data))
+    data = bytearray(encode(source))
+    data[len(LEVEL_DATA_MAGIC)] ^= 1    # First byte of the digest
+    with pytest.raises(ValueError, match="integrity"):
+        decode(bytes(data))
+
+def test_other_data_is_rejected(source: dict, monkeypatch: pytest.MonkeyPatch):
+    with pytest.raises(ValueError, match="Not a compiled level"):
+        decode(b"SWRP" + encode(source)[4:])
+    data = encode(source)
+    monkeypatch.setattr(leveldata, "GAME_WIDTH", leveldata.GAME_WIDTH + 1)
+    with pytest.raises(ValueError, match="out of date"):
+        decode(data)
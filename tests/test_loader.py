@@ -0,0 +1,39 @@
+from __future__ import annotations
+import threading
+import pytest
+from loader import AssetLoader
+
+def test_finish_runs_on_the_main_thread():
+    threads = {}
+    def load():
+        threads["load"] = threading.current_thread()
+        return 2
+    def finish(value):
+        threads["finish"] = threading.current_thread()
+        return value * 10
+    loader = AssetLoader()
+    loader.add("a", load, finish)
+    loader.add("b", lambda: "raw")
+    loader.start()
+    assert loader.get("a") == 20
+    assert threads["load"] is not threading.main_thread()
+    assert threads["finish"] is threading.main_thread()
+    loader.thread.join()
+    assert not loader.is_done()     # "b" is loaded, but not finished until update() or get()
+    loader.update()
+    assert loader.is_done() and loader.get_progress() == 1.0
+    assert loader.get("b") == "raw"
+    assert loader.get_stats()["done_time"] is not None
+
+def test_errors_are_raised_by_get():
+    def fail():
+        raise OSError("missing file")
+    finish_calls = []
+    loader = AssetLoader()
+    loader.add("bad", fail, finish_calls.append)
+    loader.add("bad_finish", lambda: 1, lambda _: 1/0)
+    with pytest.raises(OSError):
+        loader.get("bad")       # Starts the loader
+    with pytest.raises(ZeroDivisionError):
+        loader.get("bad_finish")
+    assert not finish_calls
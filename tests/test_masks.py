@@ -0,0 +1,39 @@
+from __future__ import annotations
+from random import Random
+import numpy as np
+import pygame as pg
+from settings import BULLET1_IMG_PATH, ENEMY_BEAST_IMG_PATH, ENEMY_BEAST_IMG_SCALE
+from assets import AssetStore
+from collision import MaskTester
+
+def opaque(image: pg.Surface) -> np.ndarray:
+    # Pixels a mask is made of (pg.mask.from_surface(): alpha above 127), indexed [x, y]
+    return pg.surfarray.array_alpha(image) > 127
+
+def touch(image_a: pg.Surface, rect_a: pg.Rect, image_b: pg.Surface, rect_b: pg.Rect) -> bool:
+    # Brute force: an opaque pixel of each image at the same place of the screen
+    clip = rect_a.clip(rect_b)
+    if not clip.w or not clip.h:
+        return False
+    a = opaque(image_a)[clip.x - rect_a.x:clip.right - rect_a.x, clip.y - rect_a.y:clip.bottom - rect_a.y]
+    b = opaque(image_b)[clip.x - rect_b.x:clip.right - rect_b.x, clip.y - rect_b.y:clip.bottom - rect_b.y]
+    return bool((a & b).any())
+
+def test_overlap_matches_pixels():
+    store = AssetStore.instance()
+    beast, beast_hit = store.get_variants(ENEMY_BEAST_IMG_PATH, ENEMY_BEAST_IMG_SCALE)
+    bullet = store.get_image(BULLET1_IMG_PATH)
+    beast_rect = beast.get_rect(topleft = (100, 100))
+    tester = MaskTester()
+    rng = Random(4)
+    results = []
+    for _ in range(300):
+        # Bullets whose rect overlaps the beast's
+        bullet_rect = bullet.get_rect(center = (rng.randint(beast_rect.left, beast_rect.right), rng.randint(beast_rect.top, beast_rect.bottom)))
+        expected = touch(beast, beast_rect, bullet, bullet_rect)
+        assert tester.overlap(beast, beast_rect, bullet, bullet_rect) == expected
+        assert tester.overlap(beast_hit, beast_rect, bullet, bullet_rect) == expected  # The hit variant has the same shape
+        results.append(expected)
+    assert any(results) and not all(results)    # Both cases were tested
+    assert tester.get_stats() == {"tests": 600, "rejected": 2*results.count(False)}
+    assert store.get_mask(beast) is store.get_mask(beast_hit)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+import pytest
+from pools import Pool, get_pool_stats
+
+class Item:
+    pass
+
+@pytest.fixture
+def pool() -> Pool:
+    pool = Pool("test_items", Item, 2)
+    yield pool
+    Pool.all_pools.remove(pool)
+
+def test_acquire_creates_then_reuses(pool: Pool):
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    assert pool.get_stats()["misses"] == 2
+    pool.release(first)
+    assert pool.acquire() is first
+    stats = pool.get_stats()
+    assert (stats["acquired"], stats["misses"], stats["in_use"], stats["high_water"]) == (3, 2, 2, 2)
+    assert stats["reuse_rate"] == pytest.approx(1/3)
+
+def test_release_keeps_at_most_capacity(pool: Pool):
+    items = [pool.acquire() for _ in range(3)]
+    for item in items:
+        pool.release(item)
+    stats = pool.get_stats()
+    assert (stats["free"], stats["dropped"], stats["in_use"], stats["high_water"]) == (2, 1, 0, 3)
+
+def test_double_release_is_ignored(pool: Pool):
+    item = pool.acquire()
+    pool.release(item)
+    pool.release(item)
+    assert pool.get_stats()["free"] == 1
+    assert pool.in_use == 0
+
+def test_prefill(pool: Pool):
+    pool.prefill(5)
+    stats = pool.get_stats()
+    assert (stats["free"], stats["misses"], stats["acquired"]) == (2, 0, 0)
+    pool.acquire()
+    pool.acquire()
+    pool.acquire()
+    assert pool.get_stats()["misses"] == 1
+    assert get_pool_stats()["test_items"]["in_use"] == 3
+
+def test_clear_keeps_the_objects_in_use(pool: Pool):
+    item = pool.acquire()
+    pool.prefill(2)
+    pool.clear()
+    assert pool.get_stats()["free"] == 0
+    pool.release(item)
+    assert pool.get_stats()["free"] == 1
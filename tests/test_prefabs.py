@@ -0,0 +1,53 @@
+from __future__ import annotations
+import random
+import pygame as pg
+import pytest
+from sprites import ENEMY_TYPES, Beast, Enemy, Gear, Parasite, clear_enemy_pools
+
+# Attributes that make up the state of a freshly spawned enemy
+STATE = ("state", "fire_timer", "hit_timer", "lives", "entrance_end_time", "final_top_pos")
+
+def get_state(enemy: Enemy) -> dict:
+    state = {name: getattr(enemy, name) for name in STATE}
+    state.update(rect=tuple(enemy.rect), image=enemy.image, kind=type(enemy))
+    return state
+
+@pytest.mark.parametrize("enemy_class, args", [(Parasite, ((120, 80), -1)), (Gear, ((200, 90), 1)), (Beast, ((150, 60),))])
+def test_spawn_matches_construction(clock, enemy_class: type[Enemy], args: tuple):
+    clear_enemy_pools()
+    random.seed(3)
+    spawned = enemy_class.spawn(*args)
+    spawned_next = random.random()
+    random.seed(3)
+    built = enemy_class(*args)
+    assert get_state(spawned) == get_state(built)
+    assert random.random() == spawned_next      # Same random draws as the constructor
+    assert spawned.rect is not enemy_class.prefab.template.rect
+    spawned.kill()
+
+def test_clones_are_independent(clock):
+    clear_enemy_pools()
+    clones = Parasite.prefab.clones
+    group = pg.sprite.Group()
+    first = Parasite.spawn((100, 100), 1)
+    group.add(first)
+    second = Parasite.spawn((300, 100), -1)
+    assert not second.groups()
+    assert second.rect is not first.rect and first.rect.centerx == 100
+    assert Parasite.prefab.clones == clones + 2
+    first.kill()
+    assert Parasite.spawn((50, 50), 1) is first     # Released to the pool, and reset on the next spawn
+    assert first.rect.centerx == 50 and first.direction == 1
+    first.kill()
+    second.kill()
+
+def test_template_build_keeps_the_random_sequence(clock):
+    clear_enemy_pools()
+    random.seed(5)
+    expected = [random.random() for _ in range(3)]
+    random.seed(5)
+    Gear.prefab.clone()     # First clone: builds the template
+    assert [random.random() for _ in range(3)] == expected
+
+def test_registry_covers_the_enemy_types():
+    assert all(issubclass(enemy_class, Enemy) and enemy_class.prefab for enemy_class in ENEMY_TYPES.values())
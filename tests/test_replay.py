@@ -0,0 +1,70 @@
+from __future__ import annotations
+import math
+import pytest
+from settings import ENEMY_SPAWN_BATCH_SIZE, GAME_WIDTH
+from inputs import InputSource
+from levels import Level
+from replay import Replay, ReplayRecorder, load_replay, play, read_varint, unzigzag, write_varint, zigzag
+
+# Player input sweeping the screen, firing in bursts: long runs of identical updates and small moves
+def sweep_inputs(count: int) -> list[tuple[int, bool]]:
+    return [(GAME_WIDTH//2 + int((GAME_WIDTH//2 - 20)*math.sin(i / 90)), (i // 120) % 3 != 2) for i in range(count)]
+
+class ScriptedInput(InputSource):
+    def __init__(self, inputs: list[tuple[int, bool]]) -> None:
+        self.inputs = iter(inputs)
+
+    def read(self) -> tuple[int, bool]:
+        return next(self.inputs)
+
+def test_zigzag_round_trip():
+    assert [zigzag(value) for value in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+    for value in list(range(-1000, 1000)) + [2**40, -2**40]:
+        assert zigzag(value) >= 0
+        assert unzigzag(zigzag(value)) == value
+
+def test_varint_round_trip():
+    values = [0, 1, 127, 128, 255, 300, 16383, 16384, 2**32, 2**63 - 1]
+    buffer = bytearray()
+    for value in values:
+        write_varint(buffer, value)
+    assert buffer[:4] == bytes([0, 1, 127, 0x80]) and buffer[4] == 1     # 128: two bytes, low bits first
+    offset = 0
+    for value in values:
+        read, offset = read_varint(buffer, offset)
+        assert read == value
+    assert offset == len(buffer)
+
+def test_recorded_input_round_trip(tmp_path):
+    inputs = sweep_inputs(2000) + [(0, False)]*500 + [(GAME_WIDTH, True)]*3
+    path = str(tmp_path / "game.swr")
+    recorder = ReplayRecorder(path, ["level1", "level2"], 1234.5, seed=42, source=ScriptedInput(inputs))
+    assert [recorder.read() for _ in inputs] == inputs
+    recorder.close()
+    replay = load_replay(path)
+    assert (replay.seed, replay.start_time, replay.level_names) == (42, 1234.5, ["level1", "level2"])
+    assert replay.inputs == inputs
+    assert recorder.size < len(inputs)  # Runs of identical updates take a few bytes each
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.swr"
+    path.write_bytes(b"SWSS" + bytes(16))
+    with pytest.raises(ValueError):
+        load_replay(str(path))
+
+# Golden replay: a seeded game of the player sweeping the screen and always firing, until it dies.
+# Update the result only for changes that are meant to change the game.
+GOLDEN_SEED = 2024
+GOLDEN_INPUTS = [(GAME_WIDTH//2 + int((GAME_WIDTH//2 - 20)*math.sin(i / 40)), True) for i in range(2400)]
+GOLDEN_RESULT = {"outcome": "game_over", "level": 1, "score": 180, "lives": 0, "updates": 1672}
+
+def play_golden(flags: int) -> dict:
+    level_names = [level.data_name for level in Level.all_levels]
+    replay = Replay(GOLDEN_SEED, 0.0, flags, ENEMY_SPAWN_BATCH_SIZE, level_names, GOLDEN_INPUTS)
+    result = play(replay)
+    for level in Level.all_levels:
+        level.systems = {}
+    return {name: result[name] for name in GOLDEN_RESULT}
+
+def test_golden_replay(player):
+    assert play_golden(0) == GOLDEN_RESULT
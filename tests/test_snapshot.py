@@ -0,0 +1,77 @@
+from __future__ import annotations
+import math
+import pygame as pg
+import pytest
+from random import seed as seed_random
+from settings import GAME_WIDTH
+from gameclock import GameClock
+from inputs import InputSource
+from levels import Level
+from systems import create_enemy_systems
+from snapshot import take_snapshot, restore_snapshot, read_snapshot, write_snapshot
+
+# Player input that only depends on the game time, so that it plays the same after the clock is set back
+class ClockSweep(InputSource):
+    def __init__(self, clock: GameClock) -> None:
+        self.clock = clock
+
+    def read(self) -> tuple[int, bool]:
+        return GAME_WIDTH//2 + int((GAME_WIDTH//2 - 20)*math.sin(self.clock.steps / 50)), True
+
+def get_state(level: Level) -> tuple:
+    player = level.player.sprite
+    enemies = tuple((type(enemy).__name__, enemy.rect.topleft, enemy.lives) for enemy in level.enemies)
+    bullets = tuple((store.count, store.x[:store.count].tolist(), store.y[:store.count].tolist())
+                    for store in (level.player_bullets, level.enemy_bullets))
+    collectibles = tuple(collectible.rect.topleft for collectible in level.collectibles)
+    return (player.score, player.lives, player.bullet_level, player.rect.topleft, enemies, bullets, collectibles,
+            len(level.timeline))
+
+def play(level: Level, clock: GameClock, updates: int) -> list[tuple]:
+    states = []
+    for _ in range(updates):
+        pg.event.get()
+        level.update()
+        clock.advance()
+        states.append(get_state(level))
+    return states
+
+@pytest.fixture(params=[False, True], ids=["sprites", "systems"])
+def level(request, player, clock: GameClock) -> Level:
+    # Level 2, played for 10 s by a player that can't die
+    level = Level.all_levels[1]
+    level.systems = create_enemy_systems(level.clock) if request.param else {}
+    seed_random(7)
+    level.start()
+    player.input = ClockSweep(clock)
+    player.lives = 10**9
+    play(level, clock, 600)
+    yield level
+    level.clear()
+    level.systems = {}
+
+def test_restored_level_plays_the_same(level: Level, clock: GameClock):
+    snapshot = take_snapshot(level, (1234.0,))
+    time, steps = clock.time, clock.steps
+    expected = play(level, clock, 150)
+    clock.time, clock.steps = time, steps
+    restored, extra_timers = restore_snapshot(snapshot)
+    assert restored is level
+    assert extra_timers == (1234.0,)
+    assert play(level, clock, 150) == expected
+
+def test_snapshot_restore_snapshot_is_identical(level: Level):
+    snapshot = take_snapshot(level)
+    assert len(level.enemies) and level.enemy_bullets.count   # The snapshot has something to restore
+    restore_snapshot(snapshot)
+    assert take_snapshot(level) == snapshot
+
+def test_file_round_trip(level: Level, tmp_path):
+    snapshot = take_snapshot(level)
+    path = str(tmp_path / "checkpoint.swss")
+    write_snapshot(path, snapshot)
+    assert read_snapshot(path) == snapshot
+
+def test_invalid_data_is_rejected():
+    with pytest.raises(ValueError):
+        restore_snapshot(b"SWRP" + bytes(64))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+from random import seed
+import pytest
+from settings import GAME_WIDTH
+from benchmark import add_enemy, create_level
+from replay import FLAG_ENEMY_SYSTEMS
+from sprites import Beast, Gear, Parasite
+from systems import create_enemy_systems
+from test_replay import GOLDEN_RESULT, play_golden
+
+# A mixed horde (some enemies near the edges, so that they turn around), hit now and then
+def create_horde() -> list:
+    enemies = [Parasite((30 + i*60, 40 + (i % 3)*30), 1 if i % 2 == 0 else -1) for i in range(10)]
+    enemies += [Parasite((GAME_WIDTH - 20, 150), 1), Parasite((20, 180), -1)]
+    enemies += [Gear((60 + i*120, 80 + (i % 2)*60), 1 if i % 2 == 0 else -1) for i in range(4)]
+    enemies += [Beast((100, 50)), Beast((GAME_WIDTH - 100, 50))]
+    return enemies
+
+def play_horde(clock, use_systems: bool, updates: int) -> list:
+    # The position and image of every enemy and the enemy bullets after each update
+    seed(7)
+    clock.time = 0.0
+    level = create_level()
+    level.systems = create_enemy_systems(level.clock) if use_systems else {}
+    enemies = create_horde()
+    for enemy in enemies:
+        add_enemy(level, enemy)
+    trace = []
+    for i in range(updates):
+        if i % 40 == 20:
+            enemies[(i // 40) % len(enemies)].hit(1)
+        level.update_enemies()
+        level.clock.advance()
+        bullets = level.enemy_bullets
+        trace.append(([(enemy.rect.topleft, enemy.image) for enemy in enemies],
+                      bullets.x[:bullets.count].tolist(), bullets.y[:bullets.count].tolist()))
+    level.clear()
+    return trace
+
+def test_systems_update_like_sprites(player, clock):
+    sprites_trace = play_horde(clock, False, 600)
+    systems_trace = play_horde(clock, True, 600)
+    for update, (expected, actual) in enumerate(zip(sprites_trace, systems_trace)):
+        assert actual == expected, f"update {update}"
+    assert sprites_trace[-1][1]     # The enemies fired
+
+def test_golden_replay_with_systems(player):
+    # Same seed, same game
+    assert play_golden(FLAG_ENEMY_SYSTEMS) == GOLDEN_RESULT
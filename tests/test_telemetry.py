@@ -0,0 +1,48 @@
+from __future__ import annotations
+import json
+import numpy as np
+from telemetry import FRAME_DTYPE, FrameTelemetry, summarize
+
+def record(telemetry: FrameTelemetry, work_ms: list[float]) -> None:
+    # Frames whose whole work is the update phase, outside of any level
+    for ms in work_ms:
+        telemetry.phase_times["update"] = ms
+        telemetry.end_frame(1, 0)
+
+def test_ring_buffer_keeps_the_last_frames_in_order():
+    telemetry = FrameTelemetry(capacity=4, enabled=True)
+    record(telemetry, [1, 2, 3, 4, 5, 6])
+    assert telemetry.count == 6
+    assert telemetry.get_frames()["work_ms"].tolist() == [3, 4, 5, 6]
+
+def test_disabled_records_nothing(tmp_path):
+    telemetry = FrameTelemetry(capacity=4, enabled=False)
+    record(telemetry, [1, 2])
+    assert telemetry.count == 0
+    assert telemetry.write_session(str(tmp_path)) is None
+
+def test_summary():
+    frames = np.zeros(100, dtype=FRAME_DTYPE)
+    frames["work_ms"] = np.arange(1, 101)
+    frames["frame_ms"] = 16.0
+    frames["level"][50:] = 1
+    frames["wave"] = -1
+    frames["wave"][75:] = 0
+    summary = summarize(frames, budget_ms=90, worst_waves=5)
+    assert summary["work_ms"]["p50"] == 50.5 and summary["work_ms"]["max"] == 100
+    assert summary["over_budget"] == 10 and summary["over_budget_ratio"] == 0.1
+    # Only the frames played in a level are grouped by wave, the worst first
+    assert [(wave["level"], wave["wave"], wave["frames"]) for wave in summary["worst_waves"]] == [(1, 0, 25), (1, -1, 25)]
+    assert summary["worst_waves"][0]["over_budget"] == 10
+
+def test_session_files(tmp_path):
+    telemetry = FrameTelemetry(capacity=8, enabled=True)
+    telemetry.set_startup_time("first_frame", 0.0421)
+    record(telemetry, [5, 10, 15])
+    path = telemetry.write_session(str(tmp_path))
+    with open(path) as file:
+        summary = json.load(file)
+    assert summary["session"]["frames_played"] == 3
+    assert summary["startup_ms"] == {"first_frame": 42.1}
+    assert summary["work_ms"]["max"] == 15
+    assert np.load(path.replace(".json", ".npy")).tolist() == telemetry.get_frames().tolist()
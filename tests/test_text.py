@@ -0,0 +1,36 @@
+from __future__ import annotations
+import pygame as pg
+import pytest
+from settings import STATS_FONT_PATH, STATS_FONT_SIZE, TITLE_FONT_PATH, TITLE_FONT_SIZE
+from text import TextCache
+
+NUMBERS = [0, 1, 7, 10, 11, 42, 101, 4711, 9876543, 1234567890]
+
+def draw(source: pg.Surface | None, size: tuple[int, int]) -> pg.Surface:
+    surface = pg.Surface(size)
+    if source:
+        surface.blit(source, (3, 2))
+    return surface
+
+@pytest.mark.parametrize("path, size", [(STATS_FONT_PATH, STATS_FONT_SIZE), (TITLE_FONT_PATH, TITLE_FONT_SIZE)])
+def test_draw_number_matches_font_render(path: str, size: int):
+    font = pg.font.Font(path, size)
+    cache = TextCache()
+    for number in NUMBERS:
+        expected = font.render(str(number), None, "white")
+        canvas_size = (expected.get_width() + 10, expected.get_height() + 4)
+        surface = pg.Surface(canvas_size)
+        rect = cache.draw_number(surface, font, number, "white", (3, 2))
+        assert rect == pg.Rect((3, 2), expected.get_size()), number
+        assert pg.image.tobytes(surface, "RGB") == pg.image.tobytes(draw(expected, canvas_size), "RGB"), number
+
+def test_render_is_cached_with_lru_eviction():
+    font = pg.font.Font(STATS_FONT_PATH, STATS_FONT_SIZE)
+    cache = TextCache(capacity=2)
+    first = cache.render(font, "a", "white")
+    assert cache.render(font, "a", "white") is first
+    cache.render(font, "b", "white")
+    cache.render(font, "a", "white")    # "b" is now the least recently used
+    cache.render(font, "c", "white")
+    assert cache.get_stats() == {"hits": 2, "misses": 3, "evictions": 1, "size": 2}
+    assert cache.render(font, "a", "white") is first
@@ -0,0 +1,75 @@
+from __future__ import annotations
+import pytest
+from gameclock import GameClock
+from levels import Timeline
+
+@pytest.fixture
+def clock() -> GameClock:
+    return GameClock(100)   # 10 ms steps
+
+def advance(clock: GameClock, ms: int) -> None:
+    for _ in range(round(ms / clock.step_ms)):
+        clock.advance()
+
+def test_actions_run_in_time_then_scheduling_order(clock: GameClock):
+    timeline = Timeline(clock)
+    timeline.start()
+    runs = []
+    timeline.schedule(2, lambda: runs.append("c"))
+    timeline.schedule(1, lambda: runs.append("a"))
+    timeline.schedule(1, lambda: runs.append("b"))
+    assert timeline.get_next_time() == 1
+    assert timeline.update() == 0
+    advance(clock, 1000)
+    assert timeline.update() == 2
+    assert runs == ["a", "b"]
+    advance(clock, 1000)
+    assert timeline.update() == 1
+    assert runs == ["a", "b", "c"]
+    assert len(timeline) == 0
+    assert timeline.get_next_time() is None
+
+def test_pause_and_resume(clock: GameClock):
+    timeline = Timeline(clock)
+    timeline.start()
+    runs = []
+    timeline.schedule(1, lambda: runs.append("a"))
+    advance(clock, 500)
+    timeline.pause()
+    advance(clock, 2000)
+    assert timeline.update() == 0
+    assert timeline.get_time() == pytest.approx(0.5)
+    timeline.resume()
+    advance(clock, 400)
+    assert timeline.update() == 0
+    advance(clock, 100)
+    assert timeline.update() == 1
+    assert timeline.get_time() == pytest.approx(1.0)
+
+def test_time_scale(clock: GameClock):
+    timeline = Timeline(clock)
+    timeline.start()
+    advance(clock, 500)
+    timeline.set_time_scale(2)
+    advance(clock, 500)
+    timeline.advance()
+    assert timeline.get_time() == pytest.approx(1.5)
+    timeline.set_time_scale(0)
+    advance(clock, 500)
+    timeline.advance()
+    assert timeline.get_time() == pytest.approx(1.5)
+    with pytest.raises(AssertionError):
+        timeline.set_time_scale(-1)
+
+def test_seek(clock: GameClock):
+    timeline = Timeline(clock)
+    timeline.start()
+    runs = []
+    for time in (1, 2, 3):
+        timeline.schedule(time, lambda time=time: runs.append(time))
+    timeline.seek(1.5)
+    assert timeline.update() == 1   # Passed actions run on the next update
+    timeline.seek(2.5, skip=True)
+    assert timeline.update() == 0   # Skipped actions never run
+    assert runs == [1]
+    assert timeline.get_next_time() == 3
@@ -0,0 +1,27 @@
+from __future__ import annotations
+from math import cos, pi, sin
+import numpy as np
+from settings import ENEMY_BEAST_WAVE_AMP, ENEMY_BEAST_WAVE_FREQ, ENEMY_FLOODER_U_BORDER_OFFSET, GAME_WIDTH, WIN_HEIGHT
+from trajectory import BEAST_CIRCLE, FLOODER_U_PATH, CircleTable
+
+def test_circle_matches_trigonometry():
+    # Over several periods, like a beast circling for a whole level
+    times = range(0, 20000, 7)
+    for t in times:
+        angle = ENEMY_BEAST_WAVE_FREQ*(t/1000)*2*pi
+        expected = (int(ENEMY_BEAST_WAVE_AMP*sin(angle)), int(ENEMY_BEAST_WAVE_AMP*cos(angle)))
+        assert BEAST_CIRCLE.get_offset(t) == expected, f"t = {t} ms"
+    x_offsets, y_offsets = BEAST_CIRCLE.get_offsets(np.array(times))
+    assert list(zip(x_offsets.tolist(), y_offsets.tolist())) == [BEAST_CIRCLE.get_offset(t) for t in times]
+
+def test_circle_rebuild():
+    table = CircleTable(10, 2)
+    assert table.period == 500 and table.get_offset(125) == (10, 0) and table.get_offset(625) == (10, 0)
+    table.build(20, 4)
+    assert table.period == 250 and table.get_offset(0) == (0, 20)
+
+def test_u_path_matches_formula():
+    border = ENEMY_FLOODER_U_BORDER_OFFSET
+    for centerx in range(GAME_WIDTH + 1):
+        expected = int(WIN_HEIGHT - border - (WIN_HEIGHT - 2*border)*(((2*(centerx-border)/(GAME_WIDTH-2*border)) - 1)**2))
+        assert FLOODER_U_PATH[centerx] == expected
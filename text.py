@@ -0,0 +1,70 @@
+from __future__ import annotations
+from collections import OrderedDict
+import pygame as pg
+from settings import *
+
+# Cache of rendered text surfaces, keyed by (font, text, color), with LRU eviction.
+# Numbers that change often (e.g. the score) are composited from cached digit glyphs instead,
+# so that they never fill the cache nor rasterize text.
+class TextCache:
+    _cache = None # TextCache singleton. Use instance() to access it.
+    def __init__(self, capacity: int = TEXT_CACHE_CAPACITY) -> None:
+        self.capacity = capacity        # Maximum number of surfaces kept
+        self.surfaces: OrderedDict[tuple, pg.Surface] = OrderedDict()  # Least recently used first
+        self.glyphs: dict[tuple, list[tuple[pg.Surface, int, int]]] = {} # (font, color) -> (surface, x of the origin, advance) per digit
+        self.hits = 0
+        self.misses = 0                 # Number of render() calls that had to rasterize the text
+        self.evictions = 0
+
+    @staticmethod
+    def instance() -> TextCache:
+        if not TextCache._cache:
+            TextCache._cache = TextCache()
+        return TextCache._cache
+
+    def render(self, font: pg.font.Font, text: str, color) -> pg.Surface:
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, None, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def get_glyphs(self, font: pg.font.Font, color) -> list[tuple[pg.Surface, int, int]]:
+        key = (font, color)
+        if key not in self.glyphs:
+            digits = "0123456789"
+            # A text is rendered from the origin of its first glyph, which is shifted right when the glyph has a
+            # negative bearing: the x of the origin of a glyph rendered alone is its width past its advance
+            self.glyphs[key] = []
+            for digit, (_, _, _, _, advance) in zip(digits, font.metrics(digits)):
+                glyph = font.render(digit, None, color)
+                self.glyphs[key].append((glyph, glyph.get_width() - advance, advance))
+        return self.glyphs[key]
+
+    def draw_number(self, surface: pg.Surface, font: pg.font.Font, number: int, color, topleft: tuple[int,int]) -> pg.Rect:
+        # Draw a non-negative integer from its digit glyphs (same result as font.render()). Return the rect drawn.
+        glyphs = self.get_glyphs(font, color)
+        left, top = topleft
+        text = str(number)
+        x = left + glyphs[ord(text[0]) - 48][1]     # Origin of the first glyph
+        for digit in text:
+            glyph, origin, advance = glyphs[ord(digit) - 48]
+            surface.blit(glyph, (x - origin, top))
+            x += advance
+        return pg.Rect(left, top, x - left, font.get_height())
+
+    def get_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.surfaces),
+        }
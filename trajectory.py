@@ -0,0 +1,57 @@
+from __future__ import annotations
+import numpy as np
+import pygame as pg
+from settings import *
+from math import cos, sin, pi
+
+# Trajectory lookup tables, computed once and shared by all the enemies (and their systems, see systems.py),
+# so that no trigonometry is done while the enemies move and fire.
+
+_ring_velocities: dict[tuple[int, float], tuple[np.ndarray, np.ndarray]] = {}
+
+def get_ring_velocities(count: int, speed: float) -> tuple[np.ndarray, np.ndarray]:
+    # Velocities (vx, vy) of count bullets fired in all directions at speed (computed on first use for each
+    # count and speed, the way Bullet.emit() computes an aimed velocity). The arrays are shared: they must not
+    # be modified.
+    key = (count, speed)
+    if key not in _ring_velocities:
+        velocities = [pg.Vector2(cos((i/count)*2*pi), sin((i/count)*2*pi)).normalize() * speed for i in range(count)]
+        _ring_velocities[key] = (np.array([v.x for v in velocities]), np.array([v.y for v in velocities]))
+    return _ring_velocities[key]
+
+def build_u_path(border: int) -> list[int]:
+    # Top of a U-shaped path between the top corners of the game area (border px from the edges),
+    # for each centerx from 0 to GAME_WIDTH
+    return [int(WIN_HEIGHT - border - (WIN_HEIGHT - 2*border)*(((2*(x-border)/(GAME_WIDTH-2*border)) - 1)**2))
+            for x in range(GAME_WIDTH + 1)]
+
+# Point moving on a circle, starting at its top (x offset = radius*sin, y offset = radius*cos, truncated to ints).
+# Sampled every ms over one period: get_offset() takes the time in ms since the motion started.
+class CircleTable:
+    def __init__(self, radius: float, freq: float) -> None:
+        self.build(radius, freq)
+
+    def build(self, radius: float, freq: float) -> None:
+        self.period = round(1000 / freq)    # ms
+        angles = [freq*(t/1000)*2*pi for t in range(self.period)]
+        self.x = np.array([int(radius*sin(angle)) for angle in angles], dtype=np.int64)
+        self.y = np.array([int(radius*cos(angle)) for angle in angles], dtype=np.int64)
+        self.x_list = self.x.tolist()       # Faster to index one by one than the arrays
+        self.y_list = self.y.tolist()
+
+    def get_offset(self, t: int) -> tuple[int, int]:
+        index = t % self.period
+        return self.x_list[index], self.y_list[index]
+
+    def get_offsets(self, t: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        index = t % self.period
+        return self.x[index], self.y[index]
+
+FLOODER_U_PATH = build_u_path(ENEMY_FLOODER_U_BORDER_OFFSET)
+BEAST_CIRCLE = CircleTable(ENEMY_BEAST_WAVE_AMP, ENEMY_BEAST_WAVE_FREQ)
+
+def rebuild_tables() -> None:
+    # Recompute the tables from the current settings (e.g. after batch.py overrode them). The tables are
+    # updated in place, since the other modules import them by name.
+    FLOODER_U_PATH[:] = build_u_path(ENEMY_FLOODER_U_BORDER_OFFSET)
+    BEAST_CIRCLE.build(ENEMY_BEAST_WAVE_AMP, ENEMY_BEAST_WAVE_FREQ)